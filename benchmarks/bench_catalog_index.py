@@ -0,0 +1,158 @@
+"""
+Supplier and publication picker latency: one query per selection versus the catalog index.
+
+A SQLite file stands in for SQL Server, with the BPARTNER and ZPUBLIC columns used
+by the pickers. The legacy path runs the previous per-supplier publication query
+for every selection; the index path loads the whole mapping once and answers from
+memory. The script also checks that both paths return the same publications, that
+a refresh swaps the snapshot without readers ever seeing a partial one, and that a
+refresh that fails or reads no rows keeps the previous snapshot.
+
+Usage:
+    python -m benchmarks.bench_catalog_index [--suppliers 400] [--publications 6000] [--lookups 2000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+import core.data_version as data_version_module
+import services.catalog_index as catalog_module
+from benchmarks.bench_data_version import SqliteManager
+from core.data_version import DataVersionProbe
+from services.catalog_index import CATALOG_SOURCE_TABLES, CatalogIndex
+
+SCHEMA = 'main'
+
+LEGACY_PUBLICATIONS_QUERY = f"""
+    SELECT CODPUB_0 AS Codigo, DESPUB_0 AS Descricao
+    FROM {SCHEMA}.ZPUBLIC
+    WHERE DISTVSP_0 = 2 AND BPSREF_0 = :sup_code
+    ORDER BY DESPUB_0;
+"""
+
+
+def seed(path: str, suppliers: int, publications: int):
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE BPARTNER (BPRNUM_0 TEXT, BPRNAM_0 TEXT, ZEDITOR_0 INT, BPSFLG_0 INT, UPDDATTIM_0 TEXT)'
+    )
+    connection.execute(
+        'CREATE TABLE ZPUBLIC (CODPUB_0 TEXT, DESPUB_0 TEXT, BPSREF_0 TEXT, DISTVSP_0 INT, UPDDATTIM_0 TEXT)'
+    )
+    connection.executemany(
+        'INSERT INTO BPARTNER VALUES (?,?,?,?,NULL)',
+        ((f'E{n:05d}', f'Editora {n:05d}', 2 if n % 10 else 1, 2) for n in range(suppliers)),
+    )
+    connection.executemany(
+        'INSERT INTO ZPUBLIC VALUES (?,?,?,?,NULL)',
+        ((f'P{n:06d}', f'Revista {n:06d}', f'E{n % suppliers:05d}', 2 if n % 7 else 1) for n in range(publications)),
+    )
+    connection.commit()
+    connection.close()
+
+
+def check_atomic_refresh(index: CatalogIndex, expected: int) -> int:
+    """Refreshes the index while 8 threads read it; returns how many incomplete snapshots they saw."""
+    stop = threading.Event()
+    partial = []
+
+    def reader():
+        while not stop.is_set():
+            current = index.get(SCHEMA)
+            if len(current.publications) != expected:
+                partial.append(current)
+
+    readers = [threading.Thread(target=reader) for _ in range(8)]
+    for thread in readers:
+        thread.start()
+    for _ in range(20):
+        index.refresh(SCHEMA)
+    stop.set()
+    for thread in readers:
+        thread.join()
+    return len(partial)
+
+
+def check_failed_refresh(index: CatalogIndex, path: str, snapshot):
+    """A refresh on a broken or emptied source keeps the previous snapshot; a failed first load is not kept."""
+    connection = sqlite3.connect(path)
+    connection.execute('ALTER TABLE ZPUBLIC RENAME TO ZPUBLIC_OLD')
+    connection.commit()
+    index.on_source_change(SCHEMA)
+    assert index.get(SCHEMA) is snapshot, 'refresh com erro substituiu o catálogo'
+
+    empty = CatalogIndex()
+    try:
+        empty.get(SCHEMA)
+    except Exception as e:
+        print(f'primeira carga com erro: {type(e).__name__}, nada fica em memória')
+    assert SCHEMA not in empty._snapshots
+
+    connection.execute('CREATE TABLE ZPUBLIC AS SELECT * FROM ZPUBLIC_OLD WHERE 0')
+    connection.commit()
+    index.on_source_change(SCHEMA)
+    assert index.get(SCHEMA) is snapshot, 'refresh sem linhas substituiu o catálogo'
+
+    connection.execute('DROP TABLE ZPUBLIC')
+    connection.execute('ALTER TABLE ZPUBLIC_OLD RENAME TO ZPUBLIC')
+    connection.commit()
+    connection.close()
+    print('refresh com erro ou sem linhas: mantém-se o catálogo anterior')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--suppliers', type=int, default=400)
+    parser.add_argument('--publications', type=int, default=6000)
+    parser.add_argument('--lookups', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog.db')
+        seed(path, args.suppliers, args.publications)
+        manager = SqliteManager(url=f'sqlite:///{path}')
+        catalog_module.db = manager
+        data_version_module.db = manager
+        catalog_module.data_version = DataVersionProbe(interval=0, tables=CATALOG_SOURCE_TABLES)
+        index = CatalogIndex()
+
+        start = time.perf_counter()
+        snapshot = index.get(SCHEMA)
+        print(f'bootstrap: {(time.perf_counter() - start) * 1000:.1f} ms, {len(snapshot.suppliers)} fornecedores')
+
+        codes = list(snapshot.suppliers.values())
+        picks = [random.choice(codes) for _ in range(args.lookups)]
+
+        start = time.perf_counter()
+        legacy = {}
+        for code in picks:
+            df = manager.run_query(LEGACY_PUBLICATIONS_QUERY, {'sup_code': code})
+            legacy[code] = pd.Series(df.Codigo.values, index=df.Descricao).to_dict()
+        legacy_us = (time.perf_counter() - start) / len(picks) * 1e6
+
+        start = time.perf_counter()
+        for code in picks:
+            index.get(SCHEMA).publications.get(code, {})
+        index_us = (time.perf_counter() - start) / len(picks) * 1e6
+
+        for code, publications in legacy.items():
+            assert dict(index.get(SCHEMA).publications.get(code, {})) == publications, code
+
+        print(f'por seleção: query {legacy_us:,.1f} us   índice {index_us:,.2f} us')
+
+        partial = check_atomic_refresh(index, len(snapshot.publications))
+        print(f'20 refreshes com 8 leitores: {partial} snapshots parciais')
+
+        check_failed_refresh(index, path, index.get(SCHEMA))
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Render time of the HTML comparison table: string concatenation per row versus the columnar renderer.
+
+The comparison frame comes from create_comparison_table over --rows issues per year
+(bench_issue_alignment.batch_frames), with an Issue made of HTML special characters
+and a few missing values. The previous renderer built the table with one
+`html += f'...'` per row (the whole string copied at every row); comparison_table_html
+formats and escapes each column in one vectorized pass and joins the rows once.
+Both outputs must hold the same cells, with the values escaped.
+
+Usage:
+    python -m benchmarks.bench_comparison_html [--rows 5000] [--repeat 7] [--budget-ms 50]
+"""
+
+import argparse
+import re
+import time
+
+import pandas as pd
+from markupsafe import escape
+
+from benchmarks.bench_issue_alignment import batch_frames
+from services.sales_boards_service import SalesBoardsService
+from utils.comparison_table_html import YEAR_COLUMNS, comparison_table_html
+
+YEAR = 2025
+TRICKY_ISSUE = '<b>&"\'x'
+CELL = re.compile(r'<td[^>]*>(.*?)</td>')
+
+
+def comparison_frame(rows: int) -> tuple[pd.DataFrame, dict, dict]:
+    prev, curr = batch_frames(rows)
+    curr.loc[0, 'Issue'] = TRICKY_ISSUE
+    # Um ano mais curto: as últimas linhas só têm o ano anterior
+    curr = curr.iloc[: rows - 3]
+    return SalesBoardsService.create_comparison_table(pd.concat([prev, curr], ignore_index=True), YEAR)
+
+
+def cell(value, percent: bool = False) -> str:
+    if pd.isna(value):
+        return '-'
+    if not isinstance(value, (int, float)):
+        return str(escape(value))
+    # round() como pc.round (metade para o par), sem o "-0" do formato .0f
+    return f'{round(value * 100)}%' if percent else str(round(value))
+
+
+def concatenated_html(df: pd.DataFrame, prev_metrics: dict, curr_metrics: dict) -> str:
+    """The previous renderer: the table grows with one f-string per row."""
+    columns = [f'{column}_{year - 2000}' for year in (YEAR - 1, YEAR) for column in YEAR_COLUMNS]
+    html_table = '<table><tbody>'
+    for row in df.to_dict('records'):
+        values = [cell(row[column], column.startswith('Unsolds')) for column in columns]
+        values += [cell(row['Copies_var']), cell(row['%_var'], percent=True)]
+        html_table += f"""
+                <tr>
+                    {''.join(f'<td>{value}</td>' for value in values)}
+                </tr>
+            """
+    for kind in ('total', 'avg'):
+        html_table += f"""
+                <tr><td colspan="14"></td></tr>
+                <tr><td>{prev_metrics[f'{kind}_sales']}</td><td>{curr_metrics[f'{kind}_sales']}</td></tr>
+            """
+    return html_table + '</tbody></table>'
+
+
+def best_of(repeat: int, func) -> tuple[float, str]:
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def issue_cells(markup: str, rows: int) -> list[list[str]]:
+    """The 14 cells of each issue row (the summary rows are left out)."""
+    cells = CELL.findall(markup)
+    return [cells[n * 14 : (n + 1) * 14] for n in range(rows)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5_000)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--budget-ms', type=float, default=50)
+    args = parser.parse_args()
+
+    print(f'{"linhas":>8}{"concatenação":>16}{"colunar":>12}')
+    for rows in sorted({args.rows // 10, args.rows, args.rows * 4}):
+        df, prev_metrics, curr_metrics = comparison_frame(rows)
+        before, old = best_of(args.repeat, lambda: concatenated_html(df, prev_metrics, curr_metrics))
+        after, new = best_of(args.repeat, lambda: comparison_table_html(df, prev_metrics, curr_metrics, YEAR))
+
+        assert issue_cells(new, len(df)) == [row[:14] for row in issue_cells(old, len(df))]
+        assert escape(TRICKY_ISSUE) in new
+        assert TRICKY_ISSUE not in new
+        print(f'{rows:>8}{before * 1000:>13.1f} ms{after * 1000:>9.1f} ms')
+        if rows == args.rows:
+            assert after * 1000 < args.budget_ms, f'{after * 1000:.1f} ms > {args.budget_ms} ms'
+
+
+if __name__ == '__main__':
+    main()
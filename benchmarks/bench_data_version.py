@@ -0,0 +1,127 @@
+"""
+Change-detection cache invalidation with the data-version probe.
+
+A SQLite file stands in for SQL Server, with the source tables reduced to their
+UPDDATTIM_0 column. A shared_cache function versioned on ZITMINP/SINVOICE/ZBPCEST
+is read repeatedly while the tables are modified, and the script reports how
+many loads were needed, that unrelated changes (BPARTNER) do not invalidate it,
+that deletes are detected through the row count, and what one probe costs.
+
+Usage:
+    python -m benchmarks.bench_data_version [--rows 200000] [--reads 1000]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import core.data_version as data_version_module
+from benchmarks.sales_query_equivalence import to_sqlite
+from core.data_version import SOURCE_TABLES, DataVersionProbe
+from core.database import DatabaseManager
+from core.shared_cache import shared_cache
+
+SCHEMA = 'main'
+
+
+class SqliteManager(DatabaseManager):
+    """DatabaseManager translating the T-SQL hints to SQLite."""
+
+    def run_query(self, query, params=None, **kwargs):
+        return super().run_query(to_sqlite(query), params, **kwargs)
+
+    def run_query_arrow(self, query, params=None, **kwargs):
+        return super().run_query_arrow(to_sqlite(query), params, **kwargs)
+
+    def run_query_arrow_partitioned(self, query, params, partition='quarter', **kwargs):
+        return super().run_query_arrow_partitioned(to_sqlite(query), params, partition, **kwargs)
+
+
+def seed(path: str, rows: int):
+    connection = sqlite3.connect(path)
+    for table in SOURCE_TABLES:
+        connection.execute(f'CREATE TABLE {table} (ID INTEGER PRIMARY KEY, UPDDATTIM_0 TEXT)')
+        connection.executemany(
+            f'INSERT INTO {table} VALUES (?,?)', ((n, f'2025-01-01 00:00:{n % 60:02d}') for n in range(rows))
+        )
+    connection.commit()
+    connection.close()
+
+
+def touch(path: str, statement: str):
+    connection = sqlite3.connect(path)
+    connection.execute(statement)
+    connection.commit()
+    connection.close()
+
+
+def check_failed_probe(path: str, probe: DataVersionProbe, fetch, loads: list):
+    """A failed probe keeps the versions: no listener is called and the cache stays valid."""
+    notified = []
+    probe.subscribe(SOURCE_TABLES, notified.append)
+    versions = probe.probe(SCHEMA)
+    touch(path, 'ALTER TABLE ZBPCEST RENAME TO ZBPCEST_OLD')
+    try:
+        before = len(loads)
+        assert probe.probe(SCHEMA) is versions
+        fetch(SCHEMA, 'PUB1')
+        assert not notified
+        assert len(loads) == before
+    finally:
+        touch(path, 'ALTER TABLE ZBPCEST_OLD RENAME TO ZBPCEST')
+    print('probe falhada              versões mantidas, 0 notificações, 0 cargas')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--reads', type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sources.db')
+        seed(path, args.rows)
+        manager = SqliteManager(url=f'sqlite:///{path}')
+        data_version_module.db = manager
+        probe = DataVersionProbe(interval=0)
+
+        loads = []
+
+        @shared_cache(version=probe.of('ZITMINP', 'SINVOICE', 'ZBPCEST'))
+        def fetch(schema: str, publication: str) -> dict:
+            loads.append(publication)
+            return {'publication': publication}
+
+        def read_many():
+            for _ in range(args.reads):
+                fetch(SCHEMA, 'PUB1')
+
+        start = time.perf_counter()
+        probe.probe(SCHEMA)
+        print(
+            f'probe ({len(SOURCE_TABLES)} tabelas x {args.rows} linhas): {(time.perf_counter() - start) * 1000:.1f} ms'
+        )
+
+        steps = [
+            ('sem alterações', None),
+            ('BPARTNER alterada', "UPDATE BPARTNER SET UPDDATTIM_0='2025-06-01 10:00:00' WHERE ID=1"),
+            ('ZITMINP alterada', "UPDATE ZITMINP SET UPDDATTIM_0='2025-06-01 10:00:00' WHERE ID=1"),
+            ('SINVOICE linha apagada', 'DELETE FROM SINVOICE WHERE ID=2'),
+        ]
+        for label, statement in steps:
+            if statement:
+                touch(path, statement)
+                probe.probe(SCHEMA)
+            before = len(loads)
+            read_many()
+            print(f'{label:<24} {args.reads} leituras -> {len(loads) - before} carga(s)')
+
+        check_failed_probe(path, probe, fetch, loads)
+
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Cost of refreshing the current-year sales report: full fetch versus incremental refresh.
+
+The sales_query_equivalence stand-in schema is seeded in SQLite and its dates are
+shifted so that the most recent issues are distributed today. The publications are
+then regrouped into larger titles (--title-sizes seeded publications per title, from
+a monthly-like title to a daily-like one). For each report the script does a full
+fetch (which becomes the incremental base), changes the returns and invoices of the
+recent issues, and then refreshes the report both ways. The refresh must equal a new
+full fetch. It is incremental only when it pays off (enough issues before the
+watermark, see INCREMENTAL_MIN_FROZEN_ROWS); otherwise it is a plain full fetch, and
+so is any refresh while the window still covers most of the year.
+
+Usage:
+    python -m benchmarks.bench_incremental_refresh [--items 4000] [--invoice-lines 2000000] [--reports 10]
+                                                   [--title-sizes 1 10 40] [--repeat 3]
+"""
+
+import argparse
+import datetime
+import os
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+import services.sales_boards_service as service_module
+from benchmarks.bench_data_version import SqliteManager
+from benchmarks.sales_query_equivalence import SCHEMA, seed
+from core.disk_cache import DiskCache
+from services.sales_boards_service import INCREMENTAL_WINDOW_DAYS, SalesBoardsService, incremental_watermark
+
+
+def shift_to_today(connection: sqlite3.Connection):
+    """Moves every distribution date so that the latest one is today."""
+    (last_date,) = connection.execute('SELECT MAX(DISDAT_0) FROM ZITMINP').fetchone()
+    days = (datetime.date.today() - datetime.date.fromisoformat(last_date)).days
+    connection.execute(f"UPDATE ZITMINP SET DISDAT_0 = date(DISDAT_0, '+{days} days')")
+    connection.commit()
+
+
+def change_recent_issues(connection: sqlite3.Connection, publication: str):
+    """Late returns and a new invoice line on the issues of the incremental window."""
+    since = (datetime.date.today() - datetime.timedelta(days=INCREMENTAL_WINDOW_DAYS)).isoformat()
+    connection.execute(
+        'UPDATE ZITMINP SET QTYRDEV_0 = QTYRDEV_0 + 7 WHERE CODPUB_0 = ? AND DISDAT_0 >= ?', (publication, since)
+    )
+    connection.execute(
+        "INSERT INTO SINVOICED SELECT 'INV0000000', ITMREF_0, 'INP', 'C99', 11 FROM ZITMINP "
+        'WHERE CODPUB_0 = ? AND DISDAT_0 >= ?',
+        (publication, since),
+    )
+    connection.commit()
+
+
+def check_watermark(year: int):
+    """Full fetch while the window reaches back to near Jan 1, incremental after that."""
+    jan_1 = datetime.date(year, 1, 1)
+    assert incremental_watermark(year, jan_1 + datetime.timedelta(days=INCREMENTAL_WINDOW_DAYS)) is None
+    assert incremental_watermark(year, jan_1 + datetime.timedelta(days=2 * INCREMENTAL_WINDOW_DAYS - 1)) is None
+    late = jan_1 + datetime.timedelta(days=2 * INCREMENTAL_WINDOW_DAYS)
+    assert incremental_watermark(year, late) == late - datetime.timedelta(days=INCREMENTAL_WINDOW_DAYS)
+
+
+def refresh(publication: str, year: int) -> pd.DataFrame:
+    """The refresh of fetch_sales_year: incremental when it pays off, otherwise a full fetch."""
+    df = SalesBoardsService._refresh_incremental(SCHEMA, publication, year)
+    if df is None:
+        df = SalesBoardsService._query_sales_data(SCHEMA, publication, year)
+    return df
+
+
+def best_of(repeat: int, func) -> tuple[float, pd.DataFrame]:
+    best, df = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = func()
+        best = min(best, time.perf_counter() - start)
+    return best, df
+
+
+def merge_titles(connection: sqlite3.Connection, publications: list[str], size: int) -> list[str]:
+    """Regroups the seeded publications by `size` (larger titles, e.g. a daily); returns the titles."""
+    connection.execute(
+        "UPDATE ZITMINP SET CODPUB_0 = printf('PUB%03d', (CAST(substr(ITMREF_0, 4) AS INTEGER) % ?) / ? * ?)",
+        (len(publications), size, size),
+    )
+    connection.commit()
+    return publications[::size]
+
+
+def refresh_report(connection: sqlite3.Connection, publication: str, year: int, repeat: int) -> tuple:
+    """
+    Full fetch as base, change the recent issues, then refresh both ways.
+    Returns (full fetch s, refresh s, rows, rows before the watermark, incremental refresh used).
+    """
+    base = SalesBoardsService._query_sales_data(SCHEMA, publication, year)
+    SalesBoardsService._put_incremental_base(SCHEMA, publication, year, base)
+
+    change_recent_issues(connection, publication)
+
+    used = SalesBoardsService._refresh_incremental(SCHEMA, publication, year) is not None
+    refresh_time, refreshed = best_of(repeat, lambda: refresh(publication, year))
+    full_time, full = best_of(repeat, lambda: SalesBoardsService._query_sales_data(SCHEMA, publication, year))
+    pd.testing.assert_frame_equal(refreshed, full)
+
+    watermark = incremental_watermark(year)
+    frozen_rows = 0 if watermark is None else int((full['Date'] < watermark).sum())
+    return full_time, refresh_time, len(full), frozen_rows, used
+
+
+def summary_row(size: int, results: list[tuple]) -> str:
+    """Averages per title and total times of the reports of one title size."""
+    full_total, refresh_total, rows, frozen_rows, used = (sum(column) for column in zip(*results))
+    return (
+        f'{size:>19}{rows / len(results):>9.0f}{frozen_rows / len(results):>7.0f}'
+        f'{f"{used}/{len(results)}":>13}{full_total * 1000:>8.0f} ms{refresh_total * 1000:>7.0f} ms'
+        f'{refresh_total / full_total:>7.0%}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=4_000)
+    parser.add_argument('--invoice-lines', type=int, default=2_000_000)
+    parser.add_argument('--reports', type=int, default=10)
+    parser.add_argument('--title-sizes', type=int, nargs='+', default=[1, 10, 40])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    year = datetime.date.today().year
+    check_watermark(year)
+    watermark = incremental_watermark(year)
+    mode = 'janela cobre a maior parte do ano' if watermark is None else f'janela desde {watermark}'
+    print(f'relatórios {year}, {mode}, refresh == leitura completa (melhor de {args.repeat})')
+    print(
+        f'{"publicações/título":>19}{"edições":>9}{"antes":>7}{"incremental":>13}'
+        f'{"completa":>11}{"refresh":>10}{"custo":>7}'
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sales.db')
+        connection = sqlite3.connect(path)
+        publications = seed(connection, args.items, args.invoice_lines)
+        shift_to_today(connection)
+
+        manager = SqliteManager(url=f'sqlite:///{path}')
+        service_module.db = manager
+        service_module.disk_cache = DiskCache(os.path.join(tmp, 'cache'), max_bytes=2**30)
+
+        for size in args.title_sizes:
+            titles = merge_titles(connection, publications, size)[: args.reports]
+            results = [refresh_report(connection, title, year, args.repeat) for title in titles]
+            print(summary_row(size, results))
+
+        connection.close()
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Alignment strategies of the two-year comparison: correctness on a shifted calendar and scaling.
+
+1. The position strategy must give exactly the frame of the previous index merge.
+2. A weekly title whose current year has a special edition in week 10 (with its
+   own issue number) and a missing Thursday in week 30: the script counts, per
+   strategy, the pairs whose dates are not one year (52 weeks +- 3 days) apart.
+3. Timing of every strategy on daily titles and on all-publication batches
+   (one frame per year with many titles' issues), up to a million rows per year.
+
+Usage:
+    python -m benchmarks.bench_issue_alignment [--sizes 310 10000 100000 1000000] [--repeat 5]
+"""
+
+import argparse
+import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks.bench_trend_panel import best_ms
+from services.sales_queries import UNSOLDS_DTYPE
+from utils.issue_alignment import (
+    ALIGN_POSITION,
+    ALIGNMENT_STRATEGIES,
+    YEAR_SHIFT_DAYS,
+    align_years,
+)
+
+EPOCH = datetime.date(1970, 1, 1)
+# Folga aceite entre as datas de um par (em torno das 52 semanas)
+PAIR_SLACK_DAYS = 3
+# Dia da semana do domingo com 1970-01-01 = quinta (segunda = 0)
+SUNDAY = 6
+
+
+def year_frame(year: int, days: np.ndarray, issues: np.ndarray, seed: int) -> pd.DataFrame:
+    """Issues of one year in the compact sales layout (days = days since 1970-01-01, in order)."""
+    rng = np.random.default_rng(seed)
+    supply = rng.integers(500, 20_000, len(days)).astype('int32')
+    sales = (supply * rng.uniform(0.2, 0.9, len(days))).astype('int32')
+    return pd.DataFrame({
+        'Year': np.full(len(days), year, dtype='int16'),
+        'Issue': pd.array(issues.astype(str), dtype='string[pyarrow]'),
+        'Date': pd.array(pa.array(days.astype('int32')).cast(pa.date32()), dtype=pd.ArrowDtype(pa.date32())),
+        'Supply': supply,
+        'Sales': sales,
+        'Outlet': rng.integers(100, 3_000, len(days)).astype('int32'),
+        'Unsolds': np.ceil((supply - sales) / supply * 100).astype(UNSOLDS_DTYPE),
+    })
+
+
+def weekly_days(year: int) -> np.ndarray:
+    """Every Thursday of the year."""
+    first = datetime.date(year, 1, 1)
+    first_thursday = first + datetime.timedelta(days=(3 - first.weekday()) % 7)
+    start = (first_thursday - EPOCH).days
+    end = (datetime.date(year, 12, 31) - EPOCH).days
+    return np.arange(start, end + 1, 7)
+
+
+def shifted_calendar(year: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Previous year regular; current year with a special edition in week 10 and no issue in week 30."""
+    prev_days = weekly_days(year - 1)
+    prev = year_frame(year - 1, prev_days, 5000 + np.arange(len(prev_days)), seed=1)
+
+    days = weekly_days(year)
+    issues = 5000 + len(prev_days) + np.arange(len(days))
+    # A quinta da semana 30 não sai; edição especial na segunda da semana 10, com número próprio
+    days, issues = np.delete(days, 29), np.delete(issues, 29)
+    special_day = days[9] - 3
+    position = np.searchsorted(days, special_day)
+    days, issues = np.insert(days, position, special_day), np.insert(issues, position, 9999)
+    return prev, year_frame(year, days, issues, seed=2)
+
+
+def misaligned_pairs(aligned: pd.DataFrame) -> int:
+    """Pairs (both sides present) whose dates are not 52 weeks +- 3 days apart."""
+    both = aligned.dropna(subset=['Date_prev', 'Date_curr'])
+    prev = pa.array(both['Date_prev'].array).cast(pa.int32()).to_numpy(zero_copy_only=False)
+    curr = pa.array(both['Date_curr'].array).cast(pa.int32()).to_numpy(zero_copy_only=False)
+    return int((np.abs(curr - prev - YEAR_SHIFT_DAYS) > PAIR_SLACK_DAYS).sum())
+
+
+def batch_frames(rows: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """`rows` issues per year: daily titles (310 issues) concatenated, distinct issue numbers."""
+    titles = max(rows // 310, 1)
+    frames = []
+    for year in (2024, 2025):
+        first = (datetime.date(year, 1, 2) - EPOCH).days
+        # Seis dias por semana, sem domingos
+        days = first + np.arange(366)
+        days = days[(days + 3) % 7 != SUNDAY][: min(rows, 310)]
+        all_days = np.sort(np.tile(days, titles))[:rows]
+        issues = np.arange(len(all_days)) + (year - 2024) * len(all_days)
+        frames.append(year_frame(year, all_days, issues, seed=year))
+    return frames[0], frames[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[310, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    # 1. Posição == merge pelo índice (comportamento anterior)
+    prev, curr = batch_frames(2_000)
+    legacy = pd.merge(
+        prev,
+        curr.iloc[:-100].reset_index(drop=True),
+        left_index=True,
+        right_index=True,
+        how='outer',
+        suffixes=('_prev', '_curr'),
+    )
+    pd.testing.assert_frame_equal(align_years(prev, curr.iloc[:-100], ALIGN_POSITION), legacy)
+    print('posição: igual ao merge pelo índice.')
+
+    # 2. Calendário deslocado por uma edição especial
+    prev, curr = shifted_calendar(2025)
+    print(f'\nsemanal com edição especial ({len(prev)} vs {len(curr)} edições): pares desalinhados')
+    for strategy, label in ALIGNMENT_STRATEGIES.items():
+        aligned = align_years(prev, curr, strategy)
+        print(f'  {label:<20} {misaligned_pairs(aligned):>3} de {len(aligned)} linhas')
+
+    # 3. Escala
+    print(f'\n{"linhas/ano":>10}' + ''.join(f'{label:>20}' for label in ALIGNMENT_STRATEGIES.values()))
+    for rows in args.sizes:
+        prev, curr = batch_frames(rows)
+        timings = [
+            best_ms(lambda s=strategy: align_years(prev, curr, s), args.repeat) for strategy in ALIGNMENT_STRATEGIES
+        ]
+        print(f'{rows:>10}' + ''.join(f'{ms:>17.1f} ms' for ms in timings))
+
+
+if __name__ == '__main__':
+    main()
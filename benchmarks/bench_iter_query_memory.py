@@ -0,0 +1,134 @@
+"""
+Peak memory of DatabaseManager.run_query versus the chunked DatabaseManager.iter_query.
+
+A SQLite file stands in for SQL Server. For each row count the full result is
+consumed (rows are summed chunk by chunk) and the Python heap peak is measured
+with tracemalloc. The iter_query peak must stay flat as the row count grows
+(below --max-chunk-ratio times the peak of a single chunk, and within 1.5x of the
+peak of the smallest row count), while run_query grows linearly. The script also
+checks that stopping the iteration early returns the connection to the pool and
+that an error in the middle of the stream reaches the consumer.
+
+This is a manual benchmark check, not a test: nothing runs it automatically (the
+repository has no test suite). Run it by hand after changing iter_query; a failed
+check stops it with an AssertionError.
+
+Usage:
+    python -m benchmarks.bench_iter_query_memory [--rows 100000 400000 1600000] [--chunk-rows 50000]
+                                                 [--max-chunk-ratio 3]
+"""
+
+import argparse
+import gc
+import os
+import sqlite3
+import tempfile
+import tracemalloc
+
+from sqlalchemy import event
+
+from core.database import DatabaseManager
+
+QUERY = 'SELECT ID, ITMREF_0, DISDAT_0, QTY_0 FROM LINES WHERE ID < :max_id'
+# A função fail_at falha quando a leitura chega à linha :fail_id (erro a meio do stream)
+FAILING_QUERY = 'SELECT ID, QTY_0 FROM LINES WHERE fail_at(ID, :fail_id) AND ID < :max_id'
+
+
+def seed(path: str, rows: int):
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE LINES (ID INTEGER PRIMARY KEY, ITMREF_0 TEXT, DISDAT_0 TEXT, QTY_0 INTEGER)')
+    connection.executemany(
+        'INSERT INTO LINES VALUES (?,?,?,?)',
+        ((n, f'ITM{n % 5000:06d}', f'20{n % 25:02d}-01-01', n % 300) for n in range(rows)),
+    )
+    connection.commit()
+    connection.close()
+
+
+def peak_mib(func) -> tuple[float, int]:
+    gc.collect()
+    tracemalloc.start()
+    total = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20, total
+
+
+def fail_at(row_id: int, fail_id: int) -> int:
+    if row_id >= fail_id:
+        raise ValueError(f'falha simulada na linha {row_id}')
+    return 1
+
+
+def check_peaks(chunk_peaks: dict[int, float], one_chunk: float, max_ratio: float):
+    """The chunked peak is bounded by a few chunks and does not grow with the row count."""
+    for rows, peak in chunk_peaks.items():
+        assert peak < max_ratio * one_chunk, f'{rows} linhas: pico {peak:.1f} MiB >= {max_ratio} x {one_chunk:.1f} MiB'
+    smallest = chunk_peaks[min(chunk_peaks)]
+    assert max(chunk_peaks.values()) < 1.5 * smallest, f'o pico cresce com as linhas: {chunk_peaks}'
+
+
+def check_stream_error(manager: DatabaseManager, rows: int, chunk_rows: int):
+    """An error after the first chunks is raised to the consumer, after the chunks already read."""
+    received = 0
+    try:
+        for chunk in manager.iter_query(FAILING_QUERY, {'fail_id': rows // 2, 'max_id': rows}, chunk_rows=chunk_rows):
+            received += len(chunk)
+    except Exception as e:
+        print(f'Erro a meio do stream chega ao consumidor após {received} linhas: {type(e).__name__}')
+    else:
+        raise AssertionError(f'stream truncado terminou sem erro após {received} linhas')
+    assert 0 < received < rows // 2 + chunk_rows
+    assert manager.engine.pool.checkedout() == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 400_000, 1_600_000])
+    parser.add_argument('--chunk-rows', type=int, default=50_000)
+    parser.add_argument('--max-chunk-ratio', type=float, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'lines.db')
+        seed(path, max(args.rows))
+        manager = DatabaseManager(url=f'sqlite:///{path}')
+        event.listen(
+            manager.engine,
+            'connect',
+            lambda dbapi_connection, _: dbapi_connection.create_function('fail_at', 2, fail_at),
+        )
+
+        # Referência: o pico de ler um único bloco por inteiro
+        one_chunk, _ = peak_mib(lambda: len(manager.run_query(QUERY, {'max_id': args.chunk_rows})))
+        chunk_peaks = {}
+        print(f'Um bloco de {args.chunk_rows} linhas: {one_chunk:.1f} MiB')
+        print(f'{"rows":>10} {"run_query (MiB)":>16} {"iter_query (MiB)":>17}')
+        for rows in args.rows:
+            params = {'max_id': rows}
+            full_peak, full_total = peak_mib(lambda: int(manager.run_query(QUERY, params)['QTY_0'].sum()))
+            chunk_peak, chunk_total = peak_mib(
+                lambda: sum(
+                    int(chunk['QTY_0'].sum()) for chunk in manager.iter_query(QUERY, params, chunk_rows=args.chunk_rows)
+                )
+            )
+            assert full_total == chunk_total
+            chunk_peaks[rows] = chunk_peak
+            print(f'{rows:>10} {full_peak:>16.1f} {chunk_peak:>17.1f}')
+        check_peaks(chunk_peaks, one_chunk, args.max_chunk_ratio)
+
+        # Parar cedo tem de devolver a conexão ao pool
+        chunks = manager.iter_query(QUERY, {'max_id': max(args.rows)}, chunk_rows=args.chunk_rows)
+        next(chunks)
+        assert manager.engine.pool.checkedout() == 1
+        chunks.close()
+        assert manager.engine.pool.checkedout() == 0
+        print('Early stop: connection returned to the pool.')
+
+        check_stream_error(manager, max(args.rows), args.chunk_rows)
+
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Per-call logging overhead with many threads logging at once.
+
+Compares the previous synchronous FileHandler configuration with the
+QueueHandler/QueueListener pipeline of utils.logging_config. Each of the
+threads issues INFO calls (written) and DEBUG calls (filtered) and times every
+call on the caller side, which is what a Streamlit session actually waits for.
+
+Usage:
+    python -m benchmarks.bench_logging [--threads 50] [--calls 2000]
+"""
+
+import argparse
+import logging
+import logging.config
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from utils.logging_config import setup_logging, stop_logging
+
+
+def configure_sync(log_dir: str):
+    """The previous configuration: synchronous file handlers on a DEBUG root logger."""
+    logging.config.dictConfig({
+        'version': 1,
+        'disable_existing_loggers': False,
+        'formatters': {'standard': {'format': '%(asctime)s - %(levelname)s - %(name)s - %(message)s'}},
+        'handlers': {
+            'info_file': {
+                'level': 'INFO',
+                'class': 'logging.FileHandler',
+                'filename': os.path.join(log_dir, 'info.log'),
+                'formatter': 'standard',
+            },
+            'error_file': {
+                'level': 'ERROR',
+                'class': 'logging.FileHandler',
+                'filename': os.path.join(log_dir, 'error.log'),
+                'formatter': 'standard',
+            },
+        },
+        'root': {'level': 'DEBUG', 'handlers': ['info_file', 'error_file']},
+    })
+
+
+def reset_root():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+
+def hammer(threads: int, calls: int) -> list[int]:
+    """Runs `threads` threads doing `calls` INFO + `calls` DEBUG calls; returns per-call latencies (ns)."""
+    logger = logging.getLogger('bench.sales_boards')
+    latencies: list[list[int]] = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads)
+
+    def worker(slot: int):
+        samples = latencies[slot]
+        barrier.wait()
+        for i in range(calls):
+            start = time.perf_counter_ns()
+            logger.info('Dados brutos recebidos do banco (%d linhas) na sessão %d', i, slot)
+            samples.append(time.perf_counter_ns() - start)
+            start = time.perf_counter_ns()
+            logger.debug('Checkout do pool em %.1f ms.', 0.4)
+            samples.append(time.perf_counter_ns() - start)
+
+    workers = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return [sample for samples in latencies for sample in samples]
+
+
+def report(name: str, latencies: list[int], wall: float):
+    ordered = sorted(latencies)
+    mean_us = statistics.fmean(ordered) / 1000
+    p50_us = ordered[len(ordered) // 2] / 1000
+    p99_us = ordered[int(len(ordered) * 0.99)] / 1000
+    print(
+        f'{name:<8} mean {mean_us:>8.1f} us  p50 {p50_us:>7.1f} us  '
+        f'p99 {p99_us:>8.1f} us  max {ordered[-1] / 1000:>9.1f} us  wall {wall:.2f} s'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=50)
+    parser.add_argument('--calls', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_sync(os.path.join(tmp))
+        start = time.perf_counter()
+        latencies = hammer(args.threads, args.calls)
+        report('sync', latencies, time.perf_counter() - start)
+        reset_root()
+
+        setup_logging(log_dir=os.path.join(tmp, 'queued'), console=False)
+        start = time.perf_counter()
+        latencies = hammer(args.threads, args.calls)
+        wall = time.perf_counter() - start
+        drain_start = time.perf_counter()
+        stop_logging()
+        report('queue', latencies, wall)
+        print(f'queue drain after the last call: {time.perf_counter() - drain_start:.2f} s')
+        reset_root()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+Rerun latency of the Sales Boards page with Streamlit's AppTest, and data-layer calls per interaction.
+
+The page runs on a SQLite stand-in (sales_query_equivalence schema, dates moved to
+the current year) with a catalog of --publications titles for one supplier. A
+session opens a comparison report, then changes display options and touches the
+auxiliary widgets. For each interaction the script measures the time until the
+report is on screen again and counts the fetch_sales_year calls: the display
+options and the auxiliary widgets must not reach the data layer.
+
+AppTest always reruns the whole script (fragment-scoped reruns only exist in a
+live session), so the timings are an upper bound for the fragment page.
+--baseline runs the same session on another version of the page, where the report
+is only shown after "Gerar Relatório" (every interaction is followed by a click):
+
+    git show <commit>:reports/sales_boards.py > /tmp/sales_boards_before.py
+    python -m benchmarks.bench_page_reruns --baseline /tmp/sales_boards_before.py
+
+Usage:
+    python -m benchmarks.bench_page_reruns [--items 4000] [--invoice-lines 400000] [--repeat 5] [--baseline PATH]
+"""
+
+import argparse
+import functools
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from types import MappingProxyType
+
+from streamlit.testing.v1 import AppTest
+
+import core.data_version as data_version_module
+import services.catalog_index as catalog_module
+import services.sales_boards_service as service_module
+from benchmarks.bench_data_version import SqliteManager
+from benchmarks.bench_incremental_refresh import shift_to_today
+from benchmarks.sales_query_equivalence import SCHEMA, seed
+from core.data_version import DataVersionProbe
+from core.disk_cache import DiskCache
+from core.prefetch import PrefetchScheduler
+from services.catalog_index import CatalogSnapshot
+from services.sales_boards_service import SALES_SOURCE_TABLES, SalesBoardsService
+
+PAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'reports', 'sales_boards.py')
+SUPPLIER_NAME = 'Editora Teste'
+SUPPLIER = 'SUP001'
+
+
+class DataLayerCounter:
+    """Counts the calls to fetch_sales_year (memory hits included: any call reaches the data layer)."""
+
+    calls = 0
+
+    @classmethod
+    def install(cls):
+        fetch_year = SalesBoardsService.fetch_sales_year
+
+        @functools.wraps(fetch_year)
+        def counted(*args, **kwargs):
+            cls.calls += 1
+            return fetch_year(*args, **kwargs)
+
+        SalesBoardsService.fetch_sales_year = staticmethod(counted)
+
+
+def stand_in(tmp: str, items: int, invoice_lines: int, titles: int) -> tuple[SqliteManager, dict[str, str]]:
+    """Seeds the stand-in database, points the services at it and returns {title name: code}."""
+    path = os.path.join(tmp, 'sales.db')
+    connection = sqlite3.connect(path)
+    publications = seed(connection, items, invoice_lines)[:titles]
+    shift_to_today(connection)
+    for table in SALES_SOURCE_TABLES:
+        connection.execute(f'ALTER TABLE {table} ADD COLUMN UPDDATTIM_0 TEXT')
+    connection.commit()
+    connection.close()
+
+    manager = SqliteManager(url=f'sqlite:///{path}')
+    service_module.db = manager
+    data_version_module.db = manager
+    service_module.data_version = DataVersionProbe(interval=0, tables=SALES_SOURCE_TABLES)
+    service_module.disk_cache = DiskCache(os.path.join(tmp, 'cache'), max_bytes=2**30)
+    # Sem prefetch: cada interação mede só o seu próprio trabalho
+    service_module.prefetch = PrefetchScheduler(max_workers=0)
+
+    titles = {f'Revista {code}': code for code in publications}
+    catalog_module.catalog_index._snapshots[SCHEMA] = CatalogSnapshot(
+        suppliers=MappingProxyType({SUPPLIER_NAME: SUPPLIER}),
+        publications=MappingProxyType({SUPPLIER: MappingProxyType(titles)}),
+        loaded_at=time.time(),
+    )
+    return manager, titles
+
+
+def timed(step) -> tuple[float, int]:
+    """Runs one interaction: (seconds, fetch_sales_year calls)."""
+    DataLayerCounter.calls = 0
+    start = time.perf_counter()
+    step()
+    return time.perf_counter() - start, DataLayerCounter.calls
+
+
+def session(page: str, title: str, click_after_each: bool) -> dict[str, tuple[float, int]]:
+    """One browsing session; the report must be on screen after every interaction."""
+    at = AppTest.from_file(page, default_timeout=120)
+    at.secrets['database'] = {'schema': SCHEMA}
+    at.session_state['authenticated'] = True
+    at.run()
+    at.selectbox(key='supplier_select').set_value(SUPPLIER_NAME).run()
+    at.selectbox(key=f'pub_select_{SUPPLIER}').set_value(title).run()
+
+    def show_report():
+        at.button(key='generate_report_button').click().run()
+
+    def then_report(interaction):
+        def step():
+            interaction()
+            if click_after_each:
+                show_report()
+
+        return step
+
+    def grid_button():
+        next(button for button in at.button if button.label == 'Example 1').click().run()
+
+    steps = {
+        'gerar relatório': show_report,
+        'alinhamento iso_week': then_report(lambda: at.selectbox(key='issue_alignment').set_value('iso_week').run()),
+        'alinhamento posição': then_report(lambda: at.selectbox(key='issue_alignment').set_value('position').run()),
+        'botão da grelha': then_report(grid_button),
+    }
+    results = {}
+    for name, step in steps.items():
+        results[name] = timed(step)
+        assert not at.exception, at.exception
+        assert at.dataframe, f'relatório ausente depois de {name}'
+    return results
+
+
+def run_sessions(page: str, titles: dict[str, str], repeat: int, click_after_each: bool) -> dict[str, list]:
+    runs = {}
+    for n in range(repeat):
+        # Um título por sessão: o primeiro "gerar relatório" lê sempre da base de dados
+        title = list(titles)[n % len(titles)]
+        for name, result in session(page, title, click_after_each).items():
+            runs.setdefault(name, []).append(result)
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=4_000)
+    parser.add_argument('--invoice-lines', type=int, default=400_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', help='Another version of reports/sales_boards.py to compare with.')
+    args = parser.parse_args()
+
+    DataLayerCounter.install()
+    with tempfile.TemporaryDirectory() as tmp:
+        manager, titles = stand_in(tmp, args.items, args.invoice_lines, 2 * args.repeat)
+        pages = {'fragmentos': (PAGE, False)}
+        if args.baseline:
+            pages = {'anterior': (args.baseline, True), **pages}
+        # Títulos diferentes por página: nenhuma encontra os dados já em cache pela outra
+        results = {
+            name: run_sessions(page, dict(list(titles.items())[n * args.repeat :]), args.repeat, click)
+            for n, (name, (page, click)) in enumerate(pages.items())
+        }
+        manager.close()
+
+    print(f'{args.repeat} sessões por página (AppTest, mediana; chamadas a fetch_sales_year por interação)')
+    print(f'{"":<22}' + ''.join(f'{name:>26}' for name in results))
+    for step in next(iter(results.values())):
+        cells = []
+        for runs in results.values():
+            seconds = statistics.median(elapsed for elapsed, _ in runs[step]) * 1000
+            calls = max(count for _, count in runs[step])
+            cells.append(f'{seconds:>12.0f} ms {calls:>3} chamadas')
+        print(f'{step:<22}' + ''.join(f'{cell:>26}' for cell in cells))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Throughput of a long sales pull: one serial query versus date partitions on parallel connections.
+
+The sales_query_equivalence stand-in schema is seeded in a SQLite file (several
+connections can read it at the same time) with one supplier owning every
+publication. The six-year supplier pull (sales_by_supplier_query, 2020 to 2025)
+runs once through run_query_arrow and then through run_query_arrow_partitioned
+by quarter and by month with 1, 2, 4 and 8 parallel queries. Every partitioned
+result must hold the same rows as the serial one. The multi-year trend read of one
+title (fetch_sales_years, six one-year slices, nothing cached) then runs with the
+same numbers of parallel queries and must give the same frame.
+
+SQLite runs in-process on the client's CPUs, where SQL Server works on its own
+machine while the client waits on the network. --server-ms adds that wait
+(a sleep that releases the GIL) to every query, per month of its date range, as
+a rough model of the remote server time; 0 measures the bare local stand-in.
+
+Usage:
+    python -m benchmarks.bench_partitioned_fetch [--items 200000] [--invoice-lines 1000000] [--repeat 3]
+                                                 [--server-ms 0 20]
+"""
+
+import argparse
+import datetime
+import os
+import re
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+from sqlalchemy import event
+
+import services.sales_boards_service as service_module
+from benchmarks.bench_data_version import SqliteManager
+from benchmarks.bench_supplier_portfolio import SUPPLIER, add_suppliers
+from benchmarks.sales_query_equivalence import SCHEMA, seed
+from core.disk_cache import DiskCache
+from services.sales_boards_service import SalesBoardsService
+from services.sales_queries import SUPPLIER_SALES_SCHEMA, sales_by_supplier_query
+
+PARAMS = {'supplier_param': SUPPLIER, 'start_date': '2020-01-01', 'end_date': '2025-12-31'}
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+SORT_KEYS = [('Publication', 'ascending'), ('Date', 'ascending'), ('Issue', 'ascending')]
+TREND_YEARS = range(2020, 2026)
+
+
+def simulate_server(manager: SqliteManager, server_ms: float):
+    """Sleeps before every query for server_ms per month (30 days) of its date range."""
+
+    def wait(conn, cursor, statement, parameters, *_):
+        dates = [datetime.date.fromisoformat(value) for value in parameters if DATE_PATTERN.fullmatch(str(value))]
+        if not dates:
+            return
+        days = (max(dates) - min(dates)).days + 1
+        time.sleep(server_ms * days / 30 / 1000)
+
+    if server_ms:
+        event.listen(manager.engine, 'before_cursor_execute', wait)
+
+
+def best_of(func, repeat: int) -> tuple[float, pa.Table]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        table = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), table
+
+
+def stand_in(path: str, workers: int, server_ms: float) -> SqliteManager:
+    manager = SqliteManager(
+        url=f'sqlite:///{path}',
+        engine_options={'pool_size': workers, 'max_overflow': 0},
+        max_parallel_queries=workers,
+    )
+    simulate_server(manager, server_ms)
+    return manager
+
+
+def trend_read(manager: SqliteManager, cache_dir: str, publication: str, repeat: int) -> tuple[float, pd.DataFrame]:
+    """Best time of fetch_sales_years over TREND_YEARS with both cache tiers empty."""
+    service_module.db = manager
+    reads = iter(range(repeat))
+
+    def read():
+        SalesBoardsService.fetch_sales_year.clear()
+        service_module.disk_cache = DiskCache(os.path.join(cache_dir, str(next(reads))), max_bytes=2**30)
+        return SalesBoardsService.fetch_sales_years(SCHEMA, publication, TREND_YEARS)
+
+    return best_of(read, repeat)
+
+
+def check_trend(path: str, tmp: str, publication: str, server_ms: float, repeat: int):
+    """The missing years of a trend read run in parallel, with the same result as one year after the other."""
+    expected, serial_s = None, None
+    for workers in (1, 2, 4, 8):
+        manager = stand_in(path, workers, server_ms)
+        elapsed, df = trend_read(manager, os.path.join(tmp, f'trend-{server_ms:g}-{workers}'), publication, repeat)
+        manager.close()
+        if expected is None:
+            expected, serial_s = df, elapsed
+        pd.testing.assert_frame_equal(df, expected)
+        print(
+            f'tendência {len(TREND_YEARS)} anos x {workers}: {elapsed * 1000:>7.0f} ms  '
+            f'{len(df):>6} edições  ({serial_s / elapsed:.1f}x)'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=100_000)
+    parser.add_argument('--invoice-lines', type=int, default=500_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--server-ms', type=float, nargs='+', default=[0, 20])
+    args = parser.parse_args()
+
+    query = sales_by_supplier_query(SCHEMA)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sales.db')
+        connection = sqlite3.connect(path)
+        publications = seed(connection, args.items, args.invoice_lines)
+        add_suppliers(connection, publications, len(publications))
+        connection.close()
+
+        for server_ms in args.server_ms:
+            serial = stand_in(path, 1, server_ms)
+            serial_s, expected = best_of(
+                lambda: serial.run_query_arrow(query, PARAMS, schema=SUPPLIER_SALES_SCHEMA), args.repeat
+            )
+            serial.close()
+            expected = expected.sort_by(SORT_KEYS)
+            print(f'\n{expected.num_rows} linhas de 2020 a 2025, servidor +{server_ms:g} ms por mês do intervalo')
+            print(f'query única:             {serial_s * 1000:>7.0f} ms  {expected.num_rows / serial_s:>9.0f} linhas/s')
+
+            for partition in ('quarter', 'month'):
+                for workers in (1, 2, 4, 8):
+                    manager = stand_in(path, workers, server_ms)
+                    elapsed, table = best_of(
+                        lambda: manager.run_query_arrow_partitioned(
+                            query, PARAMS, partition, schema=SUPPLIER_SALES_SCHEMA
+                        ),
+                        args.repeat,
+                    )
+                    manager.close()
+                    assert table.sort_by(SORT_KEYS).equals(expected), (partition, workers)
+                    print(
+                        f'{partition:<8} x {workers} em paralelo: {elapsed * 1000:>7.0f} ms  '
+                        f'{table.num_rows / elapsed:>9.0f} linhas/s  ({serial_s / elapsed:.1f}x)'
+                    )
+
+            check_trend(path, tmp, publications[0], server_ms, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
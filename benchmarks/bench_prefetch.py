@@ -0,0 +1,198 @@
+"""
+Speculative prefetch: time from "Gerar Relatório" to the data, and the caps under a selection flood.
+
+A SQLite stand-in (sales_query_equivalence schema, dates moved to the current year)
+with a simulated server time per query (see bench_partitioned_fetch) serves the
+two-year comparison of fetch_sales_data.
+
+1. Click latency: for each publication the user selects it, takes --think-ms to
+   confirm the options and clicks. Without prefetch the click runs both yearly
+   queries; with prefetch the selection already started them in the background.
+   The frames must be identical.
+2. Caps: --users sessions each skim --skims publications in quick succession
+   while real reports run for other publications. The queued/running prefetch
+   tasks stay within the per-user and global caps, and the latency of the real
+   reports is compared with the same reports on an idle server.
+
+Usage:
+    python -m benchmarks.bench_prefetch [--items 4000] [--invoice-lines 400000] [--server-ms 20] [--think-ms 400]
+                                        [--users 12] [--skims 6]
+"""
+
+import argparse
+import datetime
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+import core.data_version as data_version_module
+import services.sales_boards_service as service_module
+from benchmarks.bench_data_version import SqliteManager
+from benchmarks.bench_incremental_refresh import shift_to_today
+from benchmarks.bench_partitioned_fetch import simulate_server
+from benchmarks.sales_query_equivalence import SCHEMA, seed
+from core.data_version import DataVersionProbe
+from core.disk_cache import DiskCache
+from core.prefetch import PrefetchScheduler
+from services.sales_boards_service import SALES_SOURCE_TABLES, SalesBoardsService
+
+YEAR = datetime.date.today().year
+POOL_SIZE = 4
+
+
+def split_publications(publications: list[str]) -> tuple[list[str], list[str], list[str]]:
+    """Publications clicked (1.), reported for real and skimmed (2.): up to 10, up to 10 and the rest."""
+    size = min(10, max(len(publications) // 3, 1))
+    clicked, real, skimmed = publications[:size], publications[size : 2 * size], publications[2 * size :]
+    # Poucas publicações (--items pequeno): as seleções repetem as publicações dos outros passos
+    return clicked, real, skimmed or publications
+
+
+def median_ms(timings: list[float]) -> str:
+    """Median of the timings in ms, '-' without timings."""
+    return f'{statistics.median(timings) * 1000:>6.0f} ms' if timings else f'{"-":>6}'
+
+
+def reset_caches(cache_dir: str):
+    """Empty memory and disk caches: every report starts from the database."""
+    SalesBoardsService.fetch_sales_year.clear()
+    service_module.disk_cache = DiskCache(cache_dir, max_bytes=2**30)
+
+
+def click_latency(publications: list[str], think_s: float, with_prefetch: bool) -> tuple[list[float], list]:
+    """Select, think, click: the time the click waits for the data of each publication."""
+    timings, frames = [], []
+    for publication in publications:
+        if with_prefetch:
+            SalesBoardsService.prefetch_sales_years(SCHEMA, publication, (YEAR - 1, YEAR), 'user')
+        time.sleep(think_s)
+        start = time.perf_counter()
+        frames.append(SalesBoardsService.fetch_sales_data(SCHEMA, publication, YEAR))
+        timings.append(time.perf_counter() - start)
+    return timings, frames
+
+
+def real_reports(publications: list[str]) -> list[float]:
+    """Reports requested with the button (no speculation), one after the other."""
+    timings = []
+    for publication in publications:
+        start = time.perf_counter()
+        SalesBoardsService.fetch_sales_data(SCHEMA, publication, YEAR)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def selection_flood(scheduler: PrefetchScheduler, publications: list[str], users: int, skims: int) -> dict:
+    """Every user selects `skims` publications 50 ms apart; returns the peaks of pending tasks."""
+    peaks = {'pending': 0, 'per_user': 0}
+    stop = threading.Event()
+
+    def sample():
+        while not stop.is_set():
+            with scheduler._lock:
+                peaks['pending'] = max(peaks['pending'], len(scheduler._tasks))
+                peaks['per_user'] = max([peaks['per_user'], *map(len, scheduler._user_keys.values())])
+            time.sleep(0.002)
+
+    def skim(user: int):
+        for n in range(skims):
+            publication = publications[(user * skims + n) % len(publications)]
+            SalesBoardsService.prefetch_sales_years(SCHEMA, publication, (YEAR - 1, YEAR), f'user{user}')
+            time.sleep(0.05)
+
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    threads = [threading.Thread(target=skim, args=(user,)) for user in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stop.set()
+    sampler.join()
+    return peaks
+
+
+def caps_under_flood(  # noqa: PLR0913, PLR0917
+    scheduler: PrefetchScheduler, real: list[str], skimmed: list[str], users: int, skims: int, tmp: str
+):
+    reset_caches(os.path.join(tmp, 'idle'))
+    idle = real_reports(real)
+
+    reset_caches(os.path.join(tmp, 'flood'))
+    peaks = {}
+    flood = threading.Thread(target=lambda: peaks.update(selection_flood(scheduler, skimmed, users, skims)))
+    flood.start()
+    loaded = real_reports(real)
+    flood.join()
+    scheduler.shutdown()
+
+    assert peaks['pending'] <= scheduler.max_pending, peaks
+    assert peaks['per_user'] <= scheduler.max_per_user, peaks
+    stats = scheduler.stats()
+    print(
+        f'\n{users} utilizadores x {skims} seleções: {stats["submitted"]} prefetch agendados, '
+        f'{stats["cancelled"]} substituídos, {stats["skipped"]} recusados'
+    )
+    print(
+        f'em fila/execução no pico: {peaks["pending"]} no total (limite {scheduler.max_pending}), '
+        f'{peaks["per_user"]} por utilizador (limite {scheduler.max_per_user})'
+    )
+    print(f'relatórios reais, servidor livre:     {median_ms(idle)} (mediana)')
+    print(f'relatórios reais, durante o prefetch: {median_ms(loaded)} (mediana)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=4_000)
+    parser.add_argument('--invoice-lines', type=int, default=400_000)
+    parser.add_argument('--server-ms', type=float, default=20)
+    parser.add_argument('--think-ms', type=float, default=400)
+    parser.add_argument('--users', type=int, default=12)
+    parser.add_argument('--skims', type=int, default=6)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sales.db')
+        connection = sqlite3.connect(path)
+        publications = seed(connection, args.items, args.invoice_lines)
+        shift_to_today(connection)
+        for table in SALES_SOURCE_TABLES:
+            connection.execute(f'ALTER TABLE {table} ADD COLUMN UPDDATTIM_0 TEXT')
+        connection.commit()
+        connection.close()
+
+        manager = SqliteManager(url=f'sqlite:///{path}', engine_options={'pool_size': POOL_SIZE, 'max_overflow': 0})
+        simulate_server(manager, args.server_ms)
+        service_module.db = manager
+        data_version_module.db = manager
+        service_module.data_version = DataVersionProbe(interval=0, tables=SALES_SOURCE_TABLES)
+        scheduler = PrefetchScheduler(max_workers=2, max_per_user=2, max_pending=8, busy=manager.pool_saturated)
+        service_module.prefetch = scheduler
+
+        # 1. Latência do clique
+        clicked, real, skimmed = split_publications(publications)
+        reset_caches(os.path.join(tmp, 'cold'))
+        cold, expected = click_latency(clicked, args.think_ms / 1000, with_prefetch=False)
+        reset_caches(os.path.join(tmp, 'prefetch'))
+        warm, frames = click_latency(clicked, args.think_ms / 1000, with_prefetch=True)
+        for frame, reference in zip(frames, expected):
+            pd.testing.assert_frame_equal(frame, reference)
+
+        print(
+            f'{len(clicked)} relatórios {YEAR - 1} vs {YEAR}, {args.think_ms:g} ms entre seleção e clique, dados iguais'
+        )
+        print(f'sem prefetch: clique espera {median_ms(cold)} (mediana)')
+        print(f'com prefetch: clique espera {median_ms(warm)} (mediana)')
+
+        # 2. Limites sob uma avalanche de seleções, com relatórios reais ao mesmo tempo
+        caps_under_flood(scheduler, real, skimmed, args.users, args.skims, tmp)
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+Perceived time of the two-year comparison: one blocking query versus the years loaded concurrently.
+
+A SQLite stand-in (sales_query_equivalence schema, dates moved to the current year)
+with a simulated server time per query (see bench_partitioned_fetch) serves the
+report of --publications titles with cold caches. The page before the progressive
+report ran one blocking query over both years and then built the table; the
+progressive page starts both years at once (fetch_sales_years_concurrently) and
+builds a table as soon as the first one arrives, then the full table. For
+reference, fetch_sales_data (both years in parallel, still blocking) is timed too.
+The full tables must match. Finally every report is started at once from its own
+session thread: the queries in flight must stay within max_parallel_queries.
+
+Usage:
+    python -m benchmarks.bench_progressive_report [--items 4000] [--invoice-lines 400000] [--publications 10]
+                                                  [--server-ms 20]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import as_completed
+from typing import Callable
+
+import pandas as pd
+from sqlalchemy import event
+
+import core.data_version as data_version_module
+import services.sales_boards_service as service_module
+from benchmarks.bench_data_version import SqliteManager
+from benchmarks.bench_incremental_refresh import shift_to_today
+from benchmarks.bench_partitioned_fetch import simulate_server
+from benchmarks.bench_prefetch import YEAR, reset_caches
+from benchmarks.sales_query_equivalence import SCHEMA, seed
+from core.data_version import DataVersionProbe
+from services.sales_boards_service import SALES_SOURCE_TABLES, SalesBoardsService
+from services.sales_queries import SALES_BY_ISSUE_SCHEMA, sales_by_issue_query
+
+
+def two_year_query(publication: str) -> pd.DataFrame:
+    """The previous fetch: one query over both years, not partitioned."""
+    params = {'pub_param': publication, 'start_date': f'{YEAR - 1}-01-01', 'end_date': f'{YEAR}-12-31'}
+    table = service_module.db.run_query_arrow(sales_by_issue_query(SCHEMA), params, schema=SALES_BY_ISSUE_SCHEMA)
+    return SalesBoardsService._sales_frame(table, params) if table.num_rows else pd.DataFrame()
+
+
+def blocking_report(fetch: Callable[[str], pd.DataFrame]) -> Callable:
+    """A page that waits for both years, then builds the table: first and full table at the same time."""
+
+    def report(publication: str) -> tuple[float, float, pd.DataFrame]:
+        start = time.perf_counter()
+        df, _, _ = SalesBoardsService.create_comparison_table(fetch(publication), YEAR)
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed, df
+
+    return report
+
+
+def progressive_report(publication: str) -> tuple[float, float, pd.DataFrame]:
+    """Progressive page: a table with the first year that arrives, then with both."""
+    start = time.perf_counter()
+    first = None
+    slices = {}
+    futures = SalesBoardsService.fetch_sales_years_concurrently(SCHEMA, publication, (YEAR - 1, YEAR))
+    for future in as_completed(futures.values()):
+        df_year = future.result()
+        if df_year.empty:
+            continue
+        slices[df_year['Year'].iat[0]] = df_year
+        raw_data = pd.concat([slices[year] for year in sorted(slices)], ignore_index=True)
+        df, _, _ = SalesBoardsService.create_comparison_table(raw_data, YEAR)
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start, df
+
+
+def check_bounded(manager: SqliteManager, publications: list[str]) -> int:
+    """Every report at once, one session thread each: peak of the queries in flight."""
+    lock = threading.Lock()
+    running = {'now': 0, 'peak': 0}
+
+    def started(*_):
+        with lock:
+            running['now'] += 1
+            running['peak'] = max(running['peak'], running['now'])
+
+    def finished(*_):
+        with lock:
+            running['now'] -= 1
+
+    event.listen(manager.engine, 'before_cursor_execute', started)
+    event.listen(manager.engine, 'after_cursor_execute', finished)
+    sessions = [threading.Thread(target=progressive_report, args=(publication,)) for publication in publications]
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+    event.remove(manager.engine, 'before_cursor_execute', started)
+    event.remove(manager.engine, 'after_cursor_execute', finished)
+
+    assert running['peak'] <= manager.max_parallel_queries, running
+    return running['peak']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=4_000)
+    parser.add_argument('--invoice-lines', type=int, default=400_000)
+    parser.add_argument('--publications', type=int, default=10)
+    parser.add_argument('--server-ms', type=float, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sales.db')
+        connection = sqlite3.connect(path)
+        publications = seed(connection, args.items, args.invoice_lines)[: args.publications]
+        shift_to_today(connection)
+        for table in SALES_SOURCE_TABLES:
+            connection.execute(f'ALTER TABLE {table} ADD COLUMN UPDDATTIM_0 TEXT')
+        connection.commit()
+        connection.close()
+
+        manager = SqliteManager(url=f'sqlite:///{path}')
+        simulate_server(manager, args.server_ms)
+        service_module.db = manager
+        data_version_module.db = manager
+        service_module.data_version = DataVersionProbe(interval=0, tables=SALES_SOURCE_TABLES)
+
+        results = {}
+        reports = (
+            ('query 2 anos', blocking_report(two_year_query)),
+            (
+                'fetch_sales_data',
+                blocking_report(lambda publication: SalesBoardsService.fetch_sales_data(SCHEMA, publication, YEAR)),
+            ),
+            ('progressivo', progressive_report),
+        )
+        for name, report in reports:
+            reset_caches(os.path.join(tmp, name))
+            results[name] = [report(publication) for publication in publications]
+
+        reset_caches(os.path.join(tmp, 'sessões'))
+        peak, max_parallel = check_bounded(manager, publications), manager.max_parallel_queries
+        manager.close()
+
+    for name in ('fetch_sales_data', 'progressivo'):
+        for (_, _, expected), (_, _, df) in zip(results['query 2 anos'], results[name]):
+            pd.testing.assert_frame_equal(expected, df)
+
+    print(f'{len(publications)} relatórios {YEAR - 1} vs {YEAR} com caches vazios, tabelas finais iguais (mediana)')
+    print(f'{"":<18}{"1ª tabela":>12}{"completa":>12}')
+    for name, timings in results.items():
+        first = statistics.median(first for first, _, _ in timings) * 1000
+        full = statistics.median(full for _, full, _ in timings) * 1000
+        print(f'{name:<18}{first:>9.0f} ms{full:>9.0f} ms')
+    print(f'{len(publications)} sessões ao mesmo tempo: no máximo {peak} queries em curso (limite {max_parallel})')
+
+
+if __name__ == '__main__':
+    main()
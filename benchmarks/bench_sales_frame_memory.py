@@ -0,0 +1,124 @@
+"""
+Memory used by the cached sales frames, previous layout versus the compact schema.
+
+Cursor rows shaped like the pyodbc result of sales_by_issue_query (quantities as
+Decimal, dates as datetime) are converted with DatabaseManager._arrow_batch, once
+with the previous wide schema (int64, object strings, datetime64[ns]) and once
+with SALES_BY_ISSUE_SCHEMA. Each frame stands for one (publication, year) cache
+entry; the report sums `memory_usage(deep=True)` over all the titles.
+
+Usage:
+    python -m benchmarks.bench_sales_frame_memory [--titles 300] [--issues 104]
+"""
+
+import argparse
+import datetime
+import time
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from core.database import DatabaseManager
+from services.sales_queries import SALES_BY_ISSUE_SCHEMA, UNSOLDS_DTYPE, sales_frame_from_arrow
+
+COLUMNS = ['Year', 'Issue', 'Date', 'Supply', 'Sales', 'Outlet']
+
+# Esquema anterior (antes dos tipos compactos)
+LEGACY_SCHEMA = pa.schema([
+    pa.field('Year', pa.int64()),
+    pa.field('Issue', pa.string()),
+    pa.field('Date', pa.timestamp('ns')),
+    pa.field('Supply', pa.int64()),
+    pa.field('Sales', pa.int64()),
+    pa.field('Outlet', pa.int64()),
+])
+
+
+def cursor_rows(issues: int, seed: int) -> list[tuple]:
+    """Two years of weekly issues, quantities as Numeric(28,13) Decimals."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for n in range(issues):
+        year = 2024 + n * 2 // issues
+        supply = int(rng.integers(500, 20_000))
+        sales = int(supply * rng.uniform(0.2, 0.9))
+        rows.append((
+            year,
+            str(1000 + n),
+            datetime.datetime(2024, 1, 1) + datetime.timedelta(days=7 * n),
+            Decimal(f'{supply}.0000000000000'),
+            Decimal(f'{sales}.0000000000000'),
+            int(rng.integers(100, 3_000)),
+        ))
+    return rows
+
+
+def legacy_frame(rows: list[tuple]) -> pd.DataFrame:
+    table = pa.Table.from_batches([DatabaseManager._arrow_batch(rows, COLUMNS, LEGACY_SCHEMA)])
+    df = table.to_pandas()
+    df['Unsolds'] = np.where(
+        df['Supply'] > 0,
+        np.ceil(((df['Supply'] - df['Sales']) / df['Supply']) * 100).astype(int),
+        0,
+    )
+    return df
+
+
+def compact_frame(rows: list[tuple]) -> pd.DataFrame:
+    table = pa.Table.from_batches([DatabaseManager._arrow_batch(rows, COLUMNS, SALES_BY_ISSUE_SCHEMA)])
+    df = sales_frame_from_arrow(table.drop_null())
+    supply = df['Supply'].to_numpy()
+    sales = df['Sales'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        unsold_perc = np.ceil(((supply - sales) / supply) * 100)
+    df['Unsolds'] = np.where(supply > 0, unsold_perc, 0).astype(UNSOLDS_DTYPE)
+    return df
+
+
+def build(convert, titles: list[list[tuple]]) -> tuple[list[pd.DataFrame], float]:
+    start = time.perf_counter()
+    frames = [convert(rows) for rows in titles]
+    return frames, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titles', type=int, default=300)
+    parser.add_argument('--issues', type=int, default=104)
+    args = parser.parse_args()
+
+    titles = [cursor_rows(args.issues, seed) for seed in range(args.titles)]
+
+    legacy, legacy_s = build(legacy_frame, titles)
+    compact, compact_s = build(compact_frame, titles)
+
+    # Mesmos valores, só muda a representação
+    sample_legacy, sample_compact = legacy[0], compact[0]
+    assert sample_legacy['Issue'].tolist() == sample_compact['Issue'].astype(str).tolist()
+    assert (sample_legacy['Date'].dt.date == sample_compact['Date'].dt.date).all()
+    for column in ('Year', 'Supply', 'Sales', 'Outlet', 'Unsolds'):
+        assert (sample_legacy[column].to_numpy() == sample_compact[column].to_numpy()).all(), column
+
+    print(f'{args.titles} títulos x {args.issues} edições\n')
+    print(f'{"column":<10} {"legacy dtype":<22} {"compact dtype":<22} {"legacy B/row":>13} {"compact B/row":>14}')
+    legacy_usage = sum(frame.memory_usage(deep=True, index=False) for frame in legacy)
+    compact_usage = sum(frame.memory_usage(deep=True, index=False) for frame in compact)
+    rows = args.titles * args.issues
+    for column in sample_legacy.columns:
+        print(
+            f'{column:<10} {str(sample_legacy[column].dtype):<22} {str(sample_compact[column].dtype):<22} '
+            f'{legacy_usage[column] / rows:>13.1f} {compact_usage[column] / rows:>14.1f}'
+        )
+
+    legacy_total = legacy_usage.sum() / 2**20
+    compact_total = compact_usage.sum() / 2**20
+    print(
+        f'\ntotal      legacy {legacy_total:.2f} MiB ({legacy_s:.2f} s)  '
+        f'compact {compact_total:.2f} MiB ({compact_s:.2f} s)  ratio {legacy_total / compact_total:.1f}x'
+    )
+
+
+if __name__ == '__main__':
+    main()
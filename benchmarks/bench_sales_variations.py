@@ -0,0 +1,88 @@
+"""
+Benchmark of the year-over-year variation pass of the Sales Boards comparison.
+
+Compares the previous `iterrows()` loop with the columnar engine in
+`utils.sales_metrics` over synthetic issue rows.
+
+Usage:
+    python -m benchmarks.bench_sales_variations [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.sales_metrics import compute_sales_variations
+
+MISSING_RATE = 0.05
+
+
+def build_frame(rows: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic merged frame with missing issues and zero sales on both sides."""
+    rng = np.random.default_rng(seed)
+    sales_prev = rng.integers(0, 5000, rows).astype(float)
+    sales_curr = rng.integers(0, 5000, rows).astype(float)
+    sales_prev[rng.random(rows) < MISSING_RATE] = np.nan
+    sales_curr[rng.random(rows) < MISSING_RATE] = np.nan
+    return pd.DataFrame({'Sales_prev': sales_prev, 'Sales_curr': sales_curr})
+
+
+def legacy_variations(df_full: pd.DataFrame) -> pd.DataFrame:
+    """The row-by-row implementation that was used before the columnar engine."""
+    df_full['Copies_var'] = pd.NA
+    df_full['%_var'] = pd.NA
+
+    for index, row in df_full.iterrows():
+        sales_prev = row['Sales_prev']
+        sales_curr = row['Sales_curr']
+
+        if pd.notna(sales_prev) and pd.notna(sales_curr):
+            copies_diff = sales_curr - sales_prev
+            df_full.at[index, 'Copies_var'] = copies_diff
+            percent_diff = copies_diff / sales_prev if sales_prev != 0 else 0.0
+            if pd.notna(percent_diff) and np.isfinite(percent_diff):
+                df_full.at[index, '%_var'] = percent_diff
+            else:
+                df_full.at[index, '%_var'] = pd.NA
+        else:
+            df_full.at[index, 'Copies_var'] = pd.NA
+            df_full.at[index, '%_var'] = pd.NA
+
+    return df_full
+
+
+def columnar_variations(df_full: pd.DataFrame) -> pd.DataFrame:
+    df_full['Copies_var'], df_full['%_var'] = compute_sales_variations(df_full['Sales_prev'], df_full['Sales_curr'])
+    return df_full
+
+
+def timed(func, df: pd.DataFrame) -> tuple[float, pd.DataFrame]:
+    start = time.perf_counter()
+    result = func(df.copy())
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f'{"rows":>10} {"legacy (s)":>12} {"columnar (s)":>14} {"speedup":>9}')
+    for rows in args.sizes:
+        df = build_frame(rows)
+        legacy_time, legacy = timed(legacy_variations, df)
+        columnar_time, columnar = timed(columnar_variations, df)
+
+        # Os dois caminhos têm de produzir os mesmos valores
+        pd.testing.assert_series_equal(
+            legacy['Copies_var'].astype('Float64'), columnar['Copies_var'].astype('Float64'), check_names=False
+        )
+        pd.testing.assert_series_equal(legacy['%_var'].astype('Float64'), columnar['%_var'], check_names=False)
+
+        print(f'{rows:>10} {legacy_time:>12.3f} {columnar_time:>14.4f} {legacy_time / columnar_time:>8.0f}x')
+
+
+if __name__ == '__main__':
+    main()
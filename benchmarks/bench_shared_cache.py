@@ -0,0 +1,69 @@
+"""
+Cache hit latency of st.cache_data versus core.shared_cache on a widget rerun.
+
+st.cache_data unpickles a new copy of the DataFrame on every hit; shared_cache
+returns the same read-only frame. Frames mimic fetch_sales_data results for a
+weekly title (104 rows), a daily title (730 rows) and a batch extract.
+
+Usage:
+    python -m benchmarks.bench_shared_cache [--rows 104 730 100000] [--hits 200]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.shared_cache import shared_cache
+
+
+def build_sales_frame(rows: int, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.arange(rows) % 730, unit='D')
+    supply = rng.integers(100, 5000, rows)
+    sales = (supply * rng.random(rows)).astype(int)
+    return pd.DataFrame({
+        'Year': dates.year,
+        'Issue': (np.arange(rows) % 365 + 1).astype(str),
+        'Date': dates,
+        'Supply': supply,
+        'Sales': sales,
+        'Outlet': rng.integers(0, 900, rows),
+        'Unsolds': np.ceil((supply - sales) / supply * 100).astype(int),
+    })
+
+
+def time_hits(func, rows: int, hits: int) -> float:
+    func(rows)  # preenche o cache
+    start = time.perf_counter()
+    for _ in range(hits):
+        func(rows)
+    return (time.perf_counter() - start) / hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[104, 730, 100_000])
+    parser.add_argument('--hits', type=int, default=200)
+    args = parser.parse_args()
+
+    @st.cache_data(ttl=600)
+    def with_cache_data(rows: int) -> pd.DataFrame:
+        return build_sales_frame(rows)
+
+    @shared_cache(ttl=600)
+    def with_shared_cache(rows: int) -> pd.DataFrame:
+        return build_sales_frame(rows)
+
+    print(f'{"rows":>8} {"st.cache_data (us)":>19} {"shared_cache (us)":>18} {"speedup":>9}')
+    for rows in args.rows:
+        before = time_hits(with_cache_data, rows, args.hits)
+        after = time_hits(with_shared_cache, rows, args.hits)
+        assert with_shared_cache(rows) is with_shared_cache(rows)
+        print(f'{rows:>8} {before * 1e6:>19.1f} {after * 1e6:>18.1f} {before / after:>8.0f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Supplier portfolio: one query per title versus one set-based query for the whole supplier.
+
+The sales_query_equivalence stand-in schema is seeded in SQLite with a ZPUBLIC table
+that gives the first --titles publications to one supplier. The previous way to review
+that supplier is one report per title (two yearly queries and the metrics of each year);
+the portfolio mode runs sales_by_supplier_query once and builds every title's totals,
+averages and variations in one grouped pass. Both must give the same numbers.
+
+Usage:
+    python -m benchmarks.bench_supplier_portfolio [--items 40000] [--invoice-lines 400000] [--titles 40]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+import services.sales_boards_service as service_module
+from benchmarks.bench_data_version import SqliteManager
+from benchmarks.sales_query_equivalence import SCHEMA, seed
+from services.sales_boards_service import SalesBoardsService
+
+SUPPLIER = 'SUP001'
+YEAR = 2024
+
+
+def add_suppliers(connection: sqlite3.Connection, publications: list[str], titles: int):
+    """ZPUBLIC with the first `titles` publications belonging to SUPPLIER and the others to another one."""
+    connection.execute('CREATE TABLE ZPUBLIC (CODPUB_0 TEXT, BPSREF_0 TEXT, DISTVSP_0 INTEGER)')
+    connection.executemany(
+        'INSERT INTO ZPUBLIC VALUES (?,?,2)',
+        [(publication, SUPPLIER if n < titles else 'SUP999') for n, publication in enumerate(publications)],
+    )
+    connection.commit()
+
+
+def per_title(publications: list[str]) -> dict[str, tuple]:
+    """One report per title: both years queried and measured separately."""
+    results = {}
+    for publication in publications:
+        totals = []
+        for year in (YEAR - 1, YEAR):
+            df = SalesBoardsService._query_sales_data(SCHEMA, publication, year)
+            metrics = SalesBoardsService.calculate_metrics(df, year) if not df.empty else {}
+            totals += [metrics.get('total_sales'), metrics.get('avg_sales')]
+        results[publication] = tuple(totals)
+    return results
+
+
+def portfolio() -> dict[str, tuple]:
+    """The portfolio mode: one query, one grouped pass."""
+    df = SalesBoardsService.fetch_supplier_sales.__wrapped__(SCHEMA, SUPPLIER, YEAR)
+    summary = SalesBoardsService.create_portfolio_summary(df, YEAR)
+    columns = [f'{metric}_{year - 2000}' for year in (YEAR - 1, YEAR) for metric in ('Sales', 'AvgSales')]
+    return {
+        row[0]: tuple(None if pd.isna(value) else int(value) for value in row[1:])
+        for row in summary[['Publication', *columns]].astype(object).itertuples(index=False)
+    }
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=40_000)
+    parser.add_argument('--invoice-lines', type=int, default=400_000)
+    parser.add_argument('--titles', type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sales.db')
+        connection = sqlite3.connect(path)
+        publications = seed(connection, args.items, args.invoice_lines)
+        add_suppliers(connection, publications, args.titles)
+        connection.close()
+
+        manager = SqliteManager(url=f'sqlite:///{path}')
+        service_module.db = manager
+
+        titles = publications[: args.titles]
+        per_title_s, expected = timed(per_title, titles)
+        portfolio_s, summary = timed(portfolio)
+        manager.close()
+
+    # Títulos sem vendas nos dois anos não aparecem no portfólio
+    expected = {publication: totals for publication, totals in expected.items() if any(totals)}
+    assert summary == expected, 'portfólio diferente dos relatórios por título'
+
+    print(f'{len(summary)} títulos de {SUPPLIER} ({YEAR - 1} vs {YEAR}), totais iguais.')
+    print(f'um relatório por título: {2 * len(titles):>3} queries  {per_title_s * 1000:>7.0f} ms')
+    print(f'portfólio:               {1:>3} query    {portfolio_s * 1000:>7.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
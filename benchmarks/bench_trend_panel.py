@@ -0,0 +1,65 @@
+"""
+Multi-year trend panel versus chaining the two-year comparison table.
+
+Builds N years of a title (weekly by default: 52 issues per year, ten years)
+in the compact sales layout and times create_trend_panel against the N - 1
+create_comparison_table calls that the same view would need otherwise. The
+yearly metrics of the panel must match calculate_metrics year by year.
+
+Usage:
+    python -m benchmarks.bench_trend_panel [--years 10] [--issues 52] [--repeat 20]
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.bench_sales_frame_memory import compact_frame, cursor_rows
+from services.sales_boards_service import SalesBoardsService
+
+
+def sales_years(first_year: int, years: int, issues: int) -> pd.DataFrame:
+    frames = []
+    for year in range(first_year, first_year + years):
+        rows = [(year, *row[1:]) for row in cursor_rows(issues, seed=year)]
+        frames.append(compact_frame(rows))
+    return pd.concat(frames, ignore_index=True)
+
+
+def best_ms(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--issues', type=int, default=52)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    years = list(range(2026 - args.years, 2026))
+    df = sales_years(years[0], args.years, args.issues)
+
+    panel, yearly = SalesBoardsService.create_trend_panel(df, years)
+    for year in years:
+        expected = SalesBoardsService.calculate_metrics(df[df['Year'] == year], year)
+        assert expected == {key: int(value) for key, value in yearly.loc[year].items()}, year
+
+    chained_ms = best_ms(
+        lambda: [SalesBoardsService.create_comparison_table(df, year) for year in years[1:]], args.repeat
+    )
+    panel_ms = best_ms(lambda: SalesBoardsService.create_trend_panel(df, years), args.repeat)
+
+    print(f'{args.years} anos x {args.issues} edições -> painel {panel.shape[0]} linhas x {panel.shape[1]} colunas')
+    print(f'comparações encadeadas: {chained_ms:7.1f} ms')
+    print(f'painel multi-ano:       {panel_ms:7.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Bytes sent to the browser per rerun and server time: the full comparison table versus one window.
+
+The comparison frame comes from create_comparison_table over --rows issues per year
+(bench_issue_alignment.batch_frames; daily titles and multi-publication views reach
+tens of thousands of rows). st.dataframe serializes the whole frame to Arrow on every
+rerun; windowed_dataframe sends one page plus the pinned totals/averages, and its
+filter and sort run on the server (window_order), computed once per frame and kept
+in the session. The orders must match pandas (stable sort, missing values last,
+case-insensitive text filter).
+
+Usage:
+    python -m benchmarks.bench_windowed_table [--rows 5000] [--repeat 7]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+
+from benchmarks.bench_issue_alignment import batch_frames
+from services.sales_boards_service import SalesBoardsService
+from utils.table_window import PAGE_SIZES, table_window, window_order
+
+YEAR = 2025
+HIDDEN = ['Year_prev', 'Year_curr']
+
+
+def comparison_frame(rows: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    prev, curr = batch_frames(rows)
+    # Um ano mais curto: as últimas linhas só têm o ano anterior
+    curr = curr.iloc[: rows - rows // 20]
+    df, prev_metrics, curr_metrics = SalesBoardsService.create_comparison_table(
+        pd.concat([prev, curr], ignore_index=True), YEAR
+    )
+    return df, SalesBoardsService.create_comparison_summary(prev_metrics, curr_metrics, YEAR)
+
+
+def pandas_order(df: pd.DataFrame, sort_by: str, descending: bool, query: str) -> np.ndarray:
+    """Reference: the same filter and sort with pandas."""
+    text = [column for column in df.columns if pd.api.types.is_string_dtype(df[column])]
+    mask = np.zeros(len(df), dtype=bool)
+    for column in text:
+        mask |= df[column].str.contains(query, case=False, regex=False).fillna(False).to_numpy(dtype=bool)
+    filtered = df.reset_index(drop=True)[mask]
+    return filtered.sort_values(sort_by, ascending=not descending, kind='stable', na_position='last').index.to_numpy()
+
+
+def check_orders(df: pd.DataFrame):
+    """Orders equal to pandas, with and without a filter."""
+    suffix = YEAR - 2000
+    for sort_by, descending, query in ((f'Sales_{suffix}', True, ''), ('%_var', False, '1'), ('Copies_var', True, '')):
+        expected = pandas_order(df, sort_by, descending, query)
+        np.testing.assert_array_equal(window_order(df, sort_by, descending, query), expected)
+
+
+def best_of(repeat: int, func) -> tuple[float, object]:
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5_000)
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+    page_size = PAGE_SIZES[0]
+
+    print(f'página de {page_size} linhas + totais/médias fixos (melhor de {args.repeat})')
+    print(
+        f'{"linhas":>8}{"completa":>12}{"janela":>10}{"serializar":>14}{"janela":>10}'
+        f'{"filtro+ordem":>15}{"em cache":>11}'
+    )
+    for rows in sorted({args.rows, args.rows * 10}):
+        df, summary = comparison_frame(rows)
+
+        check_orders(df)
+        full_time, full_bytes = best_of(args.repeat, lambda: convert_pandas_df_to_arrow_bytes(df.drop(columns=HIDDEN)))
+        order_key = (f'Sales_{YEAR - 2000}', True, '1')
+        order_time, order = best_of(args.repeat, lambda: window_order(df, *order_key))
+        cached = {order_key: order}
+        hit_time, _ = best_of(args.repeat, lambda: cached[order_key])
+
+        def window():
+            page = table_window(df, order, page_size, 2 * page_size).drop(columns=HIDDEN)
+            return len(convert_pandas_df_to_arrow_bytes(page)) + len(convert_pandas_df_to_arrow_bytes(summary))
+
+        window_time, window_bytes = best_of(args.repeat, window)
+        print(
+            f'{len(df):>8}{len(full_bytes) / 1024:>9.0f} KB{window_bytes / 1024:>7.0f} KB'
+            f'{full_time * 1000:>11.1f} ms{window_time * 1000:>7.1f} ms'
+            f'{order_time * 1000:>12.1f} ms{hit_time * 1e6:>8.1f} µs'
+        )
+
+
+if __name__ == '__main__':
+    main()
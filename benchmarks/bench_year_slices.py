@@ -0,0 +1,125 @@
+"""
+Queries needed by a browsing session, pair-level caching versus per-year slices.
+
+A SQLite stand-in (sales_query_equivalence schema) serves a session that opens
+the report of every year from 2021 to the current one for a set of publications,
+then compares 2024 against older years. With a cache per (year - 1, year) pair
+every report queries both years; with per-year slices each (publication, year)
+is read from the database once. The assembled frames must be identical. A slice
+whose query fails is not cached: it is read again once the database answers.
+
+Usage:
+    python -m benchmarks.bench_year_slices [--items 4000] [--invoice-lines 400000] [--publications 10]
+"""
+
+import argparse
+import datetime
+import os
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+import core.data_version as data_version_module
+import services.sales_boards_service as service_module
+from benchmarks.bench_data_version import SqliteManager, touch
+from benchmarks.bench_incremental_refresh import shift_to_today
+from benchmarks.sales_query_equivalence import SCHEMA, seed
+from core.data_version import DataVersionProbe
+from core.disk_cache import DiskCache
+from services.sales_boards_service import SALES_SOURCE_TABLES, SalesBoardsService
+
+
+class CountingManager(SqliteManager):
+    """Counts the sales queries sent to the stand-in database."""
+
+    queries = 0
+
+    def run_query_arrow(self, query, params=None, **kwargs):
+        CountingManager.queries += 1
+        return super().run_query_arrow(query, params, **kwargs)
+
+    def run_query_arrow_partitioned(self, query, params, partition='quarter', **kwargs):
+        CountingManager.queries += 1
+        return super().run_query_arrow_partitioned(query, params, partition, **kwargs)
+
+
+def session(publications: list[str]) -> list[tuple[str, tuple[int, ...]]]:
+    """The (publication, years) of each report opened in the session."""
+    today = datetime.date.today().year
+    reports = [(publication, (year - 1, year)) for publication in publications for year in range(2021, today + 1)]
+    reports += [(publication, (year, 2024)) for publication in publications for year in range(2021, 2024)]
+    return reports
+
+
+def pair_fetch(publication: str, years: tuple[int, ...]) -> pd.DataFrame:
+    """Previous behaviour: the report's years queried together, nothing shared between reports."""
+    frames = [SalesBoardsService._query_sales_data(SCHEMA, publication, year) for year in years]
+    frames = [df for df in frames if not df.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def run(fetch, reports) -> tuple[list[pd.DataFrame], int, float]:
+    CountingManager.queries = 0
+    start = time.perf_counter()
+    frames = [fetch(publication, years) for publication, years in reports]
+    return frames, CountingManager.queries, time.perf_counter() - start
+
+
+def check_failed_slice(path: str, cache_dir: str, publication: str, year: int):
+    """A failed query gives an empty slice that neither cache tier keeps."""
+    fetch_year = SalesBoardsService.fetch_sales_year
+    fetch_year.clear()
+    service_module.disk_cache = DiskCache(cache_dir, max_bytes=2**30)
+    touch(path, 'ALTER TABLE SINVOICED RENAME TO SINVOICED_OLD')
+    try:
+        assert fetch_year(SCHEMA, publication, year).empty
+    finally:
+        touch(path, 'ALTER TABLE SINVOICED_OLD RENAME TO SINVOICED')
+    assert not fetch_year.cached(SCHEMA, publication, year)
+    assert not fetch_year(SCHEMA, publication, year).empty
+    print(f'query falhada em {publication}/{year}: fatia vazia não guardada, lida de novo depois.')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=4_000)
+    parser.add_argument('--invoice-lines', type=int, default=400_000)
+    parser.add_argument('--publications', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sales.db')
+        connection = sqlite3.connect(path)
+        publications = seed(connection, args.items, args.invoice_lines)
+        shift_to_today(connection)
+        for table in SALES_SOURCE_TABLES:
+            connection.execute(f'ALTER TABLE {table} ADD COLUMN UPDDATTIM_0 TEXT')
+        connection.commit()
+        connection.close()
+
+        manager = CountingManager(url=f'sqlite:///{path}')
+        service_module.db = manager
+        data_version_module.db = manager
+        service_module.data_version = DataVersionProbe(interval=0, tables=SALES_SOURCE_TABLES)
+        service_module.disk_cache = DiskCache(os.path.join(tmp, 'cache'), max_bytes=2**30)
+
+        reports = session(publications[: args.publications])
+        pairs, pair_queries, pair_s = run(pair_fetch, reports)
+        slices, slice_queries, slice_s = run(
+            lambda publication, years: SalesBoardsService.fetch_sales_years(SCHEMA, publication, years), reports
+        )
+        check_failed_slice(path, os.path.join(tmp, 'cache-failure'), publications[0], 2024)
+        manager.close()
+
+    for pair, assembled in zip(pairs, slices):
+        pd.testing.assert_frame_equal(pair, assembled)
+
+    print(f'{len(reports)} relatórios, resultados idênticos.')
+    print(f'pares:        {pair_queries:>4} queries  {pair_s * 1000:>7.0f} ms')
+    print(f'fatias/ano:   {slice_queries:>4} queries  {slice_s * 1000:>7.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
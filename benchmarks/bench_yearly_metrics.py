@@ -0,0 +1,84 @@
+"""
+Yearly metrics: per-year copies and reductions versus a single grouped aggregation.
+
+The previous calculate_metrics copied the frame and ran eight reductions for each
+year, after create_comparison_table had copied each year out of the data. The
+script times that path against yearly_metrics over N years of weekly and daily
+titles, checks that both give the same metrics, and shows the cost of adding the
+extra statistics (median, min, max, std) to the same aggregation.
+
+Usage:
+    python -m benchmarks.bench_yearly_metrics [--years 10] [--repeat 20]
+"""
+
+import argparse
+import math
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_trend_panel import best_ms, sales_years
+from utils.sales_metrics import EXTRA_STATS, metrics_record, yearly_metrics
+
+
+def legacy_calculate_metrics(df: pd.DataFrame) -> dict[str, int]:
+    """calculate_metrics as it was: a full copy and one reduction per metric."""
+    df_processed = df[df.columns.tolist()].copy()
+
+    total_supply = df_processed['Supply'].sum()
+    total_sales = df_processed['Sales'].sum()
+    total_outlet = df_processed['Outlet'].sum()
+    total_unsold_perc = np.nan
+    if total_supply > 0:
+        total_unsold_perc = math.ceil((total_supply - total_sales) / total_supply * 100)
+
+    avg_supply = df_processed['Supply'].mean()
+    avg_sales = df_processed['Sales'].mean()
+    avg_outlet = df_processed['Outlet'].mean()
+    avg_unsold_perc = np.nan
+    if pd.notnull(avg_supply) and avg_supply > 0:
+        avg_unsold_perc = math.ceil((avg_supply - avg_sales) / avg_supply * 100)
+
+    return {
+        'total_supply': int(total_supply),
+        'total_sales': int(total_sales),
+        'total_outlet': int(total_outlet),
+        'total_unsold': int(total_unsold_perc),
+        'avg_supply': int(avg_supply),
+        'avg_sales': int(avg_sales),
+        'avg_outlet': int(avg_outlet),
+        'avg_unsold': int(avg_unsold_perc),
+    }
+
+
+def legacy_metrics(df: pd.DataFrame, years: list[int]) -> dict[int, dict[str, int]]:
+    """Each year copied out of the data (as create_comparison_table did) and then measured."""
+    return {year: legacy_calculate_metrics(df[df['Year'] == year].copy().reset_index(drop=True)) for year in years}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    years = list(range(2026 - args.years, 2026))
+    for label, issues in (('semanal', 52), ('diário', 310)):
+        df = sales_years(years[0], args.years, issues)
+
+        metrics = yearly_metrics(df)
+        grouped = {year: metrics_record(metrics, year) for year in years}
+        assert grouped == legacy_metrics(df, years), label
+
+        legacy_ms = best_ms(lambda: legacy_metrics(df, years), args.repeat)
+        grouped_ms = best_ms(lambda: yearly_metrics(df), args.repeat)
+        extra_ms = best_ms(lambda: yearly_metrics(df, extra=EXTRA_STATS), args.repeat)
+
+        print(f'{label} ({args.years} anos x {issues} edições, {len(df)} linhas), métricas iguais:')
+        print(f'  cópia + reduções por ano:  {legacy_ms:6.2f} ms')
+        print(f'  agregação única:           {grouped_ms:6.2f} ms')
+        print(f'  agregação única + {", ".join(EXTRA_STATS)}: {extra_ms:6.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
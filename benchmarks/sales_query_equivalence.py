@@ -0,0 +1,159 @@
+"""
+Checks that the restricted sales query returns exactly the same rows as the
+previous whole-history query, against a seeded SQLite stand-in schema.
+
+The T-SQL specific bits (NOLOCK hints, ISNULL, CONVERT, YEAR) are translated
+to their SQLite equivalents before execution; everything else runs as shipped.
+
+Usage:
+    python -m benchmarks.sales_query_equivalence [--items 20000] [--invoice-lines 400000]
+"""
+
+import argparse
+import datetime
+import re
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.sales_queries import sales_by_issue_query
+
+SCHEMA = 'main'
+
+LEGACY_QUERY = f"""
+        SELECT
+            YEAR(a.DISDAT_0) as Year,
+            a.NUMEDI_0 as Issue,
+            a.DISDAT_0 as Date,
+            a.QTYRREC_0 as Supply,
+            ((a.QTYREXP_0+ISNULL(CONVERT(int,b.QTY_0),0))-a.QTYRDEV_0) as Sales,
+            ISNULL(c.OUT,0) as Outlet
+        FROM {SCHEMA}.ZITMINP a WITH (NOLOCK)
+        LEFT JOIN (SELECT x.ITMREF_0,SUM(CASE WHEN y.INVTYP_0=2 THEN x.QTY_0*-1 ELSE x.QTY_0 END) AS QTY_0
+                FROM {SCHEMA}.SINVOICED x WITH (NOLOCK)
+                INNER JOIN {SCHEMA}.SINVOICE y WITH (NOLOCK) ON y.NUM_0=x.NUM_0
+                WHERE x.CPY_0='INP'
+                AND x.BPCINV_0 NOT IN (SELECT VALEUR_0 FROM {SCHEMA}.ADOVAL WITH (NOLOCK) WHERE PARAM_0='BPCINV')
+                GROUP BY x.ITMREF_0) b ON b.ITMREF_0=a.ITMREF_0
+        LEFT JOIN (SELECT ITMREF_0,COUNT(1) AS OUT FROM {SCHEMA}.ZBPCEST GROUP BY ITMREF_0) c ON c.ITMREF_0=a.ITMREF_0
+        WHERE a.DISTVSP_0=2
+        AND a.PERNUM_0>1
+        AND a.CODPUB_0=:pub_param
+        AND a.DISDAT_0 BETWEEN :start_date AND :end_date
+        ORDER BY a.DISDAT_0,a.NUMEDI_0
+        """
+
+
+def to_sqlite(query: str) -> str:
+    """Translates the T-SQL constructs used by the sales query to SQLite."""
+    query = query.replace(' WITH (NOLOCK)', '')
+    query = query.replace('ISNULL(', 'IFNULL(')
+    query = re.sub(r'CONVERT\(int,([^)]+)\)', r'CAST(\1 AS INTEGER)', query)
+    return re.sub(r'YEAR\(([^)]+)\)', r"CAST(strftime('%Y', \1) AS INTEGER)", query)
+
+
+def seed(connection: sqlite3.Connection, items: int, invoice_lines: int, seed_value: int = 7):
+    """Creates and fills the stand-in tables with random but reproducible volumes."""
+    rng = np.random.default_rng(seed_value)
+    connection.executescript(
+        """
+        CREATE TABLE ZITMINP (ITMREF_0 TEXT, CODPUB_0 TEXT, DISTVSP_0 INTEGER, PERNUM_0 INTEGER,
+                              NUMEDI_0 TEXT, DISDAT_0 TEXT, QTYRREC_0 INTEGER, QTYREXP_0 INTEGER, QTYRDEV_0 INTEGER);
+        CREATE TABLE SINVOICE (NUM_0 TEXT, INVTYP_0 INTEGER);
+        CREATE TABLE SINVOICED (NUM_0 TEXT, ITMREF_0 TEXT, CPY_0 TEXT, BPCINV_0 TEXT, QTY_0 INTEGER);
+        CREATE TABLE ADOVAL (PARAM_0 TEXT, VALEUR_0 TEXT);
+        CREATE TABLE ZBPCEST (ITMREF_0 TEXT);
+        CREATE INDEX ZITMINP_PUB ON ZITMINP (CODPUB_0, DISDAT_0);
+        CREATE INDEX SINVOICED_ITM ON SINVOICED (ITMREF_0);
+        CREATE INDEX SINVOICE_NUM ON SINVOICE (NUM_0);
+        CREATE INDEX ZBPCEST_ITM ON ZBPCEST (ITMREF_0);
+        """
+    )
+
+    publications = [f'PUB{n:03d}' for n in range(max(items // 100, 1))]
+    first_day = datetime.date(2020, 1, 1)
+    connection.executemany(
+        'INSERT INTO ZITMINP VALUES (?,?,?,?,?,?,?,?,?)',
+        [
+            (
+                f'ITM{n:06d}',
+                publications[n % len(publications)],
+                int(rng.choice([1, 2], p=[0.1, 0.9])),
+                int(rng.integers(0, 4)),
+                str(n // len(publications)),
+                (first_day + datetime.timedelta(days=int(rng.integers(0, 6 * 365)))).isoformat(),
+                int(rng.integers(0, 5000)),
+                int(rng.integers(0, 3000)),
+                int(rng.integers(0, 1000)),
+            )
+            for n in range(items)
+        ],
+    )
+
+    invoices = invoice_lines // 10 or 1
+    connection.executemany(
+        'INSERT INTO SINVOICE VALUES (?,?)', [(f'INV{n:07d}', int(rng.integers(1, 3))) for n in range(invoices)]
+    )
+    connection.executemany(
+        'INSERT INTO SINVOICED VALUES (?,?,?,?,?)',
+        [
+            (
+                f'INV{int(rng.integers(0, invoices)):07d}',
+                f'ITM{int(rng.integers(0, items)):06d}',
+                str(rng.choice(['INP', 'OTH'], p=[0.9, 0.1])),
+                f'C{int(rng.integers(0, 50)):02d}',
+                int(rng.integers(1, 200)),
+            )
+            for _ in range(invoice_lines)
+        ],
+    )
+    connection.executemany('INSERT INTO ADOVAL VALUES (?,?)', [('BPCINV', f'C{n:02d}') for n in range(5)])
+    connection.executemany(
+        'INSERT INTO ZBPCEST VALUES (?)', [(f'ITM{int(rng.integers(0, items)):06d}',) for _ in range(items * 5)]
+    )
+    connection.commit()
+    return publications
+
+
+def run(connection: sqlite3.Connection, query: str, params: dict) -> tuple[float, pd.DataFrame]:
+    start = time.perf_counter()
+    df = pd.read_sql_query(to_sqlite(query), connection, params=params)
+    return time.perf_counter() - start, df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=20_000)
+    parser.add_argument('--invoice-lines', type=int, default=400_000)
+    parser.add_argument('--reports', type=int, default=20, help='Number of (publication, year) pairs to compare.')
+    args = parser.parse_args()
+
+    connection = sqlite3.connect(':memory:')
+    publications = seed(connection, args.items, args.invoice_lines)
+    print(f'Seeded {args.items} issues, {args.invoice_lines} invoice lines, {len(publications)} publications.')
+
+    rng = np.random.default_rng(11)
+    legacy_total = restricted_total = 0.0
+    rows = 0
+    for _ in range(args.reports):
+        year = int(rng.integers(2021, 2026))
+        params = {
+            'pub_param': str(rng.choice(publications)),
+            'start_date': f'{year - 1}-01-01',
+            'end_date': f'{year}-12-31',
+        }
+        legacy_time, legacy = run(connection, LEGACY_QUERY, params)
+        restricted_time, restricted = run(connection, sales_by_issue_query(SCHEMA), params)
+        pd.testing.assert_frame_equal(legacy, restricted)
+        legacy_total += legacy_time
+        restricted_total += restricted_time
+        rows += len(restricted)
+
+    print(f'{args.reports} reports identical ({rows} rows).')
+    print(f'legacy: {legacy_total:.3f}s  restricted: {restricted_total:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+import hashlib
+import logging
+import threading
+from types import MappingProxyType
+from typing import Callable, Hashable, Iterable, Mapping, Optional
+
+import streamlit as st
+
+from core.database import db
+from core.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Tabelas de origem dos dados em cache (todas com UPDDATTIM_0 do AuditMixin)
+SOURCE_TABLES = ('ZPUBLIC', 'BPARTNER', 'ZITMINP', 'SINVOICE', 'ZBPCEST')
+
+
+def version_query(schema: str, tables: Iterable[str] = SOURCE_TABLES) -> str:
+    """
+    Builds the probe query: last update and row count of each source table, in one round trip.
+    The count catches deleted rows, which do not move MAX(UPDDATTIM_0).
+    Args:
+        schema (str): The database schema to query.
+        tables (Iterable[str]): Source tables to probe.
+    Returns:
+        str: SQL text returning (TableName, LastUpdate, RowsCount) per table.
+    """
+
+    return '\nUNION ALL\n'.join(
+        f"SELECT '{table}' AS TableName, MAX(UPDDATTIM_0) AS LastUpdate, COUNT(1) AS RowsCount "
+        f'FROM {schema}.{table} WITH (NOLOCK)'
+        for table in tables
+    )
+
+
+class DataVersionProbe:
+    """
+    Tracks the version of the source tables of each schema with a cheap MAX/COUNT probe.
+    Caches compare the version their entry was built from with the current one and reload only
+    when a source table changed, instead of expiring on a fixed TTL. The probe runs on a
+    background task every `interval` seconds (and once, synchronously, the first time a schema
+    is read); listeners are notified of the tables that changed.
+    """
+
+    def __init__(self, interval: float, tables: tuple[str, ...] = SOURCE_TABLES):
+        self.interval = interval
+        self.tables = tables
+        # schema -> {tabela: (último UPDDATTIM_0, número de linhas)}
+        self._versions: dict[str, Mapping[str, tuple]] = {}
+        self._listeners: list[tuple[frozenset[str], Callable[[str], None]]] = []
+        self._single_flight = SingleFlight()
+
+        self._probe_lock = threading.Lock()
+        self._probe_thread: Optional[threading.Thread] = None
+        self._probe_stop = threading.Event()
+
+    def get(self, schema: str, tables: Iterable[str]) -> tuple:
+        """
+        Returns the current version of `tables` in `schema` (a memory read once the schema is known).
+        Args:
+            schema (str): The database schema.
+            tables (Iterable[str]): Source tables of the cached result.
+        Returns:
+            tuple: One version per table; equal tuples mean the data did not change.
+        """
+        versions = self._versions.get(schema)
+        if versions is None:
+            versions, _ = self._single_flight.do(('data_version', schema), lambda: self.probe(schema))
+            self.start()
+        return tuple(versions.get(table) for table in tables)
+
+    def of(self, *tables: str) -> Callable[..., tuple]:
+        """
+        Returns a version function for shared_cache(version=...): it takes the arguments of the
+        cached function, whose first one must be the schema.
+        """
+        return lambda schema, *args, **kwargs: self.get(schema, tables)
+
+    def subscribe(self, tables: Iterable[str], callback: Callable[[str], None]):
+        """Calls `callback(schema)` from the probe task whenever one of `tables` changes."""
+        self._listeners.append((frozenset(tables), callback))
+
+    def probe(self, schema: str) -> Mapping[str, tuple]:
+        """
+        Queries the versions of `schema` and notifies the listeners of the changed tables.
+        If the probe fails, the previous versions are kept (the caches stay valid and no listener
+        is called); a failed first probe is not stored, the next read of the schema tries again.
+        Errors are only logged: the probe also runs on the background task, outside any session.
+        """
+        previous = self._versions.get(schema)
+        try:
+            df = db.run_query(version_query(schema, self.tables), raise_errors=True)
+            if df.empty:
+                raise RuntimeError('a query de versões não devolveu linhas')
+            versions = MappingProxyType({
+                row.TableName: (row.LastUpdate, int(row.RowsCount)) for row in df.itertuples(index=False)
+            })
+        except Exception as e:
+            logger.warning(f'Falha na verificação de versões de {schema}, mantêm-se as anteriores: {e}')
+            return previous if previous is not None else MappingProxyType({})
+
+        self._versions[schema] = versions
+
+        if previous is not None:
+            changed = {table for table in self.tables if versions.get(table) != previous.get(table)}
+            if changed:
+                logger.info(f'Dados alterados em {schema}: {", ".join(sorted(changed))}.')
+                self._notify(schema, changed)
+        return versions
+
+    def _notify(self, schema: str, changed: set[str]):
+        for tables, callback in self._listeners:
+            if tables & changed:
+                try:
+                    callback(schema)
+                except Exception as e:
+                    logger.error(f'Erro ao invalidar cache após alteração em {schema}: {e}', exc_info=True)
+
+    def start(self):
+        """Starts the background probe task, if not running (interval <= 0 disables it)."""
+        if self.interval <= 0:
+            return
+        with self._probe_lock:
+            if self._probe_thread is not None:
+                return
+            self._probe_stop.clear()
+            self._probe_thread = threading.Thread(target=self._probe_loop, name='data-version-probe', daemon=True)
+            self._probe_thread.start()
+        logger.info(f'Verificação de versões dos dados a cada {self.interval} s.')
+
+    def stop(self):
+        """Stops the background probe task, if running."""
+        with self._probe_lock:
+            thread, self._probe_thread = self._probe_thread, None
+        if thread is not None:
+            self._probe_stop.set()
+            thread.join(timeout=5)
+
+    def _probe_loop(self):
+        while not self._probe_stop.wait(self.interval):
+            for schema in list(self._versions):
+                self.probe(schema)
+
+
+def version_token(version: Hashable) -> str:
+    """Short, file-name friendly form of a version (used in disk cache keys)."""
+    return hashlib.sha1(repr(version).encode('utf-8')).hexdigest()[:12]
+
+
+cache_config = st.secrets.get('cache', {})
+
+data_version = DataVersionProbe(interval=float(cache_config.get('version_probe_interval', 60)))
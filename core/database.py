@@ -1,38 +1,201 @@
+import datetime
 import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Generator, Optional
+from typing import Callable, Generator, Iterable, Iterator, Optional, TypeVar, Union
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import streamlit as st
-from sqlalchemy import create_engine, text
+from sqlalchemy import Connection, create_engine, text
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, sessionmaker
 
+from core.query_log import SlowQueryLog, set_row_count
+from core.single_flight import SingleFlight
 from utils.generics import Generics
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+R = TypeVar('R')
+
+# Partições de um intervalo de datas: {nome: meses por partição}
+PARTITION_MONTHS = {'month': 1, 'quarter': 3}
+
+
+def date_partitions(
+    start: datetime.date, end: datetime.date, partition: str
+) -> list[tuple[datetime.date, datetime.date]]:
+    """
+    Splits the inclusive range [start, end] into calendar months or quarters.
+    Args:
+        start (datetime.date): First day of the range.
+        end (datetime.date): Last day of the range.
+        partition (str): 'month' or 'quarter'.
+    Returns:
+        list: Contiguous, non-overlapping (first day, last day) pairs in chronological order;
+        the first and last ones are clipped to the range.
+    """
+    months = PARTITION_MONTHS[partition]
+
+    partitions = []
+    first = start
+    while first <= end:
+        # Início da partição seguinte: primeiro dia do próximo mês/trimestre do calendário
+        month_index = first.year * 12 + first.month - 1
+        next_index = (month_index // months + 1) * months
+        following = datetime.date(next_index // 12, next_index % 12 + 1, 1)
+        partitions.append((first, min(following - datetime.timedelta(days=1), end)))
+        first = following
+    return partitions
+
 
 class DatabaseManager:
     """Database session manager."""
 
-    def __init__(self, url: str, echo: bool = False):
-        """Initialize the database session manager."""
-        self.engine = create_engine(url, echo=echo)
+    def __init__(
+        self,
+        url: str,
+        echo: bool = False,
+        engine_options: Optional[dict] = None,
+        checkout_warn_ms: float = 200,
+        max_parallel_queries: int = 4,
+    ):
+        """
+        Initialize the database session manager.
+
+        Args:
+            url (str): The database URL.
+            echo (bool): Log every SQL statement issued by the engine.
+            engine_options (dict, optional): Pool options for create_engine (pool_size, max_overflow,
+                pool_timeout, pool_recycle, pool_pre_ping, fast_executemany).
+            checkout_warn_ms (float): Pool checkout waits above this are logged as warnings.
+            max_parallel_queries (int): Partitions of run_query_arrow_partitioned executed at the
+                same time (1 runs them one after the other). Keep it within the pool size.
+        """
+        self.engine = create_engine(url, echo=echo, **(engine_options or {}))
         self.SessionLocal = sessionmaker(
             bind=self.engine,
             autoflush=False,
             autocommit=False,
         )
+        # Queries idênticas em simultâneo partilham uma única execução
+        self.single_flight = SingleFlight()
+
+        # Tempos de espera no checkout do pool, para dimensionar o pool com dados reais
+        self.checkout_warn_ms = checkout_warn_ms
+        self._checkout_lock = threading.Lock()
+        self._checkout_count = 0
+        self._checkout_total_ms = 0.0
+        self._checkout_max_ms = 0.0
+
+        self._keep_warm_thread: Optional[threading.Thread] = None
+        self._keep_warm_stop = threading.Event()
+
+        # Pool de threads das queries particionadas, criado no primeiro uso
+        self.max_parallel_queries = max(int(max_parallel_queries), 1)
+        self._partition_executor: Optional[ThreadPoolExecutor] = None
+        self._partition_executor_lock = threading.Lock()
 
     # close connection
     def close(self):
         """Dispose of the engine connections."""
+        self.stop_keep_warm()
+        if self._partition_executor is not None:
+            self._partition_executor.shutdown(wait=True)
+            self._partition_executor = None
         if self.engine:
             self.engine.dispose()
             logger.info('Database engine disposed.')
 
+    def _connect(self) -> Connection:
+        """Checks out a connection from the pool, recording how long the checkout waited."""
+        start = time.perf_counter()
+        connection = self.engine.connect()
+        wait_ms = (time.perf_counter() - start) * 1000
+
+        with self._checkout_lock:
+            self._checkout_count += 1
+            self._checkout_total_ms += wait_ms
+            self._checkout_max_ms = max(self._checkout_max_ms, wait_ms)
+
+        if wait_ms >= self.checkout_warn_ms:
+            logger.warning(f'Checkout do pool demorou {wait_ms:.0f} ms. {self.engine.pool.status()}')
+        else:
+            logger.debug(f'Checkout do pool em {wait_ms:.1f} ms.')
+        return connection
+
+    def pool_saturated(self) -> bool:
+        """True when every connection of the pool (overflow excluded) is checked out."""
+        pool = self.engine.pool
+        if not hasattr(pool, 'size'):
+            return False
+        return pool.checkedout() >= pool.size()
+
+    def pool_stats(self) -> dict:
+        """Returns the pool checkout statistics and the current pool status."""
+        with self._checkout_lock:
+            count = self._checkout_count
+            return {
+                'checkouts': count,
+                'avg_wait_ms': round(self._checkout_total_ms / count, 2) if count else 0.0,
+                'max_wait_ms': round(self._checkout_max_ms, 2),
+                'status': self.engine.pool.status(),
+            }
+
+    def start_keep_warm(self, connections: int, interval: float):
+        """
+        Starts a background task that keeps `connections` pooled connections open and validated,
+        so the first report after an idle period does not hit connections dropped by the firewall.
+
+        Args:
+            connections (int): Number of connections to keep warm (0 disables the task).
+            interval (float): Seconds between two cycles.
+        """
+        if connections <= 0 or self._keep_warm_thread is not None:
+            return
+
+        self._keep_warm_stop.clear()
+        self._keep_warm_thread = threading.Thread(
+            target=self._keep_warm_loop, args=(connections, interval), name='db-keep-warm', daemon=True
+        )
+        self._keep_warm_thread.start()
+        logger.info(f'Tarefa keep-warm iniciada: {connections} conexões a cada {interval} s.')
+
+    def stop_keep_warm(self):
+        """Stops the keep-warm task, if running."""
+        if self._keep_warm_thread is None:
+            return
+        self._keep_warm_stop.set()
+        self._keep_warm_thread.join(timeout=5)
+        self._keep_warm_thread = None
+
+    def _keep_warm_loop(self, connections: int, interval: float):
+        while True:
+            self._warm_connections(connections)
+            if self._keep_warm_stop.wait(interval):
+                break
+
+    def _warm_connections(self, connections: int):
+        """Checks out `connections` connections at once, pings them and returns them to the pool."""
+        held = []
+        try:
+            for _ in range(connections):
+                connection = self._connect()
+                held.append(connection)
+                connection.execute(text('SELECT 1'))
+        except SQLAlchemyError as e:
+            logger.warning(f'Keep-warm não conseguiu validar as conexões: {e}')
+        finally:
+            for connection in held:
+                connection.close()
+        logger.info(f'Pool de conexões: {self.pool_stats()}')
+
     @contextmanager
     def get_db(self) -> Generator[Session, None, None]:
         """Provides a database session within a context."""
@@ -63,52 +226,380 @@ class DatabaseManager:
             logger.error(f'Session rollback due to error: {e}', exc_info=True)
             raise
 
-    def run_query(self, query: str, params: Optional[dict] = None) -> pd.DataFrame:
+    def run_query(self, query: str, params: Optional[dict] = None, raise_errors: bool = False) -> pd.DataFrame:
         """
         Executes an SQL query on the database and returns the result as a Pandas DataFrame.
-        This function caches the results for 10 minutes to improve performance.
+        Identical queries running at the same time share a single execution.
 
         Args:
             query (str): The SQL query string to be executed.
             params (dict, optional): Dictionary of parameters for the query. Defaults to None.
+            raise_errors (bool): Log and raise errors instead of showing them with st.error and
+                returning an empty DataFrame (for callers that must tell a failure from no rows,
+                and for background threads without a Streamlit session).
 
         Returns:
             pd.DataFrame: DataFrame with the query results or an empty DataFrame in case of an error.
         """
         if not self.engine:
             logger.error('Database engine is not initialized.')
+            if raise_errors:
+                raise RuntimeError('Database engine is not initialized.')
             st.error('Erro ao conectar ao banco de dados. Verifique os logs.')
             return pd.DataFrame()
 
-        logger.debug(f'Executing Core query: {query} with params: {params}')
-        logger.info(f'Executando query: {query[:50]}...')  # Log truncado da query
+        logger.debug(f'Executando query: {query[:50]}...')  # Texto completo e tempos no slow query log
 
         try:
-            with self.engine.connect() as connection:
-                # Usar text() para queries parametrizadas com segurança (evita SQL Injection)
-                sql_text = connection.execute(text(query), params if params else {})
-                df = pd.DataFrame(sql_text.fetchall(), columns=sql_text.keys())  # type: ignore
-                logger.info(f'Query executada com sucesso. Retornadas {len(df)} linhas.')
-                return df
+            # Cada chamador em espera recebe a sua cópia, feita antes de o resultado ser publicado
+            df, _ = self.single_flight.do(
+                SingleFlight.query_key(query, params, 'frame'),
+                lambda: self._fetch_frame(query, params),
+                copy=pd.DataFrame.copy,
+            )
+            logger.debug(f'Query executada com sucesso. Retornadas {len(df)} linhas.')
+            return df
         except SQLAlchemyError as e:
             logger.error(f'Erro ao executar query com SQLAlchemy Core: {e}', exc_info=True)
+            if raise_errors:
+                raise
             st.error(f'Erro de banco de dados ao executar a query (Core): {e}')
             return pd.DataFrame()
         except Exception as e:
             logger.error(f'Erro inesperado ao executar query (Core): {e}', exc_info=True)
+            if raise_errors:
+                raise
             st.error(f'Erro inesperado durante a consulta ao banco (Core): {e}')
             return pd.DataFrame()
 
+    def run_query_arrow(
+        self,
+        query: str,
+        params: Optional[dict] = None,
+        schema: Optional[pa.Schema] = None,
+        batch_rows: int = 10_000,
+        raise_errors: bool = False,
+    ) -> pa.Table:
+        """
+        Executes an SQL query and returns the result as a typed pyarrow Table.
+        Rows are read from the DBAPI cursor in batches and each batch is converted column by
+        column straight into Arrow arrays, so no intermediate DataFrame or re-parsing is needed.
+        Identical queries running at the same time share a single execution.
+
+        Args:
+            query (str): The SQL query string to be executed.
+            params (dict, optional): Dictionary of parameters for the query. Defaults to None.
+            schema (pa.Schema, optional): Expected Arrow types by column name. Columns not in
+                the schema have their type inferred. Defaults to None.
+            batch_rows (int): Number of rows fetched from the cursor per batch.
+            raise_errors (bool): Log and raise errors instead of showing them with st.error and
+                returning an empty Table (see run_query).
+
+        Returns:
+            pa.Table: Table with the query results or an empty Table in case of an error.
+        """
+        empty_table = schema.empty_table() if schema is not None else pa.table({})
+
+        if not self.engine:
+            logger.error('Database engine is not initialized.')
+            if raise_errors:
+                raise RuntimeError('Database engine is not initialized.')
+            st.error('Erro ao conectar ao banco de dados. Verifique os logs.')
+            return empty_table
+
+        logger.debug(f'Executando query (Arrow): {query[:50]}...')
+
+        try:
+            # pa.Table é imutável, pode ser partilhada tal como está
+            table, _ = self.single_flight.do(
+                SingleFlight.query_key(query, params, 'arrow', str(schema)),
+                lambda: self._fetch_arrow(query, params, schema, batch_rows),
+            )
+            logger.debug(f'Query executada com sucesso. Retornadas {table.num_rows} linhas.')
+            return table
+        except SQLAlchemyError as e:
+            logger.error(f'Erro ao executar query (Arrow): {e}', exc_info=True)
+            if raise_errors:
+                raise
+            st.error(f'Erro de banco de dados ao executar a query (Arrow): {e}')
+            return empty_table
+        except Exception as e:
+            logger.error(f'Erro inesperado ao executar query (Arrow): {e}', exc_info=True)
+            if raise_errors:
+                raise
+            st.error(f'Erro inesperado durante a consulta ao banco (Arrow): {e}')
+            return empty_table
+
+    def run_query_arrow_partitioned(  # noqa: PLR0913, PLR0917
+        self,
+        query: str,
+        params: dict,
+        partition: str = 'quarter',
+        schema: Optional[pa.Schema] = None,
+        batch_rows: int = 10_000,
+        raise_errors: bool = False,
+    ) -> pa.Table:
+        """
+        Executes a date-bounded query as one query per month or quarter of its range, at most
+        max_parallel_queries at a time on their own pooled connections, and concatenates the
+        partial results in chronological partition order. The Arrow concatenation only links
+        the record batches of the partitions, the data is not copied.
+        Rows keep the ORDER BY of the query within each partition: a query ordered by date
+        first gives the same order as run_query_arrow.
+
+        Args:
+            query (str): SQL bounded by the inclusive `:start_date` and `:end_date` parameters.
+            params (dict): Query parameters, with the full range in 'start_date' and 'end_date'
+                ('YYYY-MM-DD' strings or dates).
+            partition (str): 'month' or 'quarter'.
+            schema (pa.Schema, optional): Expected Arrow types by column name. Defaults to None.
+            batch_rows (int): Number of rows fetched from the cursor per batch.
+            raise_errors (bool): Log and raise errors instead of showing them with st.error and
+                returning an empty Table (see run_query).
+
+        Returns:
+            pa.Table: Table with the query results or an empty Table in case of an error.
+        """
+        empty_table = schema.empty_table() if schema is not None else pa.table({})
+
+        if not self.engine:
+            logger.error('Database engine is not initialized.')
+            if raise_errors:
+                raise RuntimeError('Database engine is not initialized.')
+            st.error('Erro ao conectar ao banco de dados. Verifique os logs.')
+            return empty_table
+
+        ranges = date_partitions(
+            datetime.date.fromisoformat(str(params['start_date'])),
+            datetime.date.fromisoformat(str(params['end_date'])),
+            partition,
+        )
+        partition_params = [
+            {**params, 'start_date': first.strftime('%Y-%m-%d'), 'end_date': last.strftime('%Y-%m-%d')}
+            for first, last in ranges
+        ]
+        logger.debug(f'Executando query em {len(ranges)} partições ({partition}): {query[:50]}...')
+
+        try:
+            table, _ = self.single_flight.do(
+                SingleFlight.query_key(query, params, 'arrow', str(schema), partition),
+                lambda: self._fetch_arrow_partitions(query, partition_params, schema, batch_rows),
+            )
+            logger.debug(f'Query particionada executada com sucesso. Retornadas {table.num_rows} linhas.')
+            return table
+        except SQLAlchemyError as e:
+            logger.error(f'Erro ao executar query particionada: {e}', exc_info=True)
+            if raise_errors:
+                raise
+            st.error(f'Erro de banco de dados ao executar a query (partições): {e}')
+            return empty_table
+        except Exception as e:
+            logger.error(f'Erro inesperado ao executar query particionada: {e}', exc_info=True)
+            if raise_errors:
+                raise
+            st.error(f'Erro inesperado durante a consulta ao banco (partições): {e}')
+            return empty_table
+
+    def _fetch_arrow_partitions(
+        self, query: str, partition_params: list[dict], schema: Optional[pa.Schema], batch_rows: int
+    ) -> pa.Table:
+        """Runs the partitions on the bounded pool and concatenates them in order (errors are raised)."""
+        tables = self.map_bounded(lambda params: self._fetch_arrow(query, params, schema, batch_rows), partition_params)
+        return pa.concat_tables(tables, promote_options='default')
+
+    def map_bounded(self, func: Callable[[T], R], items: Iterable[T]) -> list[R]:
+        """
+        Calls `func` on each item on the bounded pool of the partitioned queries, so that at most
+        max_parallel_queries run at a time for the whole process (serially with a single item or
+        max_parallel_queries=1). `func` must not wait on the pool itself (e.g. a partitioned query).
+        Args:
+            func (Callable): Function of one item, typically running one query.
+            items (Iterable): The items.
+        Returns:
+            list: The results in the order of `items`; the first exception is raised to the caller.
+        """
+        items = list(items)
+        if len(items) <= 1 or self.max_parallel_queries == 1:
+            return [func(item) for item in items]
+        # map devolve os resultados pela ordem dos itens; a primeira exceção sobe para o chamador
+        return list(self._get_partition_executor().map(func, items))
+
+    def submit_bounded(self, func: Callable[..., R], *args) -> Future:
+        """
+        Schedules func(*args) on the bounded pool of the partitioned queries (see map_bounded),
+        for callers that use each result as soon as it completes.
+        `func` must not wait on the pool itself (e.g. a partitioned query).
+        Returns:
+            Future: The future of the result.
+        """
+        return self._get_partition_executor().submit(func, *args)
+
+    def _get_partition_executor(self) -> ThreadPoolExecutor:
+        with self._partition_executor_lock:
+            if self._partition_executor is None:
+                self._partition_executor = ThreadPoolExecutor(
+                    max_workers=self.max_parallel_queries, thread_name_prefix='db-partition'
+                )
+            return self._partition_executor
+
+    def _fetch_frame(self, query: str, params: Optional[dict]) -> pd.DataFrame:
+        """Executes the query and builds the DataFrame (errors are raised to the caller)."""
+        with self._connect() as connection:
+            # Usar text() para queries parametrizadas com segurança (evita SQL Injection)
+            sql_text = connection.execute(text(query), params if params else {})
+            df = pd.DataFrame(sql_text.fetchall(), columns=sql_text.keys())  # type: ignore
+            set_row_count(connection, len(df))
+            return df
+
+    def _fetch_arrow(
+        self, query: str, params: Optional[dict], schema: Optional[pa.Schema], batch_rows: int
+    ) -> pa.Table:
+        """Executes the query and builds the Arrow Table (errors are raised to the caller)."""
+        with self._connect() as connection:
+            result = connection.execute(text(query), params if params else {})
+            columns = list(result.keys())
+            cursor = result.cursor
+
+            batches = []
+            while rows := cursor.fetchmany(batch_rows):
+                batches.append(self._arrow_batch(rows, columns, schema))
+
+            if batches:
+                table = pa.concat_tables(
+                    [pa.Table.from_batches([batch]) for batch in batches], promote_options='default'
+                )
+            elif schema is not None:
+                table = pa.schema([self._arrow_field(name, schema) for name in columns]).empty_table()
+            else:
+                table = pa.table({name: pa.array([], type=pa.null()) for name in columns})
+
+            set_row_count(connection, table.num_rows)
+            return table
+
+    def iter_query(
+        self,
+        query: str,
+        params: Optional[dict] = None,
+        chunk_rows: int = 50_000,
+        schema: Optional[pa.Schema] = None,
+        as_arrow: bool = False,
+    ) -> Iterator[Union[pd.DataFrame, pa.RecordBatch]]:
+        """
+        Executes an SQL query and yields the result in chunks of at most `chunk_rows` rows.
+        Only one chunk is held in memory at a time, so long extracts keep a bounded footprint.
+        The connection is returned to the pool as soon as the generator is exhausted, closed
+        or garbage collected, including when the consumer stops iterating early.
+        An error while streaming is logged and raised to the consumer, so a truncated extract
+        never ends like a complete one.
+
+        Args:
+            query (str): The SQL query string to be executed.
+            params (dict, optional): Dictionary of parameters for the query. Defaults to None.
+            chunk_rows (int): Maximum number of rows per chunk.
+            schema (pa.Schema, optional): Expected Arrow types by column name. Defaults to None.
+            as_arrow (bool): Yield pyarrow RecordBatches instead of DataFrames.
+
+        Yields:
+            pd.DataFrame | pa.RecordBatch: The next chunk of the result.
+        """
+        if not self.engine:
+            logger.error('Database engine is not initialized.')
+            st.error('Erro ao conectar ao banco de dados. Verifique os logs.')
+            return
+
+        logger.debug(f'Executando query em blocos de {chunk_rows} linhas: {query[:50]}...')
+
+        batches = self._stream_batches(query, params, chunk_rows, schema)
+        total_rows = 0
+        try:
+            for batch in batches:
+                total_rows += batch.num_rows
+                yield batch if as_arrow else batch.to_pandas()
+        except GeneratorExit:
+            logger.info(f'Leitura em blocos interrompida pelo consumidor após {total_rows} linhas.')
+            raise
+        except Exception as e:
+            # Um extrato truncado não pode parecer completo: o erro sobe para o consumidor
+            logger.error(f'Erro na query em blocos após {total_rows} linhas: {e}', exc_info=True)
+            raise
+        finally:
+            batches.close()
+        logger.info(f'Query em blocos concluída. Retornadas {total_rows} linhas.')
+
+    def _stream_batches(
+        self, query: str, params: Optional[dict], chunk_rows: int, schema: Optional[pa.Schema]
+    ) -> Iterator[pa.RecordBatch]:
+        """Streams the result as Arrow batches on one pooled connection (errors are raised to the caller)."""
+        total_rows = 0
+        with self._connect().execution_options(stream_results=True) as connection:
+            result = connection.execute(text(query), params if params else {})
+            columns = list(result.keys())
+            cursor = result.cursor
+
+            while rows := cursor.fetchmany(chunk_rows):
+                batch = self._arrow_batch(rows, columns, schema)
+                del rows
+                total_rows += batch.num_rows
+                yield batch
+
+            set_row_count(connection, total_rows)
+
+    @staticmethod
+    def _arrow_field(name: str, schema: Optional[pa.Schema]) -> pa.Field:
+        """Returns the declared field for a column, or a null-typed field to be inferred."""
+        if schema is not None and name in schema.names:
+            return schema.field(name)
+        return pa.field(name, pa.null())
+
+    @staticmethod
+    def _arrow_batch(rows: list, columns: list[str], schema: Optional[pa.Schema]) -> pa.RecordBatch:
+        """Converts a batch of cursor rows into a RecordBatch, one typed Arrow array per column."""
+        arrays = []
+        for name, values in zip(columns, zip(*rows)):
+            field = DatabaseManager._arrow_field(name, schema)
+            if pa.types.is_null(field.type):
+                arrays.append(pa.array(values))
+                continue
+            if pa.types.is_integer(field.type):
+                # Quantidades Numeric(28,13) chegam do pyodbc como Decimal: arredonda e estreita
+                # a coluna inteira em Arrow (pa.array com o tipo final truncaria valor a valor)
+                inferred = pa.array(values)
+                if pa.types.is_decimal(inferred.type):
+                    inferred = pc.round(inferred)
+                arrays.append(inferred.cast(field.type))
+                continue
+            try:
+                arrays.append(pa.array(values, type=field.type))
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Ex.: códigos numéricos numa coluna texto
+                arrays.append(pa.array(values).cast(field.type))
+        return pa.RecordBatch.from_arrays(arrays, names=columns)
+
 
 # Initialize the database session manager
 db = None
 
-DB_CONNECTION_STRING = Generics().build_connection_string(config=st.secrets['database'])
+DB_CONFIG = st.secrets['database']
+DB_CONNECTION_STRING = Generics().build_connection_string(config=DB_CONFIG)
 
 if DB_CONNECTION_STRING:
     try:
-        # Passe echo=True para ver as queries SQL geradas, False para produção
-        db = DatabaseManager(url=DB_CONNECTION_STRING, echo=True)  # type: ignore
+        # echo = true em secrets.toml para ver todas as queries SQL geradas (só em desenvolvimento)
+        db = DatabaseManager(
+            url=DB_CONNECTION_STRING,  # type: ignore
+            echo=bool(DB_CONFIG.get('echo', False)),
+            engine_options=Generics.build_engine_options(DB_CONFIG),
+            checkout_warn_ms=float(DB_CONFIG.get('pool_checkout_warn_ms', 200)),
+            max_parallel_queries=int(DB_CONFIG.get('max_parallel_queries', 4)),
+        )
+        SlowQueryLog(
+            threshold_ms=float(DB_CONFIG.get('slow_query_ms', 500)),
+            sample_rate=float(DB_CONFIG.get('slow_query_sample_rate', 0.01)),
+        ).install(db.engine)
+        db.start_keep_warm(
+            connections=int(DB_CONFIG.get('keep_warm_connections', 2)),
+            interval=float(DB_CONFIG.get('keep_warm_interval', 300)),
+        )
         logger.info('DatabaseSessionManager initialized successfully.')
     except ValueError as ve:  # Erro específico da nossa validação de URL
         logger.error(f'Configuration Error: {ve}')
@@ -0,0 +1,139 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Hashable, Optional
+
+import pyarrow as pa
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+class DiskCache:
+    """
+    Persistent cache of Arrow tables, stored as uncompressed Arrow IPC files.
+    Entries survive restarts and are read back through memory mapping, so a hit costs
+    no decoding and no copy. The total size is capped and the least recently used
+    entries are evicted first. An entry saved without `ttl` never expires.
+    """
+
+    SUFFIX = '.arrow'
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # path -> (tamanho em bytes, último acesso)
+        self._index: dict[Path, tuple[int, float]] = {}
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for path in self.cache_dir.rglob(f'*{self.SUFFIX}'):
+            stat = path.stat()
+            self._index[path] = (stat.st_size, stat.st_atime)
+        logger.info(f'Cache em disco {self.cache_dir}: {len(self._index)} entradas, {self._total_bytes()} bytes.')
+
+    def path_for(self, namespace: str, key: tuple[Hashable, ...]) -> Path:
+        """Returns the file of an entry: a readable prefix plus a hash of the full key."""
+        readable = re.sub(r'[^A-Za-z0-9_-]+', '_', '_'.join(str(part) for part in key))[:80]
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:12]
+        return self.cache_dir / namespace / f'{readable}_{digest}{self.SUFFIX}'
+
+    def get(self, namespace: str, key: tuple[Hashable, ...], ttl: Optional[float] = None) -> Optional[pa.Table]:
+        """
+        Reads an entry.
+        Args:
+            namespace (str): Group of entries (ex: the service function name).
+            key (tuple): Identifies the entry within the namespace.
+            ttl (float, optional): Maximum age in seconds; None means the entry never expires.
+        Returns:
+            pa.Table | None: The memory-mapped table, or None if missing or expired.
+        """
+        path = self.path_for(namespace, key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+
+        if ttl is not None and time.time() - stat.st_mtime > ttl:
+            logger.debug(f'Entrada expirada no cache em disco: {path.name}')
+            return None
+
+        try:
+            with pa.memory_map(str(path), 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+        except (OSError, pa.ArrowInvalid) as e:
+            logger.warning(f'Entrada ilegível no cache em disco {path.name}, será descartada: {e}')
+            self._remove(path)
+            return None
+
+        # Guarda o último acesso no próprio ficheiro (atime) para o LRU sobreviver a reinícios
+        now = time.time()
+        try:
+            os.utime(path, (now, stat.st_mtime))
+        except OSError:
+            pass
+        with self._lock:
+            self._index[path] = (stat.st_size, now)
+
+        return table
+
+    def put(self, namespace: str, key: tuple[Hashable, ...], table: pa.Table):
+        """Writes an entry atomically and evicts the least recently used entries above the size cap."""
+        path = self.path_for(namespace, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f'.{threading.get_ident()}.tmp')
+
+        try:
+            with pa.OSFile(str(tmp_path), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f'Erro ao gravar {path.name} no cache em disco: {e}', exc_info=True)
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self._index[path] = (path.stat().st_size, time.time())
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            total = self._total_bytes()
+            if total <= self.max_bytes:
+                return
+            by_last_access = sorted(self._index.items(), key=lambda item: item[1][1])
+
+        for path, (size, _) in by_last_access:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                total -= size
+                logger.info(f'Cache em disco: {path.name} removida (LRU).')
+
+    def _remove(self, path: Path) -> bool:
+        try:
+            path.unlink(missing_ok=True)
+        except OSError as e:
+            # Windows: ficheiro ainda mapeado por uma leitura em curso
+            logger.debug(f'Não foi possível remover {path.name} do cache em disco: {e}')
+            return False
+        with self._lock:
+            self._index.pop(path, None)
+        return True
+
+    def _total_bytes(self) -> int:
+        return sum(size for size, _ in self._index.values())
+
+
+cache_config = st.secrets.get('cache', {})
+
+disk_cache = DiskCache(
+    cache_dir=PROJECT_ROOT_DIR / cache_config.get('dir', '.cache'),
+    max_bytes=int(cache_config.get('max_mb', 512)) * 1024 * 1024,
+)
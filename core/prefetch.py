@@ -0,0 +1,150 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+
+import streamlit as st
+
+from core.database import db
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchScheduler:
+    """
+    Runs speculative loads (ex.: the sales of the publication just selected) on a small
+    background pool, so that the data is often cached before the user asks for it.
+    Speculation never competes with real requests for long:
+        - at most `max_pending` tasks queued or running in total, and `max_per_user` per user;
+          a new selection replaces the oldest queued task of the same user;
+        - nothing is submitted, and queued tasks are dropped, while `busy()` is true
+          (ex.: the connection pool has no free connection);
+        - a key already queued or running is not submitted twice.
+    Failures are only logged: the real request will run the load again and report the error.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_per_user: int = 2,
+        max_pending: int = 8,
+        busy: Optional[Callable[[], bool]] = None,
+    ):
+        """
+        Args:
+            max_workers (int): Background threads (0 disables the prefetch).
+            max_per_user (int): Tasks queued or running for the same user.
+            max_pending (int): Tasks queued or running for all users.
+            busy (Callable, optional): Returns True when speculation must give way to real requests.
+        """
+        self.max_workers = max(int(max_workers), 0)
+        self.max_per_user = max(int(max_per_user), 1)
+        self.max_pending = max(int(max_pending), 1)
+        self.busy = busy or (lambda: False)
+
+        # Reentrante: cancelar uma future chama o callback _forget na mesma thread
+        self._lock = threading.RLock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # chave -> (utilizador, future) das tarefas em fila ou em execução
+        self._tasks: dict[Hashable, tuple[Hashable, Future]] = {}
+        self._user_keys: dict[Hashable, deque] = {}
+        self._counters = {'submitted': 0, 'completed': 0, 'skipped': 0, 'cancelled': 0, 'failed': 0}
+
+    def submit(self, user: Hashable, key: Hashable, func: Callable[[], Any]) -> bool:
+        """
+        Schedules `func` in the background, unless a cap or the busy check refuses it.
+        Args:
+            user (Hashable): Who the speculation is for (the per-user cap).
+            key (Hashable): Identifies the load; a key already scheduled is not submitted again.
+            func (Callable): The load, normally a cached service function (the result is
+                kept by its cache, not by the scheduler).
+        Returns:
+            bool: True if the task was scheduled.
+        """
+        if not self.max_workers:
+            return False
+
+        with self._lock:
+            if key in self._tasks:
+                return False
+            if self.busy() or not self._make_room(user):
+                self._counters['skipped'] += 1
+                return False
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='prefetch')
+            future = self._executor.submit(self._run, key, func)
+            self._tasks[key] = (user, future)
+            self._user_keys.setdefault(user, deque()).append(key)
+            self._counters['submitted'] += 1
+            future.add_done_callback(lambda done: self._forget(user, key, done))
+        return True
+
+    def _make_room(self, user: Hashable) -> bool:
+        """Applies the caps (with the lock held): frees a slot of `user` if needed, False when full."""
+        user_keys = self._user_keys.get(user, ())
+        if len(user_keys) >= self.max_per_user:
+            # A seleção mais recente substitui a mais antiga ainda em fila
+            for old_key in list(user_keys):
+                if self._tasks[old_key][1].cancel():
+                    self._counters['cancelled'] += 1
+                    self._remove(user, old_key)
+                    break
+            else:
+                return False
+        return len(self._tasks) < self.max_pending
+
+    def _run(self, key: Hashable, func: Callable[[], Any]):
+        # A fila pode ter esperado: se as queries reais precisam das conexões, a especulação desiste
+        if self.busy():
+            with self._lock:
+                self._counters['skipped'] += 1
+            logger.debug(f'Prefetch {key} ignorado: base de dados ocupada.')
+            return
+        try:
+            func()
+        except Exception as e:
+            with self._lock:
+                self._counters['failed'] += 1
+            logger.warning(f'Prefetch {key} falhou: {e}')
+            return
+        with self._lock:
+            self._counters['completed'] += 1
+        logger.debug(f'Prefetch {key} concluído.')
+
+    def _forget(self, user: Hashable, key: Hashable, future: Future):
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is not None and task[1] is future:
+                self._remove(user, key)
+
+    def _remove(self, user: Hashable, key: Hashable):
+        if self._tasks.pop(key, None) is None:
+            return
+        user_keys = self._user_keys[user]
+        user_keys.remove(key)
+        if not user_keys:
+            del self._user_keys[user]
+
+    def stats(self) -> dict[str, int]:
+        """Returns the task counters and the number of tasks currently queued or running."""
+        with self._lock:
+            return {**self._counters, 'pending': len(self._tasks)}
+
+    def shutdown(self):
+        """Cancels the queued tasks and waits for the running ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+prefetch_config = st.secrets.get('prefetch', {})
+
+prefetch = PrefetchScheduler(
+    max_workers=int(prefetch_config.get('workers', 2)),
+    max_per_user=int(prefetch_config.get('max_per_user', 2)),
+    max_pending=int(prefetch_config.get('max_pending', 8)),
+    busy=lambda: db is None or db.pool_saturated(),
+)
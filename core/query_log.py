@@ -0,0 +1,122 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from typing import Any, Optional
+
+from sqlalchemy import Connection, event
+from sqlalchemy.engine import Engine
+
+# Logger dedicado: uma linha JSON por query (ver utils/logging_config.py)
+slow_query_logger = logging.getLogger('sql.slow_query')
+
+_PENDING_KEY = 'slow_query_log_pending'
+_START_KEY = 'slow_query_log_start'
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+
+
+def fingerprint(statement: str) -> tuple[str, str]:
+    """
+    Normalizes a SQL statement so that executions of the same query share one fingerprint.
+    Args:
+        statement (str): The SQL statement sent to the cursor.
+    Returns:
+        tuple: (fingerprint hash, normalized statement).
+    """
+    normalized = _STRING_LITERAL.sub('?', statement)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = ' '.join(normalized.split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12], normalized
+
+
+def set_row_count(connection: Connection, rows: int):
+    """
+    Records the number of rows fetched for the last statement executed on `connection`.
+    The DBAPI cursor does not know the row count of a SELECT until it has been fetched,
+    so the data-access layer reports it here once the result is read.
+    """
+    entry = connection.info.get(_PENDING_KEY)
+    if entry is not None:
+        entry['rows'] = rows
+        entry['duration_ms'] = round((time.perf_counter() - entry.pop('_start')) * 1000, 2)
+
+
+class SlowQueryLog:
+    """
+    Structured, sampled query log built on the engine cursor events.
+    A query is written when it takes longer than `threshold_ms` or, for the fast ones,
+    with probability `sample_rate`. Everything else costs two timestamps.
+    """
+
+    def __init__(self, threshold_ms: float = 500, sample_rate: float = 0.0):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+
+    def install(self, engine: Engine):
+        """Attaches the event hooks to `engine`."""
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(engine, 'checkin', self._checkin)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):  # noqa: PLR0913, PLR0917
+        self._flush(conn.info)
+        conn.info[_START_KEY] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):  # noqa: PLR0913, PLR0917
+        start = conn.info.pop(_START_KEY, None)
+        if start is None:
+            return
+
+        entry = {
+            '_start': start,
+            'statement': statement,
+            'parameters': parameters,
+            'duration_ms': round((time.perf_counter() - start) * 1000, 2),
+            'rows': cursor.rowcount if cursor.rowcount >= 0 else None,
+        }
+
+        if cursor.description is None:
+            # Sem resultado para ler (UPDATE, INSERT...): o registo está completo
+            entry.pop('_start')
+            self._write(entry)
+        else:
+            # SELECT: espera pelo número de linhas lidas (set_row_count) até a conexão voltar ao pool
+            conn.info[_PENDING_KEY] = entry
+
+    def _checkin(self, dbapi_connection, connection_record):
+        self._flush(connection_record.info)
+
+    def _flush(self, info: dict):
+        entry = info.pop(_PENDING_KEY, None)
+        if entry is not None:
+            entry.pop('_start', None)
+            self._write(entry)
+
+    def _write(self, entry: dict[str, Any]):
+        duration_ms = entry['duration_ms']
+        slow = duration_ms >= self.threshold_ms
+        if not slow and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            return
+
+        query_fingerprint, normalized = fingerprint(entry['statement'])
+        slow_query_logger.info(
+            json.dumps({
+                'ts': round(time.time(), 3),
+                'fingerprint': query_fingerprint,
+                'query': normalized[:200],
+                'duration_ms': duration_ms,
+                'rows': entry['rows'],
+                'params_hash': self._params_hash(entry['parameters']),
+                'slow': slow,
+            })
+        )
+
+    @staticmethod
+    def _params_hash(parameters: Optional[Any]) -> Optional[str]:
+        if not parameters:
+            return None
+        return hashlib.sha1(repr(parameters).encode('utf-8')).hexdigest()[:12]
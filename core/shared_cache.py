@@ -0,0 +1,196 @@
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+READ_ONLY_MESSAGE = 'DataFrame partilhado pelo cache é só de leitura. Use .copy() antes de o alterar.'
+
+
+class _ReadOnlyIndexer:
+    """Wraps loc/iloc/at/iat: reading works as usual, assignment raises."""
+
+    def __init__(self, indexer):
+        self._indexer = indexer
+
+    def __getitem__(self, key):
+        return self._indexer[key]
+
+    def __setitem__(self, key, value):
+        raise TypeError(READ_ONLY_MESSAGE)
+
+    def __call__(self, axis=None):
+        return _ReadOnlyIndexer(self._indexer(axis))
+
+
+class ReadOnlyDataFrame(pd.DataFrame):
+    """
+    DataFrame shared by every session through the cache.
+    Column assignment, indexer assignment and `inplace=True` operations raise, and the
+    underlying arrays are flagged read-only. Any derived frame (filter, merge, copy...)
+    is an ordinary, mutable DataFrame.
+    """
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    def __setitem__(self, key, value):
+        raise TypeError(READ_ONLY_MESSAGE)
+
+    def __delitem__(self, key):
+        raise TypeError(READ_ONLY_MESSAGE)
+
+    def insert(self, *args, **kwargs):  # noqa: PLR6301
+        raise TypeError(READ_ONLY_MESSAGE)
+
+    def pop(self, *args, **kwargs):  # noqa: PLR6301
+        raise TypeError(READ_ONLY_MESSAGE)
+
+    def _update_inplace(self, *args, **kwargs):  # noqa: PLR6301
+        raise TypeError(READ_ONLY_MESSAGE)
+
+    @property
+    def loc(self):
+        return _ReadOnlyIndexer(super().loc)
+
+    @property
+    def iloc(self):
+        return _ReadOnlyIndexer(super().iloc)
+
+    @property
+    def at(self):
+        return _ReadOnlyIndexer(super().at)
+
+    @property
+    def iat(self):
+        return _ReadOnlyIndexer(super().iat)
+
+
+def _lock_array(values: Any):
+    """Flags the numpy buffers behind a column (plain or extension array) as read-only."""
+    if isinstance(values, np.ndarray):
+        values.flags.writeable = False
+        return
+    if isinstance(values, pd.arrays.ArrowExtensionArray):
+        # Buffers Arrow já são imutáveis
+        return
+    for attribute in ('_ndarray', '_codes', '_data', '_mask'):
+        buffer = getattr(values, attribute, None)
+        if isinstance(buffer, np.ndarray):
+            buffer.flags.writeable = False
+
+
+def freeze_frame(df: pd.DataFrame) -> ReadOnlyDataFrame:
+    """
+    Returns a read-only view of `df` without copying its data.
+    Args:
+        df (pd.DataFrame): Frame to share; it must not be modified by the caller afterwards.
+    Returns:
+        ReadOnlyDataFrame: Frame sharing the same arrays, all flagged read-only.
+    """
+    if isinstance(df, ReadOnlyDataFrame):
+        return df
+
+    frozen = ReadOnlyDataFrame(df, copy=False)
+    for _, column in frozen.items():
+        _lock_array(column.array if not isinstance(column.dtype, np.dtype) else column.to_numpy())
+    return frozen
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, pd.DataFrame):
+        return freeze_frame(value)
+    if isinstance(value, dict):
+        return MappingProxyType(value)
+    return value
+
+
+def shared_cache(
+    ttl: Optional[float] = None,
+    max_entries: int = 256,
+    version: Optional[Callable[..., Hashable]] = None,
+    skip_empty: bool = False,
+):
+    """
+    Process-wide cache for service functions, replacing st.cache_data where the result is
+    large and read on every rerun. A hit returns the very same immutable object to every
+    caller (no pickling, no copy): DataFrames become ReadOnlyDataFrame and dicts become
+    read-only mappings. Concurrent misses for the same arguments run the function once.
+
+    Args:
+        ttl (float, optional): Seconds before an entry expires; None keeps it until evicted.
+        max_entries (int): Maximum number of entries; the least recently used is evicted.
+        version (Callable, optional): Called with the function arguments, returns the current
+            version of the source data (see core.data_version). An entry built from another
+            version is reloaded, so unchanged data never expires and changed data is never stale.
+        skip_empty (bool): Return empty DataFrames without storing them, for loaders that report a
+            failed query as an empty frame: with a permanent version the failure would be kept forever.
+
+    Returns:
+        The decorated function, with a `clear()` method like st.cache_data and `cached(*args)`.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        lock = threading.Lock()
+        entries: OrderedDict[tuple, tuple[float, Hashable, Any]] = OrderedDict()
+        single_flight = SingleFlight()
+
+        def load(key: tuple, source_version: Hashable, args: tuple, kwargs: dict) -> Any:
+            value = _freeze(func(*args, **kwargs))
+            if skip_empty and isinstance(value, pd.DataFrame) and value.empty:
+                return value
+            with lock:
+                entries[key] = (time.monotonic(), source_version, value)
+                entries.move_to_end(key)
+                while len(entries) > max_entries:
+                    entries.popitem(last=False)
+            return value
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            source_version = version(*args, **kwargs) if version is not None else None
+            with lock:
+                entry = entries.get(key)
+                if entry is not None:
+                    stored_at, stored_version, value = entry
+                    if stored_version == source_version and (ttl is None or time.monotonic() - stored_at < ttl):
+                        entries.move_to_end(key)
+                        return value
+                    del entries[key]
+
+            # A versão faz parte da chave: uma carga em curso com dados antigos não é partilhada
+            value, _ = single_flight.do((key, source_version), lambda: load(key, source_version, args, kwargs))
+            return value
+
+        def cached(*args, **kwargs) -> bool:
+            """True if the call would be answered from the cache (valid entry), without loading it."""
+            key = (args, tuple(sorted(kwargs.items())))
+            source_version = version(*args, **kwargs) if version is not None else None
+            with lock:
+                entry = entries.get(key)
+            if entry is None:
+                return False
+            stored_at, stored_version, _ = entry
+            return stored_version == source_version and (ttl is None or time.monotonic() - stored_at < ttl)
+
+        def clear():
+            with lock:
+                entries.clear()
+            logger.info(f'Cache partilhado de {func.__qualname__} limpo.')
+
+        wrapper.cached = cached
+        wrapper.clear = clear
+        return wrapper
+
+    return decorator
@@ -0,0 +1,109 @@
+import logging
+import threading
+from typing import Any, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """An in-flight execution shared by every caller with the same key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+        # Cópias do resultado para os chamadores em espera, feitas antes de o publicar
+        self.copies: list[Any] = []
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls into a single execution.
+    The first caller for a key runs the function; callers arriving while it is
+    still running wait for it and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    @staticmethod
+    def query_key(query: str, params: Optional[dict] = None, *extra: Hashable) -> Hashable:
+        """
+        Builds the coalescing key of a query: whitespace-normalized SQL plus its parameters.
+        Args:
+            query (str): The SQL query string.
+            params (dict, optional): Query parameters.
+            *extra: Other values that change the result (ex: the result format).
+        Returns:
+            Hashable: The key for `do`.
+        """
+        normalized_sql = ' '.join(query.split())
+        normalized_params = tuple(sorted((name, repr(value)) for name, value in (params or {}).items()))
+        return normalized_sql, normalized_params, extra
+
+    def do(
+        self, key: Hashable, func: Callable[[], Any], copy: Optional[Callable[[Any], Any]] = None
+    ) -> tuple[Any, bool]:
+        """
+        Runs `func` once for all concurrent callers of `key`.
+        Args:
+            key (Hashable): Identifies identical calls.
+            func (Callable): The function to execute.
+            copy (Callable, optional): For mutable results: every waiting caller receives its own
+                copy, made before the result is published, and the caller that ran `func` keeps
+                the original. If copying fails the waiting callers raise that error. Without it
+                every caller receives the same object.
+        Returns:
+            tuple: (result, shared) where `shared` is True when the caller received the
+            result of an execution started by another caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return (call.copies.pop() if copy is not None else call.result), True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            try:
+                # Depois de sair de _calls já não chegam mais chamadores: uma cópia para cada um em espera
+                if copy is not None and call.error is None:
+                    call.copies = [copy(call.result) for _ in range(call.waiters)]
+            except BaseException as e:
+                # Cópia falhada (ex: MemoryError): os chamadores em espera recebem o erro, quem executou o original
+                logger.error(f'Falha ao copiar o resultado para {call.waiters} execuções em espera: {e}')
+                call.error = e
+            finally:
+                # Sempre sinalizado: um chamador em espera nunca fica bloqueado
+                call.done.set()
+            if call.waiters:
+                logger.info(f'{call.waiters} execuções idênticas partilharam o mesmo resultado.')
+
+        return call.result, False
+
+    def stats(self) -> dict[str, int]:
+        """Returns the counters of executed, coalesced and currently in-flight calls."""
+        with self._lock:
+            return {'executed': self._executed, 'coalesced': self._coalesced, 'in_flight': len(self._calls)}
@@ -1,13 +1,22 @@
 import datetime
 import logging
+from concurrent.futures import as_completed
+from typing import Optional
 
+import pandas as pd
 import streamlit as st
 from streamlit_extras.grid import grid
 
 from services.partners_service import PartnersService
 from services.publications_service import PublicationsService
 from services.sales_boards_service import SalesBoardsService
-from utils.comparison_table_data import config_columns_to_sales_boards
+from utils.comparison_table_data import (
+    config_columns_to_portfolio,
+    config_columns_to_sales_boards,
+    config_columns_to_trend_panel,
+)
+from utils.issue_alignment import ALIGNMENT_STRATEGIES
+from utils.table_window import PAGE_SIZES, windowed_dataframe
 
 logger = logging.getLogger(__name__)
 
@@ -28,15 +37,92 @@ db_schema = st.secrets.get('database', {}).get('schema', 'X3')
 
 sales_data = SalesBoardsService
 
-# 1. Busca e Seleção de Fornecedor
-supplier_options = PartnersService.fetch_raw_suppliers(db_schema)
-selected_supplier_name = None
-selected_supplier_code = None
+COMPARISON_MODE = 'Comparação com o ano anterior'
+TREND_MODE = 'Tendência multi-ano'
+PORTFOLIO_MODE = 'Portfólio do fornecedor'
+REPORT_MODES = [COMPARISON_MODE, TREND_MODE, PORTFOLIO_MODE]
 
-if not supplier_options:
-    st.sidebar.error('Não foi possível carregar a lista de fornecedores.')
-else:
-    selected_supplier_name = st.sidebar.selectbox(
+# Rótulos das métricas anuais (yearly_metrics)
+YEARLY_METRICS_LABELS = {
+    'total_supply': 'Supply',
+    'total_sales': 'Sales',
+    'total_unsold': '% Unsold',
+    'total_outlet': 'Outlet',
+    'avg_supply': 'Avg Supply',
+    'avg_sales': 'Avg Sales',
+    'avg_unsold': 'Avg % Unsold',
+    'avg_outlet': 'Avg Outlet',
+}
+
+# Cartões das métricas do relatório de comparação: {métrica de yearly_metrics: rótulo}
+METRIC_CARDS = {
+    'total_sales': 'Sales',
+    'avg_sales': 'Avg Sales',
+    'total_supply': 'Supply',
+    'total_unsold': '% Unsold',
+}
+
+# Colunas das tabelas por edição que não são mostradas (column_config a None: ficam fora da página enviada)
+HIDDEN_COLUMNS = {'Year_prev': None, 'Year_curr': None}
+
+
+def render_year_metrics(slot, year: int, prev_metrics: dict, curr_metrics: dict):
+    """Totals of the current year with the change from the previous one; the previous year alone until then."""
+    has_current = curr_metrics.get('total_sales') is not None
+    shown_year, shown = (year, curr_metrics) if has_current else (year - 1, prev_metrics)
+    with slot.container():
+        for column, (key, label) in zip(st.columns(len(METRIC_CARDS)), METRIC_CARDS.items()):
+            value = shown.get(key)
+            previous = prev_metrics.get(key) if has_current else None
+            column.metric(
+                f'{label} {shown_year}',
+                '—' if value is None else f'{value:,}',
+                delta=None if value is None or previous is None else value - previous,
+                delta_color='inverse' if key == 'total_unsold' else 'normal',
+            )
+
+
+def session_report(request: dict) -> dict:
+    """Data of the last report requested in the session, kept until the next request (no new query on reruns)."""
+    report = st.session_state.get('report_data')
+    if report is None or report['request'] != request:
+        report = {'request': request, 'loaded': False, 'slices': {}, 'tables': {}}
+        st.session_state['report_data'] = report
+    return report
+
+
+def comparison_table(report: dict, alignment: str) -> tuple:
+    """create_comparison_table of the years loaded so far, computed once per alignment and set of years."""
+    slices = report['slices']
+    key = (alignment, tuple(sorted(slices)))
+    if key not in report['tables']:
+        raw_data = pd.concat([slices[year] for year in sorted(slices)], ignore_index=True)
+        report['tables'][key] = sales_data.create_comparison_table(raw_data, report['request']['year'], alignment)
+    return report['tables'][key]
+
+
+def drill_down_table(report: dict, publication: str, alignment: str) -> tuple:
+    """create_comparison_table of one publication of the portfolio, computed once per alignment."""
+    key = (publication, alignment)
+    drill_tables = report.setdefault('drill_tables', {})
+    if key not in drill_tables:
+        year = report['request']['year']
+        df_sales, prev_metrics, curr_metrics = sales_data.create_comparison_table(
+            sales_data.publication_sales(report['supplier_sales'], publication), year, alignment
+        )
+        drill_tables[key] = df_sales, sales_data.create_comparison_summary(prev_metrics, curr_metrics, year)
+    return drill_tables[key]
+
+
+def select_supplier() -> tuple[Optional[str], Optional[str]]:
+    """Supplier picker: (name, code) of the selected supplier, or (None, None)."""
+    # 1. Busca e Seleção de Fornecedor
+    supplier_options = PartnersService.fetch_raw_suppliers(db_schema)
+    if not supplier_options:
+        st.error('Não foi possível carregar a lista de fornecedores.')
+        return None, None
+
+    selected_supplier_name = st.selectbox(
         'Selecione o Fornecedor (Editor):',
         options=list(supplier_options.keys()),  # Mostra os nomes
         index=None,  # Começa sem seleção
@@ -44,131 +130,299 @@ else:
         key='supplier_select',  # Chave para o selectbox
     )
     # Se um nome foi selecionado, pega o código correspondente
-    if selected_supplier_name:
-        selected_supplier_code = supplier_options[selected_supplier_name]
-        logger.info(f'Fornecedor selecionado: {selected_supplier_name} (Código: {selected_supplier_code})')
-
-# 2. Busca e Seleção de Publicação (Condicional ao Fornecedor)
-publication_options = {}
-selected_publication_name = None
-selected_publication_code = None
-
-if selected_supplier_code:  # Só busca se um fornecedor foi selecionado
-    try:
-        # Busca as publicações associadas ao fornecedor selecionado
-        with st.spinner(f'Buscar publicações para {selected_supplier_name}...'):
+    if not selected_supplier_name:
+        return None, None
+    selected_supplier_code = supplier_options[selected_supplier_name]
+    logger.info(f'Fornecedor selecionado: {selected_supplier_name} (Código: {selected_supplier_code})')
+    return selected_supplier_name, selected_supplier_code
+
+
+# --- Filtros (fragmento: mudar um filtro só executa a barra lateral) ---
+@st.fragment
+def report_filters():
+    selected_supplier_name, selected_supplier_code = select_supplier()
+
+    # 2. Modo do relatório: comparação com o ano anterior, tendência de vários anos ou portfólio do fornecedor
+    report_mode = COMPARISON_MODE
+    if selected_supplier_code:
+        report_mode = st.radio('Modo do Relatório:', options=REPORT_MODES, key='report_mode')
+
+    # 3. Busca e Seleção de Publicação (Condicional ao Fornecedor; o portfólio usa todas)
+    publication_options = {}
+    selected_publication_name = None
+    selected_publication_code = None
+
+    if selected_supplier_code:  # Só busca se um fornecedor foi selecionado
+        try:
+            # Publicações associadas ao fornecedor selecionado (lidas do catálogo em memória)
             publication_options = PublicationsService.fetch_publications_by_supplier(db_schema, selected_supplier_code)
 
-        if publication_options:
-            selected_publication_name = st.sidebar.selectbox(
-                'Selecione a Publicação:',
-                options=list(publication_options.keys()),  # Mostra os nomes/descrições
-                index=None,
-                placeholder='Escolha uma publicação...',
-                key=f'pub_select_{selected_supplier_code}',  # Chave dinâmica ajuda a resetar
-                help='Publicações disponíveis para o fornecedor selecionado.',
-            )
-            if selected_publication_name:
-                selected_publication_code = publication_options[selected_publication_name]
-                logger.debug(
-                    f'Publicação selecionada: {selected_publication_name} (Código: {selected_publication_code})'
+            if publication_options and report_mode != PORTFOLIO_MODE:
+                selected_publication_name = st.selectbox(
+                    'Selecione a Publicação:',
+                    options=list(publication_options.keys()),  # Mostra os nomes/descrições
+                    index=None,
+                    placeholder='Escolha uma publicação...',
+                    key=f'pub_select_{selected_supplier_code}',  # Chave dinâmica ajuda a resetar
+                    help='Publicações disponíveis para o fornecedor selecionado.',
                 )
-        else:
-            st.sidebar.info(f"Nenhuma publicação encontrada para '{selected_supplier_name}'.")
-            # Limpa seleção anterior se houver
+                if selected_publication_name:
+                    selected_publication_code = publication_options[selected_publication_name]
+                    logger.debug(
+                        f'Publicação selecionada: {selected_publication_name} (Código: {selected_publication_code})'
+                    )
+            elif not publication_options:
+                st.info(f"Nenhuma publicação encontrada para '{selected_supplier_name}'.")
+
+        except Exception as e:
+            st.error(f'Erro ao buscar publicações: {e}')
+            # Limpa seleções em caso de erro
+            publication_options = {}
             selected_publication_name = None
             selected_publication_code = None
 
-    except Exception as e:
-        st.sidebar.error(f'Erro ao buscar publicações: {e}')
-        # Limpa seleções em caso de erro
-        publication_options = {}
-        selected_publication_name = None
-        selected_publication_code = None
-
-# 3. Seleção do Ano (Condicional à Seleção da Publicação)
-selected_year = None
-if selected_publication_code:  # Só mostra se uma publicação foi selecionada
-    current_year = datetime.date.today().year
-    selected_year = st.sidebar.number_input(
-        'Selecione o Ano:',
-        min_value=2000,
-        max_value=current_year,
-        value=current_year,
-        step=1,
-        format='%d',
-        key=f'year_input_{selected_supplier_code}_{selected_publication_code}',  # Chave dinâmica
-    )
-    logger.debug(f'Ano selecionado: {selected_year}')
-
-
-# --- Botão para Gerar Relatório e Lógica Principal ---
-if st.sidebar.button(
-    'Gerar Relatório', key='generate_report_button', disabled=(not selected_publication_code or not selected_year)
-):
-    if not selected_supplier_code:
-        st.warning('Por favor, selecione um fornecedor.')
-    elif not selected_publication_code:
-        st.warning('Por favor, selecione uma publicação.')
-    elif not selected_year:
-        st.warning('Por favor, selecione um ano.')
-    else:
-        # Todos os inputs estão ok, prossegue com a geração
-        st.info(
-            f'Gerar relatório para Fornecedor: {selected_supplier_name}, '
-            f"Pub: '{selected_publication_name}' ({selected_year - 1} vs {selected_year})..."
+    # 4. Seleção do Ano (Condicional à Seleção da Publicação, ou do fornecedor no portfólio)
+    selected_year = None
+    trend_years_count = 5
+    portfolio_ready = report_mode == PORTFOLIO_MODE and bool(publication_options)
+    if selected_publication_code or portfolio_ready:
+        current_year = datetime.date.today().year
+        selected_year = st.number_input(
+            'Selecione o Ano:',
+            min_value=2000,
+            max_value=current_year,
+            value=current_year,
+            step=1,
+            format='%d',
+            key=f'year_input_{selected_supplier_code}_{selected_publication_code}',  # Chave dinâmica
         )
+        logger.debug(f'Ano selecionado: {selected_year}')
 
-        # 1. Buscar os dados brutos (passando só publicação e ano)
-        with st.spinner('Buscar dados de vendas...'):
-            raw_data = sales_data.fetch_sales_data(db_schema, selected_publication_code, selected_year)
+        # 5. Opções do modo escolhido (o alinhamento das edições é uma opção de visualização do relatório)
+        if report_mode == TREND_MODE:
+            trend_years_count = st.slider('Número de Anos:', min_value=2, max_value=10, value=5, key='trend_years')
 
-        if raw_data.empty:
-            st.error('Nenhum dado de venda encontrado para os filtros selecionados.')
+        # 6. Prefetch: os dados por omissão (ano anterior e atual) carregam enquanto o utilizador confirma
+        # main.py inicia 'user' a None: o valor por omissão do get não se aplicaria
+        prefetch_user = st.session_state.get('user') or 'anonymous'
+        if report_mode == PORTFOLIO_MODE:
+            sales_data.prefetch_supplier_sales(db_schema, selected_supplier_code, selected_year, prefetch_user)
         else:
-            # 2. Criar tabelas de comparação
-            with st.spinner('Montar a visualização...'):
-                df_sales, prev_metrics, curr_metrics = sales_data.create_comparison_table(raw_data, selected_year)
+            sales_data.prefetch_sales_years(
+                db_schema, selected_publication_code, (selected_year - 1, selected_year), prefetch_user
+            )
+
+    # --- Botão para Gerar Relatório: o pedido fica na sessão e a página é executada de novo ---
+    if st.button(
+        'Gerar Relatório',
+        key='generate_report_button',
+        disabled=(not (selected_publication_code or portfolio_ready) or not selected_year),
+    ):
+        st.session_state['report_request'] = {
+            'mode': report_mode,
+            'supplier': selected_supplier_code,
+            'supplier_name': selected_supplier_name,
+            'publication': selected_publication_code,
+            'publication_name': selected_publication_name,
+            'publication_names': {code: name for name, code in publication_options.items()},
+            'year': selected_year,
+            'trend_years': list(range(selected_year - trend_years_count + 1, selected_year + 1)),
+        }
+        # Um novo clique lê os dados outra vez (dos caches partilhados), mesmo com os mesmos filtros
+        st.session_state.pop('report_data', None)
+        st.rerun()
+
+
+# --- Relatórios (fragmentos: as opções de visualização não voltam à base de dados) ---
+@st.fragment
+def comparison_report(request: dict):
+    year = request['year']
+    st.info(
+        f'Relatório para Fornecedor: {request["supplier_name"]}, '
+        f"Pub: '{request['publication_name']}' ({year - 1} vs {year})"
+    )
+
+    # Como emparelhar as edições dos dois anos (ex.: semana ISO quando há edições especiais)
+    alignment = st.selectbox(
+        'Alinhamento das Edições:',
+        options=list(ALIGNMENT_STRATEGIES),
+        format_func=ALIGNMENT_STRATEGIES.get,
+        key='issue_alignment',
+    )
 
-                if not df_sales.empty:
-                    df_show = df_sales.drop(columns=['Year_prev', 'Year_curr'], errors='ignore')
+    report = session_report(request)
+    if 'column_config' not in report:
+        report['column_config'] = {
+            **config_columns_to_sales_boards(prev_year=year - 1, curr_year=year),
+            **HIDDEN_COLUMNS,
+        }
+    metrics_slot = st.empty()
+    table_slot = st.empty()
 
-                    st.dataframe(
-                        df_show,
+    if not report['loaded']:
+        # Os dois anos são lidos em simultâneo; a primeira página aparece com o primeiro e completa-se com o outro
+        report_years = sales_data.fetch_sales_years_concurrently(db_schema, request['publication'], (year - 1, year))
+        with st.spinner('Buscar dados de vendas...'):
+            for future in as_completed(report_years.values()):
+                df_year = future.result()
+                if not df_year.empty:
+                    report['slices'][df_year['Year'].iat[0]] = df_year
+                    df_sales, prev_metrics, curr_metrics = comparison_table(report, alignment)
+                    render_year_metrics(metrics_slot, year, prev_metrics, curr_metrics)
+                    table_slot.dataframe(
+                        df_sales.head(PAGE_SIZES[0]).drop(columns=list(HIDDEN_COLUMNS), errors='ignore'),
                         use_container_width=True,
                         hide_index=True,
-                        column_config=config_columns_to_sales_boards(
-                            prev_year=selected_year - 1, curr_year=selected_year
-                        ),
+                        column_config=report['column_config'],
                     )
+        report['loaded'] = True
 
-                    st.divider()
+    if not report['slices']:
+        st.error('Nenhum dado de venda encontrado para os filtros selecionados.')
+        return
 
-                    my_grid = grid(1, [2, 4, 1], 1, 4, vertical_align='bottom')
+    df_sales, prev_metrics, curr_metrics = comparison_table(report, alignment)
+    if df_sales.empty:
+        st.info('Não há dados processados para exibir a tabela de comparação.')
+        return
 
-                    # Row 1:
-                    my_grid.dataframe(
-                        df_show,
-                        use_container_width=True,
-                    )
-                    # Row 2:
-                    my_grid.selectbox('Select Country', ['Germany', 'Italy', 'Japan', 'USA'])
-                    my_grid.text_input('Your name')
-                    my_grid.button('Send', use_container_width=True)
-                    # Row 3:
-                    my_grid.text_area('Your message', height=68)
-                    # Row 4:
-                    my_grid.button('Example 1', use_container_width=True)
-                    my_grid.button('Example 2', use_container_width=True)
-                    my_grid.button('Example 3', use_container_width=True)
-                    my_grid.button('Example 4', use_container_width=True)
-                    # Row 5 (uses the spec from row 1):
-                    with my_grid.expander('Show Filters', expanded=True):
-                        st.slider('Filter by Age', 0, 100, 50)
-                        st.slider('Filter by Height', 0.0, 2.0, 1.0)
-                        st.slider('Filter by Weight', 0.0, 100.0, 50.0)
-                else:
-                    st.info('Não há dados processados para exibir a tabela de comparação.')
+    # Tabela completa no servidor: só a página visível e os totais/médias fixos vão para o browser
+    render_year_metrics(metrics_slot, year, prev_metrics, curr_metrics)
+    summary_key = ('summary', alignment, tuple(sorted(report['slices'])))
+    if summary_key not in report['tables']:
+        report['tables'][summary_key] = sales_data.create_comparison_summary(prev_metrics, curr_metrics, year)
+    with table_slot.container():
+        windowed_dataframe(df_sales, 'comparison_table', report['column_config'], summary=report['tables'][summary_key])
+
+    st.divider()
+    demo_grid()
+
+
+@st.fragment
+def demo_grid():
+    # A tabela já está acima (em janela): a grelha não envia outra cópia
+    my_grid = grid([2, 4, 1], 1, 4, 1, vertical_align='bottom')
+
+    # Row 1:
+    my_grid.selectbox('Select Country', ['Germany', 'Italy', 'Japan', 'USA'])
+    my_grid.text_input('Your name')
+    my_grid.button('Send', use_container_width=True)
+    # Row 2:
+    my_grid.text_area('Your message', height=68)
+    # Row 3:
+    my_grid.button('Example 1', use_container_width=True)
+    my_grid.button('Example 2', use_container_width=True)
+    my_grid.button('Example 3', use_container_width=True)
+    my_grid.button('Example 4', use_container_width=True)
+    # Row 4:
+    with my_grid.expander('Show Filters', expanded=True):
+        st.slider('Filter by Age', 0, 100, 50)
+        st.slider('Filter by Height', 0.0, 2.0, 1.0)
+        st.slider('Filter by Weight', 0.0, 100.0, 50.0)
+
+
+def trend_report(request: dict):
+    trend_years = request['trend_years']
+    st.info(f"Tendência para Pub: '{request['publication_name']}' ({trend_years[0]} a {trend_years[-1]})")
+
+    report = session_report(request)
+    if not report['loaded']:
+        with st.spinner('Buscar dados de vendas...'):
+            raw_data = sales_data.fetch_sales_years(db_schema, request['publication'], trend_years)
+        if not raw_data.empty:
+            with st.spinner('Montar a visualização...'):
+                report['panel'] = sales_data.create_trend_panel(raw_data, trend_years)
+        report['loaded'] = True
+
+    if 'panel' not in report:
+        st.error('Nenhum dado de venda encontrado para os filtros selecionados.')
+        return
+
+    df_panel, yearly = report['panel']
+    if df_panel.empty:
+        st.info('Não há dados processados para exibir a tendência multi-ano.')
+        return
+
+    st.dataframe(
+        yearly[list(YEARLY_METRICS_LABELS)].rename(columns=YEARLY_METRICS_LABELS),
+        use_container_width=True,
+    )
+
+    # Vendas por edição, uma linha por ano
+    st.line_chart(
+        df_panel[[f'Sales_{year - 2000}' for year in trend_years]].rename(
+            columns={f'Sales_{year - 2000}': str(year) for year in trend_years}
+        ),
+        x_label='Edição',
+        y_label='Sales',
+    )
+
+    windowed_dataframe(df_panel, 'trend_table', config_columns_to_trend_panel(trend_years))
+
+
+@st.fragment
+def portfolio_report(request: dict):
+    year = request['year']
+    st.info(f'Portfólio do fornecedor: {request["supplier_name"]} ({year - 1} vs {year})')
+
+    alignment = st.selectbox(
+        'Alinhamento das Edições:',
+        options=list(ALIGNMENT_STRATEGIES),
+        format_func=ALIGNMENT_STRATEGIES.get,
+        key='issue_alignment',
+    )
+
+    report = session_report(request)
+    if not report['loaded']:
+        # Uma só query para todas as publicações do fornecedor
+        with st.spinner('Buscar dados de vendas do fornecedor...'):
+            supplier_sales = sales_data.fetch_supplier_sales(db_schema, request['supplier'], year)
+        if not supplier_sales.empty:
+            report['supplier_sales'] = supplier_sales
+            report['portfolio'] = sales_data.create_portfolio_summary(
+                supplier_sales, year, request['publication_names']
+            )
+        report['loaded'] = True
+
+    if 'portfolio' not in report:
+        st.error('Nenhum dado de venda encontrado para os filtros selecionados.')
+        return
+
+    df_portfolio = report['portfolio']
+    st.caption('Clique numa publicação para ver o detalhe por edição.')
+    portfolio_event = st.dataframe(
+        df_portfolio,
+        use_container_width=True,
+        hide_index=True,
+        column_config=config_columns_to_portfolio(prev_year=year - 1, curr_year=year),
+        on_select='rerun',
+        selection_mode='single-row',
+        key='portfolio_table',
+    )
+
+    # Drill-down: a tabela por edição da publicação escolhida, sem nova query
+    selected_rows = portfolio_event.selection.rows
+    if selected_rows:
+        drill_code = df_portfolio['Publication'].iloc[selected_rows[0]]
+        st.subheader(request['publication_names'].get(drill_code, drill_code))
+        df_sales, summary = drill_down_table(report, drill_code, alignment)
+        if not df_sales.empty:
+            column_config = {**config_columns_to_sales_boards(prev_year=year - 1, curr_year=year), **HIDDEN_COLUMNS}
+            windowed_dataframe(df_sales, 'drill_table', column_config, summary=summary)
+
+
+with st.sidebar:
+    report_filters()
+
+report_request = st.session_state.get('report_request')
+if report_request is None:
+    pass
+elif report_request['mode'] == PORTFOLIO_MODE:
+    portfolio_report(report_request)
+elif report_request['mode'] == TREND_MODE:
+    trend_report(report_request)
+else:
+    comparison_report(report_request)
 
 # # Mensagem inicial ou de status na área principal
 # elif not selected_supplier_code:
@@ -0,0 +1,137 @@
+import logging
+import time
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
+import pandas as pd
+
+from core.data_version import data_version
+from core.database import db
+from core.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Tabelas de origem do catálogo: só é recarregado quando uma delas muda
+CATALOG_SOURCE_TABLES = ('ZPUBLIC', 'BPARTNER')
+
+
+class CatalogSnapshot(NamedTuple):
+    """Immutable view of the supplier and publication catalog of one schema."""
+
+    # {Nome do fornecedor: Código}, ordenado por nome
+    suppliers: Mapping[str, str]
+    # {Código do fornecedor: {Descrição da publicação: Código}}, ordenado por descrição
+    publications: Mapping[str, Mapping[str, str]]
+    loaded_at: float
+
+
+def catalog_query(schema: str) -> str:
+    """
+    Builds the bootstrap query: every distributed publication (ZPUBLIC, DISTVSP_0=2) with its
+    supplier (BPARTNER editor), in a single round trip.
+    Args:
+        schema (str): The database schema to query.
+    Returns:
+        str: SQL text.
+    """
+
+    return f"""
+        SELECT
+            b.BPRNUM_0 AS Fornecedor,
+            b.BPRNAM_0 AS Nome,
+            p.CODPUB_0 AS Codigo,
+            p.DESPUB_0 AS Descricao
+        FROM
+            {schema}.ZPUBLIC p
+            INNER JOIN {schema}.BPARTNER b ON b.BPRNUM_0 = p.BPSREF_0
+        WHERE
+            p.DISTVSP_0 = 2 AND
+            b.ZEDITOR_0 = 2 AND
+            b.BPSFLG_0 = 2
+        ORDER BY
+            b.BPRNAM_0, p.DESPUB_0;
+        """
+
+
+class CatalogIndex:
+    """
+    In-memory supplier -> publication index shared by every session.
+    The first reader of a schema loads it with one query; afterwards lookups are plain dict reads.
+    When the data-version probe reports a change in ZPUBLIC or BPARTNER the index is rebuilt in
+    the background and swapped in one assignment, so readers always see either the old or the
+    new snapshot, never a partial one. If a refresh fails or reads no rows the previous snapshot
+    stays in use; a failed first load is not kept, the next reader tries again.
+    """
+
+    def __init__(self):
+        self._snapshots: dict[str, CatalogSnapshot] = {}
+        self._single_flight = SingleFlight()
+
+    def get(self, schema: str) -> CatalogSnapshot:
+        """
+        Returns the current snapshot of `schema`, loading it on first use.
+        Args:
+            schema (str): The database schema.
+        Returns:
+            CatalogSnapshot: The shared, read-only snapshot.
+        """
+        snapshot = self._snapshots.get(schema)
+        if snapshot is None:
+            # Regista o schema na verificação de versões antes de carregar: alterações durante a carga não se perdem
+            data_version.get(schema, CATALOG_SOURCE_TABLES)
+            # Sessões em simultâneo no arranque partilham a mesma query
+            snapshot, _ = self._single_flight.do(('catalog', schema), lambda: self.refresh(schema))
+        return snapshot
+
+    def refresh(self, schema: str) -> CatalogSnapshot:
+        """Reloads the index of `schema` from the database and publishes it atomically (errors are raised)."""
+        snapshot = self._load(schema)
+        self._snapshots[schema] = snapshot
+        return snapshot
+
+    def on_source_change(self, schema: str):
+        """Data-version listener: rebuilds the index of `schema` if it was already loaded."""
+        if schema not in self._snapshots:
+            return
+        try:
+            self.refresh(schema)
+        except Exception as e:
+            logger.warning(f'Falha ao atualizar o catálogo de {schema}, mantém-se o anterior: {e}')
+
+    @staticmethod
+    def _load(schema: str) -> CatalogSnapshot:
+        if not db:
+            raise RuntimeError('Gerenciador do banco não disponível.')
+
+        start = time.perf_counter()
+        df = db.run_query(catalog_query(schema), raise_errors=True)
+        if df.empty:
+            # Um catálogo vazio é tratado como falha: não substitui o anterior nem fica em memória
+            raise RuntimeError(f'A query do catálogo de {schema} não devolveu publicações.')
+        snapshot = CatalogIndex._build(df)
+        logger.info(
+            f'Catálogo de {schema} carregado: {len(snapshot.suppliers)} fornecedores, '
+            f'{len(df)} publicações em {(time.perf_counter() - start) * 1000:.0f} ms.'
+        )
+        return snapshot
+
+    @staticmethod
+    def _build(df: pd.DataFrame) -> CatalogSnapshot:
+        """Builds the lookup dictionaries from the bootstrap query result (already sorted by name)."""
+        if df.empty:
+            return CatalogSnapshot(MappingProxyType({}), MappingProxyType({}), time.time())
+
+        suppliers = df.drop_duplicates('Fornecedor')
+        publications = {
+            supplier_code: MappingProxyType(dict(zip(group['Descricao'], group['Codigo'])))
+            for supplier_code, group in df.groupby('Fornecedor', sort=False)
+        }
+        return CatalogSnapshot(
+            suppliers=MappingProxyType(dict(zip(suppliers['Nome'], suppliers['Fornecedor']))),
+            publications=MappingProxyType(publications),
+            loaded_at=time.time(),
+        )
+
+
+catalog_index = CatalogIndex()
+data_version.subscribe(CATALOG_SOURCE_TABLES, catalog_index.on_source_change)
@@ -1,9 +1,9 @@
 import logging
+from typing import Mapping
 
-import pandas as pd
 import streamlit as st
 
-from core.database import db
+from services.catalog_index import catalog_index
 
 logger = logging.getLogger(__name__)
 
@@ -17,10 +17,10 @@ class PublicationsService:
         pass
 
     @staticmethod
-    @st.cache_data(ttl=600)
-    def fetch_publications_by_supplier(schema: str, supplier_code: str) -> dict:
+    def fetch_publications_by_supplier(schema: str, supplier_code: str) -> Mapping[str, str]:
         """
-        Searches for publications associated with a supplier code (BPSNUM_0).
+        Returns the publications associated with a supplier code (BPSREF_0).
+        Read from the shared catalog index, without a round trip to the database.
         Args:
             schema (str): The database schema to query.
             supplier_code (str): The supplier code to filter publications.
@@ -31,40 +31,13 @@ class PublicationsService:
         if not supplier_code:
             return {}
 
-        # Define the database connection
-        if not db:
-            logger.error('Database connection is not established.')
-            st.error('Gerenciador do banco não disponível.')
-            return {}
-
-        logger.info(f'Buscar publicações para o fornecedor: {supplier_code}')
-
-        query = f"""
-        SELECT
-            CODPUB_0 AS Codigo,
-            DESPUB_0 AS Descricao
-        FROM
-            {schema}.ZPUBLIC
-        WHERE
-            DISTVSP_0 = 2
-            AND BPSREF_0 = :sup_code
-        ORDER BY
-            DESPUB_0;
-        """
-        params = {'sup_code': supplier_code}
-
         try:
-            df_pubs = db.run_query(query, params)
-
-            if df_pubs.empty:
-                logger.warning(f'Nenhuma publicação encontrada para o fornecedor {supplier_code}.')
-                return {}
-            else:
-                # Cria o dicionário {Nome/Descrição: Codigo}
-                publication_dict = pd.Series(df_pubs.Codigo.values, index=df_pubs.Descricao).to_dict()
-                logger.info(f'Encontradas {len(publication_dict)} publicações para o fornecedor {supplier_code}.')
-                return publication_dict
+            publication_dict = catalog_index.get(schema).publications.get(supplier_code, {})
         except Exception as e:
             logger.error(f'Erro ao buscar publicações para o fornecedor {supplier_code}: {e}', exc_info=True)
             st.error(f'Erro ao carregar publicações do fornecedor: {e}')
             return {}
+
+        if not publication_dict:
+            logger.warning(f'Nenhuma publicação encontrada para o fornecedor {supplier_code}.')
+        return publication_dict
@@ -1,16 +1,125 @@
 import datetime
+import functools
 import logging
-import math
+import threading
+from concurrent.futures import Future
+from typing import Callable, Iterable, Mapping, Optional
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import streamlit as st
-
-from core.database import db
-from utils.comparison_table_data import ComparisonTableData
+from streamlit.runtime.scriptrunner import ScriptRunContext, add_script_run_ctx, get_script_run_ctx
+from streamlit.runtime.scriptrunner_utils.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+
+from core.data_version import data_version, version_token
+from core.database import PARTITION_MONTHS, db
+from core.disk_cache import disk_cache
+from core.prefetch import prefetch
+from core.shared_cache import shared_cache
+from services.sales_queries import (
+    SALES_BY_ISSUE_SCHEMA,
+    SUPPLIER_SALES_SCHEMA,
+    UNSOLDS_DTYPE,
+    sales_by_issue_query,
+    sales_by_supplier_query,
+    sales_frame_from_arrow,
+)
+from utils.comparison_table_html import COMPARISON_TABLE_CSS, comparison_table_html
+from utils.issue_alignment import ALIGN_POSITION, align_years
+from utils.sales_metrics import compute_sales_variations, metrics_record, sales_variation_arrays, yearly_metrics
 
 logger = logging.getLogger(__name__)
 
+# Tabelas de origem dos dados de vendas: o cache só é invalidado quando uma delas muda
+SALES_SOURCE_TABLES = ('ZITMINP', 'SINVOICE', 'ZBPCEST')
+
+# Atualização incremental do ano em curso: só as edições dos últimos dias são lidas de novo
+INCREMENTAL_WINDOW_DAYS = 60
+# Idade máxima (s) da última leitura completa usada como base; depois disso lê tudo outra vez
+INCREMENTAL_BASE_MAX_AGE = 24 * 3600
+# A atualização incremental só compensa a leitura e a junção da base com bastantes edições fora da janela
+# (mínimo de edições mantidas e fração máxima da base dentro da janela); senão lê o ano completo
+INCREMENTAL_MIN_FROZEN_ROWS = 20
+INCREMENTAL_MAX_RECENT_SHARE = 0.5
+
+# Colunas de cada ano no painel multi-ano
+PANEL_METRICS = ['Issue', 'Date', 'Supply', 'Sales', 'Unsolds', 'Outlet']
+
+# Colunas de cada ano no portfólio do fornecedor: {coluna: métrica de yearly_metrics}
+PORTFOLIO_METRICS = {
+    'Issues': 'count_supply',
+    'Supply': 'total_supply',
+    'Sales': 'total_sales',
+    'Unsolds': 'total_unsold',
+    'Outlet': 'total_outlet',
+    'AvgSales': 'avg_sales',
+}
+# Leituras de vendas longas divididas por 'month' ou 'quarter' e executadas em paralelo ('none': uma só query)
+SALES_QUERY_PARTITION = st.secrets.get('database', {}).get('query_partition', 'quarter')
+# Só intervalos acima de um ano são divididos: as fatias de um ano continuam numa query (os anos em falta
+# de fetch_sales_years correm em paralelo no mesmo pool)
+PARTITION_MIN_DAYS = 366
+
+# Tabelas de origem do portfólio: as vendas e a lista de publicações do fornecedor
+PORTFOLIO_SOURCE_TABLES = ('ZPUBLIC', *SALES_SOURCE_TABLES)
+
+
+def is_closed_year(year: int) -> bool:
+    """A year is closed once its last issues are out of the incremental window: its sales no longer change."""
+    return datetime.date(year, 12, 31) + datetime.timedelta(days=INCREMENTAL_WINDOW_DAYS) < datetime.date.today()
+
+
+def incremental_watermark(year: int, today: Optional[datetime.date] = None) -> Optional[datetime.date]:
+    """
+    First distribution date re-read by the incremental refresh of `year` (today - INCREMENTAL_WINDOW_DAYS).
+    None while the window still covers most of the year (watermark on Jan 1 or less than a window after it):
+    the windowed query plus the merge would then cost more than a plain full fetch.
+    """
+    today = today or datetime.date.today()
+    watermark = today - datetime.timedelta(days=INCREMENTAL_WINDOW_DAYS)
+    if (watermark - datetime.date(year, 1, 1)).days < INCREMENTAL_WINDOW_DAYS:
+        return None
+    return watermark
+
+
+def _sales_year_version(schema: str, publication: str, year: int) -> Optional[tuple]:
+    """Version of a (publication, year) slice: closed years never change, open ones follow the source tables."""
+    if is_closed_year(year):
+        return None
+    return data_version.get(schema, SALES_SOURCE_TABLES)
+
+
+def _supplier_sales_version(schema: str, supplier: str, year: int) -> tuple:
+    """Version of a supplier portfolio: the sales of a closed year no longer change, only its titles can."""
+    tables = ('ZPUBLIC',) if is_closed_year(year) else PORTFOLIO_SOURCE_TABLES
+    return data_version.get(schema, tables)
+
+
+def _run_in_session(ctx: Optional[ScriptRunContext], func: Callable, *args):
+    """
+    Runs func(*args) on a pool thread with the ScriptRunContext of the session that asked for it,
+    so that st.error/st.warning reach its page, and detaches it afterwards (the thread serves other sessions).
+    """
+    thread = threading.current_thread()
+    if ctx is not None:
+        add_script_run_ctx(thread, ctx)
+    try:
+        return func(*args)
+    finally:
+        setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+
+
+def _resolve(future: Future, func: Callable, *args):
+    """Runs func(*args) and sets its result (or exception) on `future`."""
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        future.set_result(func(*args))
+    except BaseException as e:
+        future.set_exception(e)
+
 
 class SalesBoardsService:
     """
@@ -22,11 +131,199 @@ class SalesBoardsService:
         pass
 
     @staticmethod
-    @st.cache_data(ttl=600)
     def fetch_sales_data(schema: str, publication: str, year: int) -> pd.DataFrame:
         """
-        Fetches sales data from the database for the specified publication and years.
-        This function MUST be adapted with the correct SQL query for your database.
+        Fetches sales data for the specified publication and years (year - 1 and year).
+        """
+
+        return SalesBoardsService.fetch_sales_years(schema, publication, (year - 1, year))
+
+    @staticmethod
+    def fetch_sales_years(schema: str, publication: str, years: Iterable[int]) -> pd.DataFrame:
+        """
+        Assembles the sales data of several years from the cached (publication, year) slices:
+        only the years not cached yet are queried, so adjacent reports share their common years.
+        The missing years are queried in parallel on the bounded pool of the database
+        (db.map_bounded), so a multi-year trend costs about its slowest year instead of their sum.
+        Args:
+            schema (str): The database schema to query.
+            publication (str): Publication code.
+            years (Iterable[int]): Years to include.
+        Returns:
+            pd.DataFrame: The slices of the years with data, in ascending year order.
+        """
+
+        fetch_year = functools.partial(SalesBoardsService.fetch_sales_year, schema, publication)
+        years = sorted(set(years))
+        missing = [year for year in years if not SalesBoardsService.fetch_sales_year.cached(schema, publication, year)]
+        # Uma fatia de um ano é uma só query (abaixo de PARTITION_MIN_DAYS): não espera pelo próprio pool
+        loaded = dict(zip(missing, db.map_bounded(fetch_year, missing))) if db and len(missing) > 1 else {}
+        slices = [loaded[year] if year in loaded else fetch_year(year) for year in years]
+        slices = [df for df in slices if not df.empty]
+        if not slices:
+            return pd.DataFrame()
+        return pd.concat(slices, ignore_index=True)
+
+    @staticmethod
+    def fetch_sales_years_concurrently(schema: str, publication: str, years: Iterable[int]) -> dict[int, Future]:
+        """
+        Starts loading the (publication, year) slices of `years` at the same time, so that the page
+        can show each year as soon as it arrives. The years not cached yet run on the bounded pool
+        of the database (db.submit_bounded: at most max_parallel_queries queries in the whole
+        process); cached years are resolved at once, never queued behind a slower year.
+        Args:
+            schema (str): The database schema to query.
+            publication (str): Publication code.
+            years (Iterable[int]): Years to load.
+        Returns:
+            dict[int, Future]: The future of each year's frame (fetch_sales_year).
+        """
+
+        fetch_year = SalesBoardsService.fetch_sales_year
+        # Avisos e erros da leitura (st.error) continuam a chegar à sessão que pediu o relatório
+        ctx = get_script_run_ctx(suppress_warning=True)
+        futures = {}
+        for year in sorted(set(years)):
+            if db and not fetch_year.cached(schema, publication, year):
+                # Uma fatia de um ano é uma só query (abaixo de PARTITION_MIN_DAYS): não espera pelo próprio pool
+                futures[year] = db.submit_bounded(_run_in_session, ctx, fetch_year, schema, publication, year)
+            else:
+                futures[year] = Future()
+                _resolve(futures[year], fetch_year, schema, publication, year)
+        return futures
+
+    @staticmethod
+    def prefetch_sales_years(schema: str, publication: str, years: Iterable[int], user: str) -> int:
+        """
+        Starts loading, in the background, the (publication, year) slices not cached yet, so that
+        fetch_sales_years finds them ready (or joins the load in progress) when the report is asked.
+        Args:
+            schema (str): The database schema to query.
+            publication (str): Publication code.
+            years (Iterable[int]): Years the report will need.
+            user (str): Session user, for the per-user prefetch cap.
+        Returns:
+            int: Number of slices scheduled.
+        """
+
+        fetch_year = SalesBoardsService.fetch_sales_year
+        scheduled = 0
+        # O ano atual primeiro: é o que muda e o que o relatório mostra
+        for year in sorted(set(years), reverse=True):
+            if not fetch_year.cached(schema, publication, year):
+                key = ('sales_year', schema, publication, year)
+                scheduled += prefetch.submit(user, key, functools.partial(fetch_year, schema, publication, year))
+        return scheduled
+
+    @staticmethod
+    def prefetch_supplier_sales(schema: str, supplier: str, year: int, user: str) -> bool:
+        """Starts loading the supplier portfolio in the background (see prefetch_sales_years)."""
+
+        fetch_supplier = SalesBoardsService.fetch_supplier_sales
+        if fetch_supplier.cached(schema, supplier, year):
+            return False
+        key = ('supplier_sales', schema, supplier, year)
+        return prefetch.submit(user, key, functools.partial(fetch_supplier, schema, supplier, year))
+
+    @staticmethod
+    @shared_cache(max_entries=2048, version=_sales_year_version, skip_empty=True)
+    def fetch_sales_year(schema: str, publication: str, year: int) -> pd.DataFrame:
+        """
+        Fetches the sales data of one publication in one year.
+        The shared memory cache is the first tier (read-only frame, no copy per rerun) and the
+        disk cache the second one: closed years are kept permanently, open years are stored
+        under the version of their source tables and refreshed incrementally. Empty results
+        (no sales or a failed query) are kept by neither tier and are queried again.
+        """
+
+        closed = is_closed_year(year)
+        cache_key = (schema, publication, year)
+        if not closed:
+            cache_key += (version_token(data_version.get(schema, SALES_SOURCE_TABLES)),)
+
+        cached = disk_cache.get('sales_year', cache_key)
+        if cached is not None:
+            logger.info(f'Dados de vendas de {publication}/{year} lidos do cache em disco ({cached.num_rows} linhas).')
+            return sales_frame_from_arrow(cached)
+
+        df = None if closed else SalesBoardsService._refresh_incremental(schema, publication, year)
+        if df is None:
+            df = SalesBoardsService._query_sales_data(schema, publication, year)
+            if not closed:
+                SalesBoardsService._put_incremental_base(schema, publication, year, df)
+
+        if not df.empty:
+            disk_cache.put('sales_year', cache_key, pa.Table.from_pandas(df, preserve_index=False))
+
+        return df
+
+    @staticmethod
+    def _put_incremental_base(schema: str, publication: str, year: int, df: pd.DataFrame):
+        """Keeps a full fetch of an open year as the base of its next incremental refreshes."""
+        # Menos edições do que o mínimo a manter: a atualização incremental nunca compensaria (nem a leitura da base)
+        if len(df) < max(INCREMENTAL_MIN_FROZEN_ROWS, 1):
+            return
+        disk_cache.put('sales_year_base', (schema, publication, year), pa.Table.from_pandas(df, preserve_index=False))
+
+    @staticmethod
+    def _refresh_incremental(schema: str, publication: str, year: int) -> Optional[pd.DataFrame]:
+        """
+        Rebuilds an open year from its last full fetch: the issues distributed before the
+        watermark (incremental_watermark) are kept as they were, the recent ones are fetched
+        again and appended. The base decides whether this pays off: with fewer than
+        INCREMENTAL_MIN_FROZEN_ROWS issues before the watermark, or more than
+        INCREMENTAL_MAX_RECENT_SHARE of them inside the window, the windowed query plus the
+        merge cost more than a full fetch.
+        Returns:
+            pd.DataFrame | None: The merged frame, or None when a full fetch is needed (window
+            covering most of the year, no base, base older than INCREMENTAL_BASE_MAX_AGE, base
+            too small or too recent, or query error).
+        """
+
+        watermark = incremental_watermark(year)
+        if watermark is None:
+            return None
+
+        base = disk_cache.get('sales_year_base', (schema, publication, year), ttl=INCREMENTAL_BASE_MAX_AGE)
+        if base is None:
+            return None
+
+        frozen = base.filter(pc.field('Date') < pa.scalar(watermark, pa.date32()))
+        if (
+            frozen.num_rows < INCREMENTAL_MIN_FROZEN_ROWS
+            or base.num_rows - frozen.num_rows > INCREMENTAL_MAX_RECENT_SHARE * base.num_rows
+        ):
+            logger.info(
+                f'Atualização incremental de {publication}/{year} não compensa ({frozen.num_rows} de '
+                f'{base.num_rows} edições antes de {watermark}): leitura completa.'
+            )
+            return None
+
+        recent = SalesBoardsService._query_sales_data(schema, publication, year, since=watermark)
+        if recent.columns.empty:
+            # Erro na query: não arriscar um relatório parcial
+            return None
+
+        frozen = sales_frame_from_arrow(frozen)
+
+        # As edições recentes têm datas >= watermark: a concatenação mantém a ordem da query
+        df = pd.concat([frozen, recent], ignore_index=True)
+        logger.info(
+            f'Atualização incremental de {publication}/{year}: {len(frozen)} edições mantidas, '
+            f'{len(recent)} lidas desde {watermark}.'
+        )
+        return df
+
+    @staticmethod
+    def _query_sales_data(
+        schema: str, publication: str, year: int, since: Optional[datetime.date] = None
+    ) -> pd.DataFrame:
+        """
+        Queries the database for the sales data of the publication in one year.
+        Args:
+            since (datetime.date, optional): Only the issues distributed on or after this date
+                (incremental refresh). An empty result then keeps its columns, so that it can be
+                told apart from a failed query (a DataFrame without columns).
         """
 
         if not db:  # Verifica se db e seu engine foram inicializados
@@ -35,67 +332,67 @@ class SalesBoardsService:
             return pd.DataFrame()
 
         end_date = datetime.date(year, 12, 31).strftime('%Y-%m-%d')
-        start_date = datetime.date(year - 1, 1, 1).strftime('%Y-%m-%d')
-        logger.info(
-            f'Buscar dados de vendas para Pub: {publication}, Ano Anterior: {start_date[:4]}, Ano Atual: {end_date[:4]}'
-        )
+        start_date = (since or datetime.date(year, 1, 1)).strftime('%Y-%m-%d')
+        logger.info(f'Buscar dados de vendas para Pub: {publication}, Ano: {year}, desde {start_date}')
 
-        query = f"""
-        SELECT
-            YEAR(a.DISDAT_0) as Year,
-            a.NUMEDI_0 as Issue,
-            a.DISDAT_0 as Date,
-            a.QTYRREC_0 as Supply,
-            ((a.QTYREXP_0+ISNULL(CONVERT(int,b.QTY_0),0))-a.QTYRDEV_0) as Sales,
-            ISNULL(c.OUT,0) as Outlet
-        FROM {schema}.ZITMINP a WITH (NOLOCK)
-        LEFT JOIN (SELECT x.ITMREF_0,SUM(CASE WHEN y.INVTYP_0=2 THEN x.QTY_0*-1 ELSE x.QTY_0 END) AS QTY_0
-                FROM {schema}.SINVOICED x WITH (NOLOCK)
-                INNER JOIN {schema}.SINVOICE y WITH (NOLOCK) ON y.NUM_0=x.NUM_0
-                WHERE x.CPY_0='INP'
-                AND x.BPCINV_0 NOT IN (SELECT VALEUR_0 FROM {schema}.ADOVAL WITH (NOLOCK) WHERE PARAM_0='BPCINV')
-                GROUP BY x.ITMREF_0) b ON b.ITMREF_0=a.ITMREF_0
-        LEFT JOIN (SELECT ITMREF_0,COUNT(1) AS OUT FROM {schema}.ZBPCEST GROUP BY ITMREF_0) c ON c.ITMREF_0=a.ITMREF_0
-        WHERE a.DISTVSP_0=2
-        AND a.PERNUM_0>1
-        AND a.CODPUB_0=:pub_param
-        AND a.DISDAT_0 BETWEEN :start_date AND :end_date
-        ORDER BY a.DISDAT_0,a.NUMEDI_0
-        """
+        query = sales_by_issue_query(schema)
         params = {'pub_param': publication, 'start_date': start_date, 'end_date': end_date}
 
-        df = db.run_query(query, params)
+        try:
+            table = SalesBoardsService._run_sales_query(query, params, SALES_BY_ISSUE_SCHEMA)
+        except Exception as e:
+            st.error(f'Erro de banco de dados ao buscar dados de vendas: {e}')
+            return pd.DataFrame()
 
-        if df.empty:
+        if table.num_rows == 0:
+            if since is not None:
+                return sales_frame_from_arrow(table).assign(Unsolds=pd.Series(dtype=UNSOLDS_DTYPE))
             logger.warning(f'Nenhum dado retornado do banco para os parâmetros: {params}')
             return pd.DataFrame()
 
-        logger.info(f'Dados brutos recebidos do banco ({len(df)} linhas). Colunas: {df.columns.tolist()}')
+        return SalesBoardsService._sales_frame(table, params)
 
-        # Garantir tipos de dados corretos (especialmente Data)
-        try:
-            df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    @staticmethod
+    def _run_sales_query(query: str, params: dict, schema: pa.Schema) -> pa.Table:
+        """
+        Runs a date-bounded sales query, split by month/quarter on parallel connections when it spans over a year.
+        Errors are logged and raised, so that a failure is never taken (and cached) as a period without sales.
+        """
+        days = (
+            datetime.date.fromisoformat(str(params['end_date']))
+            - datetime.date.fromisoformat(str(params['start_date']))
+        ).days
+        if SALES_QUERY_PARTITION in PARTITION_MONTHS and days >= PARTITION_MIN_DAYS:
+            return db.run_query_arrow_partitioned(
+                query, params, SALES_QUERY_PARTITION, schema=schema, raise_errors=True
+            )
+        return db.run_query_arrow(query, params, schema=schema, raise_errors=True)
 
-            # Converter colunas numéricas, tratando possíveis erros se não forem numéricas
-            for col in ['Year', 'Supply', 'Sales', 'Outlet']:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+    @staticmethod
+    def _sales_frame(table: pa.Table, params: dict) -> pd.DataFrame:
+        """Converts a non-empty sales query result to the compact frame, with the Unsolds column."""
+
+        logger.info(f'Dados brutos recebidos do banco ({table.num_rows} linhas). Colunas: {table.column_names}')
 
-            # Remover linhas onde a conversão falhou (dados inválidos)
-            original_len = len(df)
-            df = df.dropna(subset=['Date', 'Year', 'Supply', 'Sales', 'Issue', 'Outlet'])
-            if len(df) < original_len:
+        # Os tipos já vêm compactos do Arrow (SALES_BY_ISSUE_SCHEMA): um único passo até ao pandas
+        try:
+            # Remover linhas com valores nulos/inválidos antes da conversão (mantém os inteiros compactos)
+            original_len = table.num_rows
+            table = table.drop_null()
+            if table.num_rows < original_len:
                 logger.warning(
-                    f'{original_len - len(df)} linhas removidas devido a valores '
+                    f'{original_len - table.num_rows} linhas removidas devido a valores '
                     f'nulos/inválidos após conversão de tipos.'
                 )
 
+            df = sales_frame_from_arrow(table)
+
             # Calcular coluna Unsolds
-            df['Unsolds'] = np.where(
-                df['Supply'] > 0,
-                np.ceil(((df['Supply'] - df['Sales']) / df['Supply']) * 100).astype(int),
-                0,
-            )
+            supply = df['Supply'].to_numpy()
+            sales = df['Sales'].to_numpy()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                unsold_perc = np.ceil(((supply - sales) / supply) * 100)
+            df['Unsolds'] = np.where(supply > 0, unsold_perc, 0).astype(UNSOLDS_DTYPE)
 
         except Exception as e:
             logger.error(f'Erro durante a conversão de tipos de dados: {e}', exc_info=True)
@@ -108,63 +405,114 @@ class SalesBoardsService:
         return df
 
     @staticmethod
-    def calculate_metrics(df: pd.DataFrame, year: int) -> dict[str, int]:  # noqa: PLR0914
+    @shared_cache(max_entries=256, version=_supplier_sales_version, skip_empty=True)
+    def fetch_supplier_sales(schema: str, supplier: str, year: int) -> pd.DataFrame:
         """
-        Process the dataframe to calculate metrics for the specified year.
+        Fetches the per-issue sales of every publication of a supplier in year - 1 and year,
+        with one set-based query (sales_by_supplier_query) instead of one query per title.
         Args:
-            df (pd.DataFrame): DataFrame containing sales data.
-            year (int): Year for which to calculate metrics.
+            schema (str): The database schema to query.
+            supplier (str): Supplier code (ZPUBLIC.BPSREF_0).
+            year (int): Current year of the comparison.
         Returns:
-            dict: dictionary with calculated metrics.
+            pd.DataFrame: The sales_by_issue rows of all the titles, with a Publication column.
         """
 
-        cols = df.columns.tolist()
-        df_processed = df[cols].copy()
-
-        # Calcular Totais
-        total_supply = df_processed['Supply'].sum()
-        total_sales = df_processed['Sales'].sum()
-        total_outlet = df_processed['Outlet'].sum()
-        total_unsold_perc = np.nan
-        if total_supply > 0:
-            total_unsold_calc = (total_supply - total_sales) / total_supply
-            total_unsold_perc = math.ceil(total_unsold_calc * 100) if pd.notnull(total_unsold_calc) else np.nan
-
-        # Calcular Médias
-        avg_supply = df_processed['Supply'].mean()
-        avg_sales = df_processed['Sales'].mean()
-        avg_outlet = df_processed['Outlet'].mean()
-        avg_unsold_perc = np.nan
-
-        # Checar se avg_supply não é NaN e é maior que 0 antes de calcular
-        if pd.notnull(avg_supply) and avg_supply > 0:
-            # Também precisamos garantir que avg_sales não seja NaN para o cálculo
-            if pd.notnull(avg_sales):
-                avg_unsold_calc = (avg_supply - avg_sales) / avg_supply
-                avg_unsold_perc = math.ceil(avg_unsold_calc * 100) if pd.notnull(avg_unsold_calc) else np.nan
-
-        return_metrics = {
-            'total_supply': int(total_supply),
-            'total_sales': int(total_sales),
-            'total_outlet': int(total_outlet),
-            'total_unsold': int(total_unsold_perc),
-            'avg_supply': int(avg_supply),
-            'avg_sales': int(avg_sales),
-            'avg_outlet': int(avg_outlet),
-            'avg_unsold': int(avg_unsold_perc),
+        if not db:
+            st.error('Gerenciador do banco não disponível para buscar dados de vendas.')
+            logger.error('Gerenciador do banco não disponível para buscar dados de vendas.')
+            return pd.DataFrame()
+
+        params = {'supplier_param': supplier, 'start_date': f'{year - 1}-01-01', 'end_date': f'{year}-12-31'}
+        logger.info(f'Buscar dados de vendas do fornecedor {supplier}, Anos: {year - 1} e {year}')
+
+        try:
+            table = SalesBoardsService._run_sales_query(sales_by_supplier_query(schema), params, SUPPLIER_SALES_SCHEMA)
+        except Exception as e:
+            st.error(f'Erro de banco de dados ao buscar dados de vendas do fornecedor: {e}')
+            return pd.DataFrame()
+
+        if table.num_rows == 0:
+            logger.warning(f'Nenhum dado retornado do banco para os parâmetros: {params}')
+            return pd.DataFrame()
+
+        return SalesBoardsService._sales_frame(table, params)
+
+    @staticmethod
+    def publication_sales(df_supplier: pd.DataFrame, publication: str) -> pd.DataFrame:
+        """The rows of one publication of fetch_supplier_sales, in the layout of fetch_sales_data."""
+        return df_supplier[df_supplier['Publication'] == publication].drop(columns='Publication')
+
+    @staticmethod
+    def create_portfolio_summary(
+        df_supplier: pd.DataFrame, year_current: int, names: Optional[Mapping[str, str]] = None
+    ) -> pd.DataFrame:
+        """
+        Builds the supplier portfolio: one row per publication with the totals of both years, the
+        average sales per issue and the sales variations, computed in one grouped pass over all
+        the titles (yearly_metrics by Publication and Year).
+        Args:
+            df_supplier (pd.DataFrame): Result of fetch_supplier_sales.
+            year_current (int): Current year of the comparison.
+            names (Mapping[str, str], optional): {publication code: description}.
+        Returns:
+            pd.DataFrame: The summary, sorted by the current year sales (highest first).
+        """
+
+        if df_supplier.empty:
+            st.warning('Não há dados processados para exibir o portfólio do fornecedor.')
+            return pd.DataFrame()
+
+        years = [year_current - 1, year_current]
+        metrics = yearly_metrics(df_supplier, extra=['count'], by=('Publication', 'Year'))
+        wide = metrics.unstack('Year').reindex(columns=pd.MultiIndex.from_product([metrics.columns, years]))
+
+        summary = pd.DataFrame(index=wide.index)
+        if names is not None:
+            summary['Description'] = wide.index.map(names)
+        for year in years:
+            suffix = year - 2000
+            for column, metric in PORTFOLIO_METRICS.items():
+                summary[f'{column}_{suffix}'] = wide[(metric, year)]
+            summary[f'Unsolds_{suffix}'] /= 100
+
+        # Variação das vendas totais e médias de todas as publicações de uma vez
+        sales = {
+            year: wide[[('total_sales', year), ('avg_sales', year)]].to_numpy(dtype='float64', na_value=np.nan)
+            for year in years
         }
+        copies_var, percent_var = sales_variation_arrays(sales[years[0]], sales[years[1]])
+        for position, prefix in enumerate(('', 'Avg')):
+            summary[f'{prefix}Copies_var'] = pd.array(np.round(copies_var[:, position]), dtype='Int64')
+            summary[f'{prefix}%_var'] = pd.array(percent_var[:, position], dtype='Float64')
+
+        summary = summary.sort_values(f'Sales_{year_current - 2000}', ascending=False, na_position='last')
+        return summary.reset_index()
+
+    @staticmethod
+    def calculate_metrics(df: pd.DataFrame, year: int, extra: Iterable[str] = ()) -> dict[str, Optional[int]]:
+        """
+        Process the dataframe to calculate metrics for the specified year.
+        Args:
+            df (pd.DataFrame): DataFrame containing sales data (may hold other years too).
+            year (int): Year for which to calculate metrics.
+            extra (Iterable[str]): Additional statistics, see yearly_metrics.
+        Returns:
+            dict: dictionary with calculated metrics (None when the year has no value).
+        """
 
-        return return_metrics
+        return metrics_record(yearly_metrics(df, extra), year)
 
     @staticmethod
-    def create_comparison_table(  # noqa: PLR0912, PLR0914, PLR0915
-        df_data: pd.DataFrame, year_current: int
-    ) -> tuple[pd.DataFrame, dict[str, int], dict[str, int]]:
+    def create_comparison_table(  # noqa: PLR0914
+        df_data: pd.DataFrame, year_current: int, alignment: str = ALIGN_POSITION
+    ) -> tuple[pd.DataFrame, dict[str, Optional[int]], dict[str, Optional[int]]]:
         """
         Create a comparison table for the sales data.
         Args:
             df_data (pd.DataFrame): DataFrame containing sales data.
             year_current (int): Current year for comparison.
+            alignment (str): How the issues of the two years are paired (see align_years).
             Returns:
                 tuple: Two DataFrames for the previous year and current year.
         """
@@ -174,19 +522,17 @@ class SalesBoardsService:
             st.warning('Não há dados processados para exibir a tabela de comparação.')
             return empty_df, {}, {}
 
-        # Split the DataFrame into two parts: previous year and current year
-        df_prev_year = df_data[df_data['Year'] == year_current - 1].copy().reset_index(drop=True)
-        df_current_year = df_data[df_data['Year'] == year_current].copy().reset_index(drop=True)
-
-        prev_metrics = SalesBoardsService.calculate_metrics(df_prev_year, year_current - 1)
-        curr_metrics = SalesBoardsService.calculate_metrics(df_current_year, year_current)
+        # Métricas dos dois anos numa só agregação, sobre os dados originais
+        metrics = yearly_metrics(df_data)
+        prev_metrics = metrics_record(metrics, year_current - 1)
+        curr_metrics = metrics_record(metrics, year_current)
 
-        df_full = pd.merge(
-            df_prev_year, df_current_year, left_index=True, right_index=True, how='outer', suffixes=('_prev', '_curr')
-        )
+        # Split the DataFrame into two parts: previous year and current year
+        df_prev_year = df_data[df_data['Year'] == year_current - 1]
+        df_current_year = df_data[df_data['Year'] == year_current]
 
-        df_full['Copies_var'] = pd.NA
-        df_full['%_var'] = pd.NA
+        # Pares de edições segundo a estratégia escolhida (por omissão, a posição no ano)
+        df_full = align_years(df_prev_year, df_current_year, alignment)
 
         prev_suffix = (year_current - 1) - 2000
         curr_suffix = year_current - 2000
@@ -207,37 +553,10 @@ class SalesBoardsService:
         sales_prev_column = f'Sales_{prev_suffix}'
         sales_curr_column = f'Sales_{curr_suffix}'
 
-        # Ensure numeric types for sales columns
-        if sales_prev_column in df_full.columns:
-            df_full[sales_prev_column] = pd.to_numeric(df_full[sales_prev_column], errors='coerce')
-        if sales_curr_column in df_full.columns:
-            df_full[sales_curr_column] = pd.to_numeric(df_full[sales_curr_column], errors='coerce')
-
-        # Calculate differences
-        for index, row in df_full.iterrows():
-            sales_prev = row[sales_prev_column]
-            sales_curr = row[sales_curr_column]
-
-            if pd.notna(sales_prev) and pd.notna(sales_curr):
-                # Calculate the difference in copies
-                copies_diff = sales_curr - sales_prev
-                df_full.at[index, 'Copies_var'] = copies_diff
-
-                # Calculate the percentage difference
-                if sales_prev != 0:
-                    percent_diff = copies_diff / sales_prev  # * 100
-                else:
-                    percent_diff = 0.0
-
-                if pd.notna(percent_diff) and np.isfinite(percent_diff):
-                    df_full.at[index, '%_var'] = percent_diff
-                else:
-                    df_full.at[index, '%_var'] = pd.NA
-
-            else:
-                # Store the results in the new columns
-                df_full.at[index, 'Copies_var'] = pd.NA
-                df_full.at[index, '%_var'] = pd.NA
+        # Calculate differences (Int64 copies, Float64 percentage)
+        df_full['Copies_var'], df_full['%_var'] = compute_sales_variations(
+            df_full[sales_prev_column], df_full[sales_curr_column]
+        )
 
         df_full[unsold_prev_column] /= 100
         df_full[unsold_curr_column] /= 100
@@ -245,258 +564,97 @@ class SalesBoardsService:
         return df_full, prev_metrics, curr_metrics
 
     @staticmethod
-    def display_comparison_table_html(table_data: ComparisonTableData):
+    def create_comparison_summary(prev_metrics: Mapping, curr_metrics: Mapping, year_current: int) -> pd.DataFrame:
         """
-        Constrói e exibe a tabela de comparação em HTML usando st.markdown.
+        Totals and averages of the comparison, in the columns of create_comparison_table
+        (without Year_prev/Year_curr), to be shown pinned under the issue rows.
+        Args:
+            prev_metrics (Mapping): Metrics of the previous year.
+            curr_metrics (Mapping): Metrics of the current year.
+            year_current (int): Current year of the comparison.
+        Returns:
+            pd.DataFrame: Two rows, 'Total' and 'Average' in the Issue columns.
         """
-        SalesBoardsService._display_comparison_table_html_impl(table_data)
+
+        kinds = ('total', 'avg')
+        columns = {}
+        for year, metrics in ((year_current - 1, prev_metrics), (year_current, curr_metrics)):
+            suffix = year - 2000
+            columns[f'Issue_{suffix}'] = pd.array(['Total', 'Average'], dtype='string[pyarrow]')
+            columns[f'Date_{suffix}'] = pd.array([None, None], dtype=pd.ArrowDtype(pa.date32()))
+            for metric in ('supply', 'sales', 'outlet'):
+                columns[f'{metric.capitalize()}_{suffix}'] = pd.array(
+                    [metrics.get(f'{kind}_{metric}') for kind in kinds], dtype='Int64'
+                )
+            # Percentagem inteira nas métricas, fração na tabela (formato percent)
+            unsold = [metrics.get(f'{kind}_unsold') for kind in kinds]
+            columns[f'Unsolds_{suffix}'] = pd.array(
+                [None if value is None else value / 100 for value in unsold], dtype='Float64'
+            )
+
+        summary = pd.DataFrame(columns)
+        summary['Copies_var'], summary['%_var'] = compute_sales_variations(
+            summary[f'Sales_{year_current - 1 - 2000}'], summary[f'Sales_{year_current - 2000}']
+        )
+        return summary
 
     @staticmethod
-    def _display_comparison_table_html_impl(table_data):
-        # Estilos CSS para a tabela
-        table_style = """
-        <style>
-            table {
-                border-collapse: collapse;
-                width: 100%;
-                font-size: 0.9em;
-            }
-            th, td {
-                border: 1px solid #5681d0;
-                text-align: center;
-                padding: 8px;
-            }
-            th {
-                background-color: #1a1a3d;
-            }
-            .header-year {
-                font-weight: bold;
-                font-size: 1.1em;
-            }
-            .sub-header {
-                font-style: italic;
-            }
-            .total-avg-label {
-                text-align: left;
-                font-weight: bold;
-            }
-            .variation-header {
-                font-weight: bold;
-            }
-        </style>
+    def create_trend_panel(df_data: pd.DataFrame, years: list[int]) -> tuple[pd.DataFrame, pd.DataFrame]:
         """
-        st.markdown(table_style, unsafe_allow_html=True)
-
-        xpto = """
-            <table>
-                <thead>
-                    <tr>
-                        <th colspan="6" class="header-year">1999</th>
-                        <th colspan="6" class="header-year">2000</th>
-                        <th colspan="2" class="variation-header">Variations</th>
-                    </tr>
-                    <tr>
-                        <th colspan="1" class="sub-header"></th>
-                        <th colspan="5" class="sub-header">Per Issue</th>
-                        <th colspan="1" class="sub-header"></th>
-                        <th colspan="5" class="sub-header">Per Issue</th>
-                        <th colspan="2" class="sub-header">Sales</th>
-                    </tr>
-                    <tr>
-                        <th>Issue</th><th>Date</th><th>Supply</th><th>Sales</th><th>% Unsold</th><th>Out</th>
-                        <th>Issue</th><th>Date</th><th>Supply</th><th>Sales</th><th>% Unsold</th><th>Out</th>
-                        <th>Copies</th><th>%</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    <tr>
-                        <td>261</td>
-                        <td>2024-02-28 00:00:00</td>
-                        <td>2000</td>
-                        <td>226</td>
-                        <td>89%</td>
-                        <td>747</td>
-                        <td>-</td>
-                        <td>-</td>
-                        <td>-</td>
-                        <td>-</td>
-                        <td>-</td>
-                        <td>-</td>
-                        <td>-</td>
-                        <td>-</td>
-                    </tr>
-                </tbody>
-            </table>
+        Builds the multi-year panel: one row per issue position, one block of columns per year
+        ({metric}_{yy}, as in the comparison table) plus the sales variation against the previous
+        year. The panel comes from a single unstack and the yearly metrics from a single groupby.
+        Args:
+            df_data (pd.DataFrame): Sales data of the years (fetch_sales_years).
+            years (list[int]): Years of the panel, in ascending order.
+        Returns:
+            tuple: (panel, yearly metrics indexed by Year - see yearly_metrics).
         """
 
-        st.markdown(xpto, unsafe_allow_html=True)
+        if df_data.empty:
+            st.warning('Não há dados processados para exibir a tendência multi-ano.')
+            return pd.DataFrame(), pd.DataFrame()
 
-        html_table = SalesBoardsService._build_comparison_table_html(table_data)
+        data = df_data[df_data['Year'].isin(years)]
 
-        st.markdown(html_table, unsafe_allow_html=True)
+        # Alinhamento por posição: n-ésima edição de cada ano na mesma linha
+        position = data.groupby('Year', sort=False).cumcount().rename('Position')
+        wide = data.set_index([position, 'Year'])[PANEL_METRICS].unstack('Year')
 
-    @staticmethod
-    def _build_comparison_table_html(table_data):  # noqa: PLR0914
-        # Unpack for readability
-        (
-            comparison_rows,
-            total_prev,
-            total_curr,
-            avg_prev,
-            avg_curr,
-            var_total_sales_copies,
-            var_total_sales_perc,
-            var_avg_sales_copies,
-            var_avg_sales_perc,
-            previous_year,
-            current_year,
-        ) = (
-            table_data.comparison_rows,
-            table_data.total_prev,
-            table_data.total_curr,
-            table_data.avg_prev,
-            table_data.avg_curr,
-            table_data.var_total_sales_copies,
-            table_data.var_total_sales_perc,
-            table_data.var_avg_sales_copies,
-            table_data.var_avg_sales_perc,
-            table_data.previous_year,
-            table_data.current_year,
-        )
+        # Uma só reindexação: anos sem dados ficam com colunas vazias
+        wide = wide.reindex(columns=pd.MultiIndex.from_product([PANEL_METRICS, years]))
+        wide['Unsolds'] /= 100
 
-        html_table = f"""
-        <table>
-            <thead>
-                <tr>
-                    <th colspan="6" class="header-year">{previous_year}</th>
-                    <th colspan="6" class="header-year">{current_year}</th>
-                    <th colspan="2" class="variation-header">Variations</th>
-                </tr>
-                <tr>
-                    <th colspan="1" class="sub-header"></th>
-                    <th colspan="5" class="sub-header">Per Issue</th>
-                    <th colspan="1" class="sub-header"></th>
-                    <th colspan="5" class="sub-header">Per Issue</th>
-                    <th colspan="2" class="sub-header">Sales</th>
-                </tr>
-                <tr>
-                    <th>Issue</th><th>Date</th><th>Supply</th><th>Sales</th><th>% Unsold</th><th>Out</th>
-                    <th>Issue</th><th>Date</th><th>Supply</th><th>Sales</th><th>% Unsold</th><th>Out</th>
-                    <th>Copies</th><th>%</th>
-                </tr>
-            </thead>
-            <tbody>
+        # Variações de todos os pares de anos consecutivos de uma vez, sobre a matriz de vendas
+        sales = wide['Sales'].to_numpy(dtype='float64', na_value=np.nan)
+        copies_var, percent_var = sales_variation_arrays(sales[:, :-1], sales[:, 1:])
 
-        """
+        columns = {}
+        for index, year in enumerate(years):
+            suffix = year - 2000
+            for metric in PANEL_METRICS:
+                columns[f'{metric}_{suffix}'] = wide[(metric, year)]
+            if index > 0:
+                columns[f'Copies_var_{suffix}'] = pd.array(np.round(copies_var[:, index - 1]), dtype='Int64')
+                columns[f'%_var_{suffix}'] = pd.array(percent_var[:, index - 1], dtype='Float64')
 
-        for row in comparison_rows:
-            html_table += f"""
-                <tr>
-                    <td>{row['issue_prev']}</td>
-                    <td>{row['date_prev']}</td>
-                    <td>{row['supply_prev']}</td>
-                    <td>{row['sales_prev']}</td>
-                    <td>{row['unsold_prev']}</td>
-                    <td>{row['out_prev']}</td>
-                    <td>{row['issue_curr']}</td>
-                    <td>{row['date_curr']}</td>
-                    <td>{row['supply_curr']}</td>
-                    <td>{row['sales_curr']}</td>
-                    <td>{row['unsold_curr']}</td>
-                    <td>{row['out_curr']}</td>
-                    <td>{row['var_copies']}</td>
-                    <td>{row['var_perc']}</td>
-                </tr>
-            """
-
-        html_table += """
-                <tr>
-                    <td colspan="14"
-                        style="
-                            border-left: 1px solid #5681d0;
-                            border-right: 1px solid #5681d0;
-                            background-color: #1a1a3d;
-                            height: 2px;
-                        ">
-                    </td>
-                </tr>
-            """
-
-        def safe_fmt(val, key, percent=False):
-            if pd.notnull(val.get(key, None)):
-                if percent:
-                    return f'{val[key]:.0f}%'
-                return f'{val[key]:.0f}'
-            return '-'
-
-        total_prev_unsold_display = safe_fmt(total_prev, '% Unsold', percent=True)
-        total_curr_unsold_display = safe_fmt(total_curr, '% Unsold', percent=True)
-        total_prev_supply_display = safe_fmt(total_prev, 'Fornecimento')
-        total_prev_sales_display = safe_fmt(total_prev, 'Vendas')
-        total_prev_outlet_display = safe_fmt(total_prev, 'Outlet')
-        total_curr_supply_display = safe_fmt(total_curr, 'Fornecimento')
-        total_curr_sales_display = safe_fmt(total_curr, 'Vendas')
-        total_curr_outlet_display = safe_fmt(total_curr, 'Outlet')
-
-        html_table += f"""
-                <tr style="font-weight: bold;">
-                    <td class="total-avg-label" colspan="2">{total_prev.get('Edicao', '-')}</td>
-                    <td>{total_prev_supply_display}</td>
-                    <td>{total_prev_sales_display}</td>
-                    <td>{total_prev_unsold_display}</td>
-                    <td>{total_prev_outlet_display}</td>
-                    <td class="total-avg-label" colspan="2">{total_curr.get('Edicao', '-')}</td>
-                    <td>{total_curr_supply_display}</td>
-                    <td>{total_curr_sales_display}</td>
-                    <td>{total_curr_unsold_display}</td>
-                    <td>{total_curr_outlet_display}</td>
-                    <td>{var_total_sales_copies}</td>
-                    <td>{var_total_sales_perc}</td>
-                </tr>
-        """
+        panel = pd.DataFrame(columns).reset_index(drop=True)
+        return panel, yearly_metrics(data).reindex(years)
 
-        html_table += """
-                <tr>
-                    <td colspan="14"
-                        style="
-                            border-left: 1px solid #5681d0;
-                            border-right: 1px solid #5681d0;
-                            background-color: #1a1a3d;
-                            height: 2px;
-                        ">
-                    </td>
-                </tr>
-            """
-
-        avg_prev_unsold_display = safe_fmt(avg_prev, '% Unsold', percent=True)
-        avg_curr_unsold_display = safe_fmt(avg_curr, '% Unsold', percent=True)
-        avg_prev_supply_display = safe_fmt(avg_prev, 'Fornecimento')
-        avg_prev_sales_display = safe_fmt(avg_prev, 'Vendas')
-        avg_prev_outlet_display = safe_fmt(avg_prev, 'Outlet')
-        avg_curr_supply_display = safe_fmt(avg_curr, 'Fornecimento')
-        avg_curr_sales_display = safe_fmt(avg_curr, 'Vendas')
-        avg_curr_outlet_display = safe_fmt(avg_curr, 'Outlet')
-
-        html_table += f"""
-                <tr style="font-weight: bold;">
-                    <td class="total-avg-label" colspan="2">{avg_prev.get('Edicao', '-')}</td>
-                    <td>{avg_prev_supply_display}</td>
-                    <td>{avg_prev_sales_display}</td>
-                    <td>{avg_prev_unsold_display}</td>
-                    <td>{avg_prev_outlet_display}</td>
-                    <td class="total-avg-label" colspan="2">{avg_curr.get('Edicao', '-')}</td>
-                    <td>{avg_curr_supply_display}</td>
-                    <td>{avg_curr_sales_display}</td>
-                    <td>{avg_curr_unsold_display}</td>
-                    <td>{avg_curr_outlet_display}</td>
-                    <td>{var_avg_sales_copies}</td>
-                    <td>{var_avg_sales_perc}</td>
-                </tr>
+    @staticmethod
+    def display_comparison_table_html(
+        df_sales: pd.DataFrame, prev_metrics: Mapping, curr_metrics: Mapping, year_current: int
+    ):
         """
-
-        html_table += """
-            </tbody>
-        </table>
+        Shows the comparison table as HTML using st.markdown (styles and table in a single element).
+        Not used by the sales boards report, which pages this table with windowed_dataframe: the
+        HTML table sends every row to the browser on each rerun.
+        Args:
+            df_sales (pd.DataFrame): Result of create_comparison_table.
+            prev_metrics (Mapping): Metrics of the previous year.
+            curr_metrics (Mapping): Metrics of the current year.
+            year_current (int): Current year of the comparison.
         """
 
-        return html_table
+        html_table = comparison_table_html(df_sales, prev_metrics, curr_metrics, year_current)
+        st.markdown(COMPARISON_TABLE_CSS + html_table, unsafe_allow_html=True)
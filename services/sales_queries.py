@@ -0,0 +1,129 @@
+import pandas as pd
+import pyarrow as pa
+
+# Tipos compactos das colunas devolvidas por sales_by_issue_query (aplicados na leitura do cursor)
+SALES_BY_ISSUE_SCHEMA = pa.schema([
+    pa.field('Year', pa.int16()),
+    pa.field('Issue', pa.string()),
+    pa.field('Date', pa.date32()),
+    pa.field('Supply', pa.int32()),
+    pa.field('Sales', pa.int32()),
+    pa.field('Outlet', pa.int32()),
+])
+
+# sales_by_supplier_query: as mesmas colunas precedidas do código da publicação
+SUPPLIER_SALES_SCHEMA = pa.schema([pa.field('Publication', pa.string()), *SALES_BY_ISSUE_SCHEMA])
+
+_SALES_FRAME_DTYPES = {
+    pa.string(): pd.StringDtype('pyarrow'),
+    pa.large_string(): pd.StringDtype('pyarrow'),  # string[pyarrow] gravado no cache em disco
+    pa.date32(): pd.ArrowDtype(pa.date32()),
+}
+
+# Percentagem de não vendidos, calculada a partir de Supply e Sales (int32 como as outras contagens: sem overflow)
+UNSOLDS_DTYPE = 'int32'
+
+
+def sales_frame_from_arrow(table: pa.Table) -> pd.DataFrame:
+    """
+    Converts a sales table (query result or disk cache entry) to pandas keeping the compact layout:
+    numeric columns stay int16/int32, Issue and Date stay Arrow-backed (string and date32) instead
+    of Python objects and datetime64[ns]. Issue numbers are unique within a frame, so an Arrow string
+    column is smaller than a categorical.
+    Args:
+        table (pa.Table): Table with the SALES_BY_ISSUE_SCHEMA columns.
+    Returns:
+        pd.DataFrame: The frame, converted in a single pass.
+    """
+
+    # Entradas do cache em disco gravadas com outro tipo de Unsolds (int16) passam ao tipo atual
+    index = table.schema.get_field_index('Unsolds')
+    unsolds_type = pa.from_numpy_dtype(UNSOLDS_DTYPE)
+    if index >= 0 and table.field(index).type != unsolds_type:
+        table = table.set_column(index, 'Unsolds', table.column(index).cast(unsolds_type))
+
+    # ignore_metadata: os metadados pandas gravados no cache em disco não se sobrepõem aos tipos acima
+    return table.to_pandas(types_mapper=_SALES_FRAME_DTYPES.get, ignore_metadata=True)
+
+
+def sales_by_issue_query(schema: str) -> str:
+    """
+    Builds the per-issue sales query of one publication (Sales Boards).
+
+    The invoice (SINVOICED/SINVOICE) and outlet (ZBPCEST) aggregations are restricted
+    to the items of the selected issues, so each report only reads the invoice lines
+    of its own publication and date window instead of the whole history.
+
+    Args:
+        schema (str): The database schema to query.
+    Returns:
+        str: SQL text with the `:pub_param`, `:start_date` and `:end_date` parameters.
+    """
+
+    return _issue_sales_query(schema, issues_filter='a.CODPUB_0=:pub_param')
+
+
+def sales_by_supplier_query(schema: str) -> str:
+    """
+    Builds the per-issue sales query of every distributed publication of one supplier
+    (ZPUBLIC.BPSREF_0), in a single round trip: the rows of sales_by_issue_query preceded by
+    the publication code, ordered by publication and date.
+
+    Args:
+        schema (str): The database schema to query.
+    Returns:
+        str: SQL text with the `:supplier_param`, `:start_date` and `:end_date` parameters.
+    """
+
+    return _issue_sales_query(
+        schema,
+        issues_filter=(
+            f'a.CODPUB_0 IN (SELECT p.CODPUB_0 FROM {schema}.ZPUBLIC p WITH (NOLOCK) '
+            'WHERE p.BPSREF_0=:supplier_param AND p.DISTVSP_0=2)'
+        ),
+        by_publication=True,
+    )
+
+
+def _issue_sales_query(schema: str, issues_filter: str, by_publication: bool = False) -> str:
+    """The per-issue sales query over the issues of ZITMINP selected by `issues_filter`."""
+
+    publication_column = 'a.CODPUB_0 as Publication,' if by_publication else ''
+    publication_order = 'a.CODPUB_0,' if by_publication else ''
+    return f"""
+        WITH issues AS (
+            SELECT a.ITMREF_0, a.CODPUB_0, a.DISDAT_0, a.NUMEDI_0, a.QTYRREC_0, a.QTYREXP_0, a.QTYRDEV_0
+            FROM {schema}.ZITMINP a WITH (NOLOCK)
+            WHERE a.DISTVSP_0=2
+            AND a.PERNUM_0>1
+            AND {issues_filter}
+            AND a.DISDAT_0 BETWEEN :start_date AND :end_date
+        ),
+        invoiced AS (
+            SELECT x.ITMREF_0,SUM(CASE WHEN y.INVTYP_0=2 THEN x.QTY_0*-1 ELSE x.QTY_0 END) AS QTY_0
+            FROM {schema}.SINVOICED x WITH (NOLOCK)
+            INNER JOIN {schema}.SINVOICE y WITH (NOLOCK) ON y.NUM_0=x.NUM_0
+            WHERE x.CPY_0='INP'
+            AND x.ITMREF_0 IN (SELECT ITMREF_0 FROM issues)
+            AND x.BPCINV_0 NOT IN (SELECT VALEUR_0 FROM {schema}.ADOVAL WITH (NOLOCK) WHERE PARAM_0='BPCINV')
+            GROUP BY x.ITMREF_0
+        ),
+        outlets AS (
+            SELECT e.ITMREF_0,COUNT(1) AS OUT
+            FROM {schema}.ZBPCEST e
+            WHERE e.ITMREF_0 IN (SELECT ITMREF_0 FROM issues)
+            GROUP BY e.ITMREF_0
+        )
+        SELECT
+            {publication_column}
+            YEAR(a.DISDAT_0) as Year,
+            a.NUMEDI_0 as Issue,
+            a.DISDAT_0 as Date,
+            a.QTYRREC_0 as Supply,
+            ((a.QTYREXP_0+ISNULL(CONVERT(int,b.QTY_0),0))-a.QTYRDEV_0) as Sales,
+            ISNULL(c.OUT,0) as Outlet
+        FROM issues a
+        LEFT JOIN invoiced b ON b.ITMREF_0=a.ITMREF_0
+        LEFT JOIN outlets c ON c.ITMREF_0=a.ITMREF_0
+        ORDER BY {publication_order}a.DISDAT_0,a.NUMEDI_0
+        """
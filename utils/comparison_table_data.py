@@ -1,23 +1,9 @@
-from typing import Any, NamedTuple
+from typing import Any
 
 import pandas as pd
 import streamlit as st
 
 
-class ComparisonTableData(NamedTuple):
-    comparison_rows: list[Any]
-    total_prev: pd.Series
-    total_curr: pd.Series
-    avg_prev: pd.Series
-    avg_curr: pd.Series
-    var_total_sales_copies: object
-    var_total_sales_perc: object
-    var_avg_sales_copies: object
-    var_avg_sales_perc: object
-    previous_year: int
-    current_year: int
-
-
 def config_columns_to_sales_boards(prev_year: int, curr_year: int) -> dict[str, Any]:
     """
     Configures the columns for the sales boards.
@@ -53,6 +39,73 @@ def config_columns_to_sales_boards(prev_year: int, curr_year: int) -> dict[str,
     return columns_config
 
 
+def config_columns_to_trend_panel(years: list[int]) -> dict[str, Any]:
+    """
+    Configures the columns of the multi-year trend panel.
+    Args:
+        years (list[int]): The years of the panel, in ascending order.
+    Returns:
+        dict[str, Any]: A dictionary containing the columns configuration.
+    """
+
+    columns_config = {}
+    for index, year in enumerate(years):
+        suffix = year - 2000
+        columns_config.update({
+            f'Issue_{suffix}': st.column_config.TextColumn(label=f'Issue {year}', width='small'),
+            f'Date_{suffix}': st.column_config.DateColumn(label='Date', width='small'),
+            f'Supply_{suffix}': st.column_config.NumberColumn(label='Supply', width='small'),
+            f'Sales_{suffix}': st.column_config.NumberColumn(label='Sales', width='small'),
+            f'Unsolds_{suffix}': st.column_config.NumberColumn(
+                label='%Unsolds', width='small', format='percent', step=0.01
+            ),
+            f'Outlet_{suffix}': st.column_config.NumberColumn(label='Outlet', width='small'),
+        })
+        if index > 0:
+            columns_config[f'Copies_var_{suffix}'] = st.column_config.NumberColumn(label='Copies', width='small')
+            columns_config[f'%_var_{suffix}'] = st.column_config.NumberColumn(
+                label='%', width='small', format='percent', step=0.01
+            )
+
+    return columns_config
+
+
+def config_columns_to_portfolio(prev_year: int, curr_year: int) -> dict[str, Any]:
+    """
+    Configures the columns of the supplier portfolio summary.
+    Args:
+        prev_year (int): The previous year.
+        curr_year (int): The current year.
+    Returns:
+        dict[str, Any]: A dictionary containing the columns configuration.
+    """
+
+    columns_config = {
+        'Publication': st.column_config.TextColumn(label='Code', width='small'),
+        'Description': st.column_config.TextColumn(label='Publication', width='medium'),
+    }
+    for year in (prev_year, curr_year):
+        suffix = year - 2000
+        columns_config.update({
+            f'Issues_{suffix}': st.column_config.NumberColumn(label=f'Issues {year}', width='small'),
+            f'Supply_{suffix}': st.column_config.NumberColumn(label='Supply', width='small'),
+            f'Sales_{suffix}': st.column_config.NumberColumn(label='Sales', width='small'),
+            f'Unsolds_{suffix}': st.column_config.NumberColumn(
+                label='%Unsolds', width='small', format='percent', step=0.01
+            ),
+            f'Outlet_{suffix}': st.column_config.NumberColumn(label='Outlet', width='small'),
+            f'AvgSales_{suffix}': st.column_config.NumberColumn(label='Avg Sales', width='small'),
+        })
+    columns_config.update({
+        'Copies_var': st.column_config.NumberColumn(label='Copies', width='small'),
+        '%_var': st.column_config.NumberColumn(label='%', width='small', format='percent', step=0.01),
+        'AvgCopies_var': st.column_config.NumberColumn(label='Avg Copies', width='small'),
+        'Avg%_var': st.column_config.NumberColumn(label='Avg %', width='small', format='percent', step=0.01),
+    })
+
+    return columns_config
+
+
 def highlight_negative(val):
     if pd.isna(val):
         return ''
@@ -0,0 +1,164 @@
+import functools
+from typing import Mapping, Optional
+
+import jinja2
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from markupsafe import Markup
+
+# Estilos da tabela HTML, limitados à classe da tabela (não alteram as outras tabelas da página)
+COMPARISON_TABLE_CSS = """<style>
+.comparison-table { border-collapse: collapse; width: 100%; font-size: 0.9em; }
+.comparison-table th, .comparison-table td { border: 1px solid #5681d0; text-align: center; padding: 8px; }
+.comparison-table th { background-color: #1a1a3d; }
+.comparison-table .header-year { font-weight: bold; font-size: 1.1em; }
+.comparison-table .sub-header { font-style: italic; }
+.comparison-table .total-avg-label { text-align: left; font-weight: bold; }
+.comparison-table .variation-header { font-weight: bold; }
+.comparison-table .separator td { background-color: #1a1a3d; height: 2px; padding: 0; }
+.comparison-table .summary { font-weight: bold; }
+</style>"""
+
+# Colunas de cada ano na tabela, pela ordem das células
+YEAR_COLUMNS = ['Issue', 'Date', 'Supply', 'Sales', 'Unsolds', 'Outlet']
+
+# Sem linhas em branco: dentro de st.markdown uma linha vazia termina o bloco HTML
+_TABLE_TEMPLATE = """<table class="comparison-table">
+<thead>
+<tr>
+<th colspan="6" class="header-year">{{ previous_year }}</th>
+<th colspan="6" class="header-year">{{ current_year }}</th>
+<th colspan="2" class="variation-header">Variations</th>
+</tr>
+<tr>
+<th colspan="1" class="sub-header"></th><th colspan="5" class="sub-header">Per Issue</th>
+<th colspan="1" class="sub-header"></th><th colspan="5" class="sub-header">Per Issue</th>
+<th colspan="2" class="sub-header">Sales</th>
+</tr>
+<tr>
+{% for _ in range(2) %}
+<th>Issue</th><th>Date</th><th>Supply</th><th>Sales</th><th>% Unsold</th><th>Out</th>
+{% endfor %}
+<th>Copies</th><th>%</th>
+</tr>
+</thead>
+<tbody>
+{{ rows }}
+{% for summary in summaries %}
+<tr class="separator"><td colspan="14"></td></tr>
+<tr class="summary">
+{% for year in (summary.prev, summary.curr) %}
+<td class="total-avg-label" colspan="2">{{ summary.label }}</td>
+<td>{{ year.supply }}</td><td>{{ year.sales }}</td><td>{{ year.unsold }}</td><td>{{ year.outlet }}</td>
+{% endfor %}
+<td>{{ summary.copies }}</td><td>{{ summary.percent }}</td>
+</tr>
+{% endfor %}
+</tbody>
+</table>"""
+
+_MISSING = '-'
+# Caracteres especiais do HTML, pela ordem de substituição (& primeiro)
+_HTML_ESCAPES = (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&#34;'), ("'", '&#39;'))
+
+
+@functools.cache
+def _table_template() -> jinja2.Template:
+    """The table template, compiled once per process (autoescape on)."""
+    environment = jinja2.Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True)
+    return environment.from_string(_TABLE_TEMPLATE)
+
+
+def _escaped_text(values: pa.Array) -> pa.Array:
+    text = pc.cast(values, pa.string())
+    for char, entity in _HTML_ESCAPES:
+        text = pc.replace_substring(text, char, entity)
+    return text
+
+
+def _column_cells(series: pd.Series, column: str) -> pa.Array:
+    """One column formatted and escaped as cell text, vectorized ('-' for missing values)."""
+    values = pa.array(series, from_pandas=True)
+    if column in {'Issue', 'Date'}:
+        text = _escaped_text(values)
+    else:
+        numbers = pc.cast(values, pa.float64())
+        is_percent = column in {'Unsolds', '%_var'}
+        if is_percent:
+            numbers = pc.multiply(numbers, 100)
+        text = pc.cast(pc.cast(pc.round(numbers), pa.int64()), pa.string())
+        if is_percent:
+            text = pc.binary_join_element_wise(text, '%', '')
+    return pc.fill_null(text, _MISSING)
+
+
+def _format_number(value: Optional[float], percent: bool = False) -> str:
+    if value is None or pd.isna(value):
+        return _MISSING
+    # round() em vez do formato .0f: sem "-0" nas variações
+    return f'{round(value)}%' if percent else str(round(value))
+
+
+def _summary(label: str, kind: str, prev_metrics: Mapping, curr_metrics: Mapping) -> dict:
+    """A totals or averages row: both years and the variation of the sales."""
+
+    def year_cells(metrics: Mapping) -> dict:
+        return {
+            'supply': _format_number(metrics.get(f'{kind}_supply')),
+            'sales': _format_number(metrics.get(f'{kind}_sales')),
+            'unsold': _format_number(metrics.get(f'{kind}_unsold'), percent=True),
+            'outlet': _format_number(metrics.get(f'{kind}_outlet')),
+        }
+
+    prev_sales = prev_metrics.get(f'{kind}_sales')
+    curr_sales = curr_metrics.get(f'{kind}_sales')
+    copies = percent = None
+    if prev_sales is not None and curr_sales is not None:
+        copies = curr_sales - prev_sales
+        # Ano anterior sem vendas: 0%, como nas variações por edição
+        percent = copies / prev_sales * 100 if prev_sales else 0.0
+    return {
+        'label': label,
+        'prev': year_cells(prev_metrics),
+        'curr': year_cells(curr_metrics),
+        'copies': _format_number(copies),
+        'percent': _format_number(percent, percent=True),
+    }
+
+
+def comparison_table_html(
+    df_sales: pd.DataFrame, prev_metrics: Mapping, curr_metrics: Mapping, year_current: int
+) -> str:
+    """
+    Renders the comparison table as HTML: the issue rows straight from the columns of the
+    comparison DataFrame, then the totals and the averages of both years.
+    Each column is formatted and escaped in one vectorized pass and the rows are joined once
+    (linear in the number of rows); the static parts come from a template compiled once.
+    Args:
+        df_sales (pd.DataFrame): Result of create_comparison_table (columns suffixed with the years).
+        prev_metrics (Mapping): Metrics of the previous year (metrics_record).
+        curr_metrics (Mapping): Metrics of the current year (metrics_record).
+        year_current (int): Current year of the comparison.
+    Returns:
+        str: The <table> markup (see COMPARISON_TABLE_CSS for its styles).
+    """
+
+    suffixes = (year_current - 1 - 2000, year_current - 2000)
+    columns = [(f'{column}_{suffix}', column) for suffix in suffixes for column in YEAR_COLUMNS]
+    columns += [('Copies_var', 'Copies_var'), ('%_var', '%_var')]
+    cells = [_column_cells(df_sales[name], column) for name, column in columns]
+
+    # Linhas montadas no Arrow (valores já escapados): só as linhas completas passam a objetos Python
+    rows = pc.binary_join_element_wise('<tr><td>', pc.binary_join_element_wise(*cells, '</td><td>'), '</td></tr>', '')
+    rows = Markup('\n'.join(rows.to_pylist()))
+
+    return _table_template().render(
+        previous_year=year_current - 1,
+        current_year=year_current,
+        rows=rows,
+        summaries=[
+            _summary('Total', 'total', prev_metrics, curr_metrics),
+            _summary('Average', 'avg', prev_metrics, curr_metrics),
+        ],
+    )
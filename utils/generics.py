@@ -64,3 +64,23 @@ class Generics:
 
         logger.info(f'String de conexão criada: {conn_str}')
         return conn_str
+
+    @staticmethod
+    def build_engine_options(config: dict) -> dict:
+        """
+        Builds the connection pool options of the engine from the database configuration.
+        :param config: Dictionary with the database configuration ([database] in secrets.toml).
+        :return: Keyword arguments for create_engine.
+        """
+        engine_options = {
+            'pool_size': int(config.get('pool_size', 5)),
+            'max_overflow': int(config.get('max_overflow', 10)),
+            'pool_timeout': float(config.get('pool_timeout', 30)),
+            # O firewall corta ligações inativas: reciclar antes disso e testar no checkout
+            'pool_recycle': int(config.get('pool_recycle', 1800)),
+            'pool_pre_ping': bool(config.get('pool_pre_ping', True)),
+            'fast_executemany': bool(config.get('fast_executemany', True)),
+        }
+
+        logger.info(f'Opções do pool de conexões: {engine_options}')
+        return engine_options
@@ -0,0 +1,172 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Estratégias de alinhamento das edições de dois anos: {chave: rótulo na barra lateral}
+ALIGN_POSITION = 'position'
+ALIGN_ISO_WEEK = 'iso_week'
+ALIGN_NEAREST_DATE = 'nearest_date'
+ALIGN_ISSUE_NUMBER = 'issue_number'
+
+ALIGNMENT_STRATEGIES = {
+    ALIGN_POSITION: 'Posição da edição',
+    ALIGN_ISO_WEEK: 'Semana ISO',
+    ALIGN_NEAREST_DATE: 'Data mais próxima',
+    ALIGN_ISSUE_NUMBER: 'Número da edição',
+}
+
+# Deslocamento da data do ano anterior na estratégia nearest_date: 52 semanas mantém o dia da semana
+YEAR_SHIFT_DAYS = 364
+
+# Edições com a mesma chave (ex.: duas edições na mesma semana) são numeradas até este limite
+_MAX_PER_KEY = 1024
+# Chaves das edições sem número: depois de todas as numeradas, pela ordem original
+_UNNUMBERED_OFFSET = 1 << 40
+
+
+def align_years(
+    df_prev: pd.DataFrame,
+    df_curr: pd.DataFrame,
+    strategy: str = ALIGN_POSITION,
+    tolerance_days: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Lines up the issues of two years side by side (outer join, columns suffixed _prev and _curr).
+    Every strategy is a sorted join, O(n log n):
+        - position: n-th issue of each year (the previous behaviour);
+        - iso_week: same ISO week of the year, then order within the week;
+        - nearest_date: nearest distribution date one year (52 weeks) later, within the tolerance,
+          each issue matched at most once (merge_asof);
+        - issue_number: same distance to the first issue number of the year, so gaps in the
+          numbering do not shift the following issues.
+    Args:
+        df_prev (pd.DataFrame): Issues of the previous year, in date order.
+        df_curr (pd.DataFrame): Issues of the current year, in date order.
+        strategy (str): One of the ALIGNMENT_STRATEGIES keys.
+        tolerance_days (int, optional): Maximum distance for nearest_date. By default half the
+            median interval between the issues of the current year (at least one day).
+    Returns:
+        pd.DataFrame: One row per aligned pair or unmatched issue, RangeIndex.
+    """
+
+    if strategy == ALIGN_NEAREST_DATE:
+        prev_rows, curr_rows = _nearest_date_rows(df_prev, df_curr, tolerance_days)
+    elif strategy in _KEY_FUNCTIONS:
+        key_function = _KEY_FUNCTIONS[strategy]
+        prev_rows, curr_rows = _join_keys(key_function(df_prev), key_function(df_curr))
+    else:
+        raise ValueError(f'Estratégia de alinhamento desconhecida: {strategy}')
+
+    # Linhas -1 (sem par) ficam vazias: mesmo resultado e tipos de um merge outer
+    index = pd.RangeIndex(len(prev_rows))
+    prev = df_prev.set_axis(pd.RangeIndex(len(df_prev))).reindex(prev_rows).set_axis(index)
+    curr = df_curr.set_axis(pd.RangeIndex(len(df_curr))).reindex(curr_rows).set_axis(index)
+    return pd.concat([prev.add_suffix('_prev'), curr.add_suffix('_curr')], axis=1)
+
+
+def _day_numbers(df: pd.DataFrame) -> np.ndarray:
+    """Distribution dates as days since 1970-01-01 (int64)."""
+    return pa.array(df['Date'].array).cast(pa.int32()).to_numpy(zero_copy_only=False).astype('int64')
+
+
+def _unique_keys(keys: np.ndarray) -> np.ndarray:
+    """Numbers the repeated keys (1st, 2nd... issue with the same key) so that every key is unique."""
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    # Início de cada série de chaves iguais, propagado até ao fim da série
+    starts = np.ones(len(keys), dtype=bool)
+    starts[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    positions = np.arange(len(keys))
+    occurrence = np.empty(len(keys), dtype='int64')
+    occurrence[order] = positions - np.maximum.accumulate(np.where(starts, positions, 0))
+    return keys * _MAX_PER_KEY + occurrence
+
+
+def _position_keys(df: pd.DataFrame) -> np.ndarray:
+    return np.arange(len(df), dtype='int64')
+
+
+def _iso_week_keys(df: pd.DataFrame) -> np.ndarray:
+    days = _day_numbers(df)
+    # 1970-01-01 foi uma quinta-feira: segunda = 0
+    weekday = (days + 3) % 7
+    thursday = (days - weekday + 3).astype('datetime64[D]')
+    iso_year = thursday.astype('datetime64[Y]')
+    week = (thursday - iso_year.astype('datetime64[D]')).astype('int64') // 7 + 1
+
+    # Semanas ISO do ano vizinho (ex.: 30/12 na semana 1 do ano seguinte) ficam fora das semanas do ano
+    calendar_year = days.astype('datetime64[D]').astype('datetime64[Y]')
+    year_offset = (iso_year - calendar_year).astype('int64')
+    return _unique_keys(year_offset * 54 + week)
+
+
+def _issue_number_keys(df: pd.DataFrame) -> np.ndarray:
+    issues = pc.utf8_trim_whitespace(pa.array(df['Issue'].array))
+    # Só os números puros; as restantes edições (ex.: especiais com sufixo) ficam sem número
+    numbers = pc.cast(pc.if_else(pc.utf8_is_digit(issues), issues, None), pa.int64())
+    numbers = numbers.to_numpy(zero_copy_only=False).astype('float64')
+    numbered = ~np.isnan(numbers)
+    first = numbers[numbered].min() if numbered.any() else 0
+    keys = np.where(numbered, numbers - first, _UNNUMBERED_OFFSET + np.arange(len(df)))
+    return _unique_keys(keys.astype('int64'))
+
+
+_KEY_FUNCTIONS = {
+    ALIGN_POSITION: _position_keys,
+    ALIGN_ISO_WEEK: _iso_week_keys,
+    ALIGN_ISSUE_NUMBER: _issue_number_keys,
+}
+
+
+def _rows_of_keys(keys: np.ndarray, frame_keys: np.ndarray) -> np.ndarray:
+    """Row of each of `keys` in the frame (binary search over its sorted keys), -1 when absent."""
+    if not len(frame_keys):
+        return np.full(len(keys), -1, dtype='int64')
+    order = np.argsort(frame_keys, kind='stable')
+    sorted_keys = frame_keys[order]
+    position = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return np.where(sorted_keys[position] == keys, order[position], -1)
+
+
+def _join_keys(prev_keys: np.ndarray, curr_keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sorted outer join on unique keys: (rows of the previous year, rows of the current year)."""
+    keys = np.union1d(prev_keys, curr_keys)
+    return _rows_of_keys(keys, prev_keys), _rows_of_keys(keys, curr_keys)
+
+
+def _nearest_date_rows(
+    df_prev: pd.DataFrame, df_curr: pd.DataFrame, tolerance_days: Optional[int]
+) -> tuple[np.ndarray, np.ndarray]:
+    prev_days = _day_numbers(df_prev) + YEAR_SHIFT_DAYS
+    curr_days = _day_numbers(df_curr)
+
+    if tolerance_days is None:
+        gaps = np.diff(np.sort(curr_days))
+        tolerance_days = max(int(np.median(gaps)) // 2, 1) if len(gaps) else 1
+
+    curr_side = pd.DataFrame({'Day': curr_days, 'Row': np.arange(len(curr_days))}).sort_values('Day', kind='stable')
+    prev_side = pd.DataFrame({'Day': prev_days, 'PrevRow': np.arange(len(prev_days))}).sort_values('Day', kind='stable')
+    matched = pd.merge_asof(
+        curr_side,
+        prev_side.assign(PrevDay=prev_side['Day']),
+        on='Day',
+        direction='nearest',
+        tolerance=tolerance_days,
+    ).dropna(subset=['PrevRow'])
+
+    # merge_asof pode dar a mesma edição anterior a várias atuais: fica o par mais próximo
+    matched['Distance'] = (matched['Day'] - matched['PrevDay']).abs()
+    matched = matched.sort_values(['Distance', 'Row'], kind='stable').drop_duplicates('PrevRow')
+
+    pairs = np.full(len(curr_days), -1, dtype='int64')
+    pairs[matched['Row'].to_numpy()] = matched['PrevRow'].to_numpy(dtype='int64')
+    unmatched_prev = np.setdiff1d(np.arange(len(prev_days)), pairs[pairs >= 0])
+
+    # Ordem final pela data no calendário do ano atual (edições sem par na sua data deslocada)
+    prev_rows = np.concatenate([pairs, unmatched_prev])
+    curr_rows = np.concatenate([np.arange(len(curr_days)), np.full(len(unmatched_prev), -1)])
+    order = np.argsort(np.concatenate([curr_days, prev_days[unmatched_prev]]), kind='stable')
+    return prev_rows[order], curr_rows[order]
@@ -1,10 +1,33 @@
+import atexit
 import logging
 import logging.config
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
+# Listeners ativos (um por logger com handlers próprios)
+_listeners: list[QueueListener] = []
+
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+
+def setup_logging(log_dir: str = 'logs', level: str = 'INFO', console: bool = True):
+    """
+    Configures the application logging.
+    The handlers (console and rotating files) run on background QueueListener threads: a log
+    call only puts the record on a queue, it never waits for the disk or the handler locks.
+    The root level is applied before any record is created, so filtered calls cost nothing.
+    Args:
+        log_dir (str): Directory of the log files.
+        level (str): Minimum level of the root logger.
+        console (bool): Also log to the console.
+    """
+
+    # O Streamlit executa main.py a cada interação: configurar uma única vez por processo
+    if _listeners:
+        return
 
-def setup_logging():
-    log_dir = 'logs'
     os.makedirs(log_dir, exist_ok=True)
 
     logging_config = {
@@ -12,6 +35,7 @@ def setup_logging():
         'disable_existing_loggers': False,
         'formatters': {
             'standard': {'format': '%(asctime)s - %(levelname)s - %(name)s - %(message)s'},
+            'json_line': {'format': '%(message)s'},
         },
         'handlers': {
             'console': {
@@ -21,20 +45,75 @@ def setup_logging():
             },
             'info_file': {
                 'level': 'INFO',
-                'class': 'logging.FileHandler',
+                'class': 'logging.handlers.RotatingFileHandler',
                 'filename': os.path.join(log_dir, 'info.log'),
-                'mode': 'a',
+                'maxBytes': LOG_MAX_BYTES,
+                'backupCount': LOG_BACKUP_COUNT,
+                'encoding': 'utf-8',
                 'formatter': 'standard',
             },
             'error_file': {
                 'level': 'ERROR',
-                'class': 'logging.FileHandler',
+                'class': 'logging.handlers.RotatingFileHandler',
                 'filename': os.path.join(log_dir, 'error.log'),
-                'mode': 'a',
+                'maxBytes': LOG_MAX_BYTES,
+                'backupCount': LOG_BACKUP_COUNT,
+                'encoding': 'utf-8',
                 'formatter': 'standard',
             },
+            'slow_query_file': {
+                'level': 'INFO',
+                'class': 'logging.handlers.RotatingFileHandler',
+                'filename': os.path.join(log_dir, 'slow_query.log'),
+                'maxBytes': LOG_MAX_BYTES,
+                'backupCount': LOG_BACKUP_COUNT,
+                'encoding': 'utf-8',
+                'formatter': 'json_line',
+            },
+        },
+        'loggers': {
+            # Uma linha JSON por query lenta/amostrada (core/query_log.py)
+            'sql.slow_query': {'level': 'INFO', 'handlers': ['slow_query_file'], 'propagate': False},
+        },
+        'root': {
+            'level': level,
+            'handlers': ['console', 'info_file', 'error_file'] if console else ['info_file', 'error_file'],
         },
-        'root': {'level': 'DEBUG', 'handlers': ['console', 'info_file', 'error_file']},
     }
 
     logging.config.dictConfig(logging_config)
+
+    for logger_name in ('', 'sql.slow_query'):
+        _listeners.append(_attach_queue(logging.getLogger(logger_name)))
+
+    atexit.register(stop_logging)
+
+
+def _attach_queue(logger: logging.Logger) -> QueueListener:
+    """
+    Moves the handlers of `logger` behind a QueueHandler served by a background listener.
+    Args:
+        logger (logging.Logger): Logger whose handlers will run on the listener thread.
+    Returns:
+        QueueListener: The started listener.
+    """
+    handlers = list(logger.handlers)
+    log_queue = queue.SimpleQueue()
+
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setLevel(min(handler.level for handler in handlers))
+
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+
+    # Cada handler continua a aplicar o seu próprio nível (ex.: error_file só ERROR)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def stop_logging():
+    """Flushes the pending records and stops the listener threads."""
+    while _listeners:
+        _listeners.pop().stop()
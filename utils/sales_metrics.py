@@ -0,0 +1,135 @@
+from typing import Iterable, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+def sales_variation_arrays(prev: np.ndarray, curr: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Year-over-year variation on float arrays of any shape (NaN = missing sales).
+    Args:
+        prev (np.ndarray): Sales of the previous year.
+        curr (np.ndarray): Sales of the current year, same shape.
+    Returns:
+        tuple: (copies variation, percentage variation) as float arrays, NaN when one of the
+        sales is missing; the percentage is 0.0 when the previous year sold zero copies.
+    """
+
+    copies_var = curr - prev
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent_var = copies_var / prev
+
+    # Denominador zero: mantém a regra antiga (0%) em vez de inf/NaN
+    percent_var[(prev == 0) & ~np.isnan(curr)] = 0.0
+    return copies_var, percent_var
+
+
+def compute_sales_variations(sales_prev: pd.Series, sales_curr: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """
+    Computes the year-over-year sales variation, column by column.
+    Args:
+        sales_prev (pd.Series): Sales of the previous year, aligned with `sales_curr`.
+        sales_curr (pd.Series): Sales of the current year.
+    Returns:
+        tuple: (copies variation as Int64, percentage variation as Float64).
+        Both are <NA> when one of the sales is missing; the percentage is 0.0
+        when the previous year sold zero copies.
+    """
+
+    prev = pd.to_numeric(sales_prev, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    curr = pd.to_numeric(sales_curr, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+    copies_var, percent_var = sales_variation_arrays(prev, curr)
+
+    return (
+        pd.Series(pd.array(np.round(copies_var), dtype='Int64'), index=sales_curr.index),
+        pd.Series(pd.array(percent_var, dtype='Float64'), index=sales_curr.index),
+    )
+
+
+# Colunas de quantidades agregadas por ano: {sufixo da métrica: coluna}
+METRIC_COLUMNS = {'supply': 'Supply', 'sales': 'Sales', 'outlet': 'Outlet'}
+
+# Estatísticas adicionais que yearly_metrics aceita em `extra`, com o tipo do resultado
+EXTRA_STATS = {'count': 'Int64', 'median': 'Float64', 'min': 'Int64', 'max': 'Int64', 'std': 'Float64'}
+
+
+def yearly_metrics(df: pd.DataFrame, extra: Iterable[str] = (), by: Sequence[str] = ('Year',)) -> pd.DataFrame:
+    """
+    Computes the metrics of every year over a single grouping, without copying the data.
+    Args:
+        df (pd.DataFrame): Sales data with Year, Supply, Sales and Outlet columns.
+        extra (Iterable[str]): Additional statistics (keys of EXTRA_STATS) computed on the same
+            grouping, returned as {stat}_supply, {stat}_sales and {stat}_outlet.
+        by (Sequence[str]): Grouping columns, e.g. ('Publication', 'Year') for a whole portfolio.
+    Returns:
+        pd.DataFrame: One row per group (index `by`) with the keys of calculate_metrics as columns:
+        total_/avg_ supply, sales and outlet (averages truncated) and the unsold percentages
+        (rounded up, <NA> when there is no supply), followed by the extra statistics.
+    """
+
+    extra = list(dict.fromkeys(extra))
+    unknown = set(extra) - EXTRA_STATS.keys()
+    if unknown:
+        raise ValueError(f'Estatísticas não suportadas: {sorted(unknown)}')
+
+    # Um só agrupamento: os códigos dos grupos são calculados uma vez e servem todas as reduções
+    grouped = df.groupby(list(by), sort=True)[list(METRIC_COLUMNS.values())]
+    totals = grouped.sum()
+
+    # Médias a partir das somas e contagens, sem outra passagem pela média
+    total_values = totals.to_numpy(dtype='float64')
+    count_values = grouped.count().to_numpy(dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        averages = total_values / count_values
+
+    columns = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for prefix, values in (('total', total_values), ('avg', np.trunc(averages))):
+            for position, key in enumerate(METRIC_COLUMNS):
+                columns[f'{prefix}_{key}'] = values[:, position]
+            # Percentagem de não vendidos arredondada para cima (sobre a média exata, não truncada)
+            exact = total_values if prefix == 'total' else averages
+            supply, sales = exact[:, 0], exact[:, 1]
+            columns[f'{prefix}_unsold'] = np.where(supply > 0, np.ceil((supply - sales) / supply * 100), np.nan)
+
+    columns = {key: _masked_array(values, 'Int64') for key, values in columns.items()}
+    for stat in extra:
+        # A contagem já foi calculada para as médias
+        values = (
+            count_values if stat == 'count' else getattr(grouped, stat)().to_numpy(dtype='float64', na_value=np.nan)
+        )
+        for position, key in enumerate(METRIC_COLUMNS):
+            columns[f'{stat}_{key}'] = _masked_array(values[:, position], EXTRA_STATS[stat])
+
+    return pd.DataFrame(columns, index=totals.index)
+
+
+def _masked_array(values: np.ndarray, dtype: str) -> pd.api.extensions.ExtensionArray:
+    """Float array (NaN = missing) as an Int64/Float64 array, without the per-element checks of astype."""
+    mask = np.isnan(values)
+    data = np.where(mask, 0, values)
+    if dtype == 'Int64':
+        return pd.arrays.IntegerArray(data.astype('int64'), mask)
+    return pd.arrays.FloatingArray(data, mask)
+
+
+def metrics_record(metrics: pd.DataFrame, year: int) -> dict[str, Optional[Union[int, float]]]:
+    """
+    Returns the metrics of one year as a plain dictionary, the format of calculate_metrics.
+    Args:
+        metrics (pd.DataFrame): Result of yearly_metrics.
+        year (int): The year to extract.
+    Returns:
+        dict: {metric: int | float}, None for the missing values and for a year without data.
+    """
+
+    if year not in metrics.index:
+        return dict.fromkeys(metrics.columns)
+
+    position = metrics.index.get_loc(year)
+    record = {}
+    for column in metrics.columns:
+        value = metrics[column].array[position]
+        record[column] = None if value is pd.NA else value.item()
+    return record
@@ -0,0 +1,141 @@
+import math
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import streamlit as st
+
+# Linhas por página das tabelas em janela (a primeira é a opção por omissão)
+PAGE_SIZES = (50, 100, 250, 500)
+# Ordens (filtro + ordenação) guardadas por tabela na sessão; as mais antigas saem primeiro
+MAX_CACHED_ORDERS = 8
+
+
+def window_order(
+    df: pd.DataFrame, sort_by: Optional[str] = None, descending: bool = False, query: str = ''
+) -> Optional[np.ndarray]:
+    """
+    Positions of the rows that match `query`, in the order of `sort_by` (stable, missing values last).
+    Args:
+        df (pd.DataFrame): The full table.
+        sort_by (Optional[str]): Column to sort by; None keeps the original order.
+        descending (bool): Sort in descending order.
+        query (str): Text searched (case-insensitive) in the text columns; empty keeps every row.
+    Returns:
+        Optional[np.ndarray]: Row positions, or None for every row in the original order.
+    """
+
+    positions = None
+    query = query.strip()
+    if query:
+        matches = pa.array(np.zeros(len(df), dtype=bool))
+        for column in df.columns:
+            if pd.api.types.is_string_dtype(df[column]):
+                found = pc.match_substring(pa.array(df[column], from_pandas=True), query, ignore_case=True)
+                matches = pc.or_(matches, pc.fill_null(found, False))
+        positions = np.flatnonzero(matches.to_numpy(zero_copy_only=False))
+
+    if sort_by:
+        values = pa.array(df[sort_by], from_pandas=True)
+        if positions is not None:
+            values = values.take(positions)
+        order = pc.array_sort_indices(
+            values, order='descending' if descending else 'ascending', null_placement='at_end'
+        ).to_numpy()
+        positions = order if positions is None else positions[order]
+    return positions
+
+
+def table_window(df: pd.DataFrame, order: Optional[np.ndarray], start: int, stop: int) -> pd.DataFrame:
+    """Rows start:stop of the table in the given order (see window_order)."""
+    if order is None:
+        return df.iloc[start:stop]
+    return df.iloc[order[start:stop]]
+
+
+def _window_state(df: pd.DataFrame, key: str) -> dict:
+    """Session state of a windowed table; a new frame starts with no cached orders."""
+    state = st.session_state.get(f'{key}_window')
+    if state is None or state['frame'] is not df:
+        state = {'frame': df, 'orders': {}, 'last': None}
+        st.session_state[f'{key}_window'] = state
+    return state
+
+
+def _cached_order(state: dict, order_key: tuple) -> Optional[np.ndarray]:
+    """window_order of the table in `state`, computed once per (sort_by, descending, query)."""
+    orders = state['orders']
+    if order_key not in orders:
+        if len(orders) >= MAX_CACHED_ORDERS:
+            orders.pop(next(iter(orders)))
+        orders[order_key] = window_order(state['frame'], *order_key)
+    return orders[order_key]
+
+
+def _window_controls(df: pd.DataFrame, key: str, hidden: list[str]) -> tuple[tuple, int, Any]:
+    """Filter, sort and page size widgets: ((sort_by, descending, query), page size, column of the page input)."""
+    filter_col, sort_col, order_col, size_col, page_col = st.columns([3, 2, 1, 1, 1], vertical_alignment='bottom')
+    query = filter_col.text_input('Filtrar:', key=f'{key}_query', placeholder='Texto a procurar (ex.: edição)...')
+    sort_by = sort_col.selectbox(
+        'Ordenar por:',
+        options=[None, *(column for column in df.columns if column not in hidden)],
+        format_func=lambda column: 'Ordem original' if column is None else column,
+        key=f'{key}_sort',
+    )
+    descending = order_col.toggle('Descendente', key=f'{key}_descending')
+    page_size = size_col.selectbox('Linhas:', options=PAGE_SIZES, key=f'{key}_page_size')
+    return (sort_by, descending, query.strip()), page_size, page_col
+
+
+@st.fragment
+def windowed_dataframe(
+    df: pd.DataFrame,
+    key: str,
+    column_config: Optional[dict[str, Any]] = None,
+    summary: Optional[pd.DataFrame] = None,
+):
+    """
+    Shows a large table one page at a time: the full frame stays on the server and only the
+    visible page (plus the pinned summary rows) is sent to the browser. Filtering and sorting
+    run on the server and their row order is kept in the session for the same frame.
+    Args:
+        df (pd.DataFrame): The full table (the same object on every rerun, e.g. cached in the session).
+        key (str): Prefix of the widget keys and of the session state of the table.
+        column_config (Optional[dict[str, Any]]): As in st.dataframe; columns set to None are not sent.
+        summary (Optional[pd.DataFrame]): Rows always shown under the page (e.g. totals and averages).
+    """
+
+    column_config = column_config or {}
+    hidden = [column for column in df.columns if column in column_config and column_config[column] is None]
+    state = _window_state(df, key)
+    order_key, page_size, page_col = _window_controls(df, key, hidden)
+    order = _cached_order(state, order_key)
+    rows = len(df) if order is None else len(order)
+    pages = max(math.ceil(rows / page_size), 1)
+
+    # Outro filtro, ordem ou tamanho de página: volta à primeira página (o valor é definido antes do widget)
+    page_key = f'{key}_page'
+    if state['last'] != (order_key, page_size) or st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = 1
+    state['last'] = (order_key, page_size)
+    page = page_col.number_input('Página:', min_value=1, max_value=pages, step=1, key=page_key)
+
+    start = (page - 1) * page_size
+    stop = min(start + page_size, rows)
+    st.dataframe(
+        table_window(df, order, start, stop).drop(columns=hidden),
+        use_container_width=True,
+        hide_index=True,
+        column_config=column_config,
+    )
+    if summary is not None:
+        st.dataframe(
+            summary.drop(columns=hidden, errors='ignore'),
+            use_container_width=True,
+            hide_index=True,
+            column_config=column_config,
+        )
+    filtered = f' (filtradas de {len(df)})' if rows != len(df) else ''
+    st.caption(f'Linhas {start + 1 if rows else 0}–{stop} de {rows}{filtered}, página {page} de {pages}')